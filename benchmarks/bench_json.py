@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Compare the configured JSON codec against the standard library on
+the client state fixture and on typical monitor payloads.
+
+Run from the repository root:
+
+    $ python3 -m benchmarks.bench_json
+"""
+import base64
+import json
+import timeit
+
+from wideq import core
+
+FIXTURE = "tests/fixtures/client.json"
+
+MONITOR_JSON = json.dumps(
+    {
+        "TempCur": "24",
+        "TempCfg": "21",
+        "OpMode": "0",
+        "WindStrength": "4",
+        "WDirHStep": "0",
+        "WDirVStep": "0",
+        "Operation": "1",
+        "SensorMon": "0",
+        "Jet": "0",
+    }
+).encode()
+
+RESULT_RESPONSE = json.dumps(
+    {
+        core.DATA_ROOT: {
+            "returnCd": "0000",
+            "returnMsg": "OK",
+            "workList": [
+                {
+                    "deviceId": "33330ba80-107d-11e9-96c8-0051ede85d3f",
+                    "workId": core.gen_uuid(),
+                    "returnCode": "0000",
+                    "returnData": base64.b64encode(MONITOR_JSON).decode(),
+                }
+            ],
+        }
+    }
+).encode()
+
+
+def bench(name, loads, dumps, payload, number):
+    obj = loads(payload)
+    t_loads = min(timeit.repeat(lambda: loads(payload), number=number))
+    t_dumps = min(timeit.repeat(lambda: dumps(obj), number=number))
+    print(
+        "  {:<16} loads {:8.2f} us   dumps {:8.2f} us".format(
+            name, t_loads / number * 1e6, t_dumps / number * 1e6
+        )
+    )
+    return t_loads, t_dumps
+
+
+def main():
+    with open(FIXTURE, "rb") as f:
+        state = f.read()
+
+    codec = core._default_json_codec()
+    codecs = [("stdlib", json.loads, json.dumps)]
+    if codec.loads is not json.loads:
+        codecs.append((codec.loads.__module__, codec.loads, codec.dumps))
+    else:
+        print("No faster JSON library installed (try orjson or ujson).")
+
+    payloads = [
+        ("client state ({} KB)".format(len(state) // 1024), state, 50),
+        ("rtiResult response", RESULT_RESPONSE, 20000),
+        ("monitor status", MONITOR_JSON, 20000),
+    ]
+    for label, payload, number in payloads:
+        print(label)
+        times = [bench(n, lo, du, payload, number) for n, lo, du in codecs]
+        if len(times) > 1:
+            print(
+                "  speedup          loads {:8.1f}x    dumps {:8.1f}x".format(
+                    times[0][0] / times[1][0], times[0][1] / times[1][1]
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
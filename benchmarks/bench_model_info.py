@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks for `ModelInfo` lookups.
+
+Each lookup is timed twice: "uncompiled" runs the code every lookup
+used before values were compiled (`LegacyModelInfo`, a copy of it), and
+"compiled" goes through the cached `ValueInfo`. Run from the repository
+root:
+
+    $ python3 -m benchmarks.bench_model_info
+"""
+import timeit
+
+from wideq import core
+from wideq.client import (
+    BitValue,
+    EnumValue,
+    ModelInfo,
+    RangeValue,
+    ReferenceValue,
+    StringValue,
+)
+
+FIXTURE = "tests/fixtures/client.json"
+NUMBER = 100000
+
+
+class LegacyModelInfo(object):
+    """The lookups of `ModelInfo` before values were compiled."""
+
+    def __init__(self, data):
+        self.data = data
+
+    def value(self, name):
+        d = self.data["Value"][name]
+        if d["type"] in ("Enum", "enum"):
+            return EnumValue(d["option"])
+        elif d["type"] == "Range":
+            return RangeValue(
+                d["option"]["min"],
+                d["option"]["max"],
+                d["option"].get("step", 1),
+            )
+        elif d["type"].lower() == "bit":
+            bit_values = {opt["startbit"]: opt["value"] for opt in d["option"]}
+            return BitValue(bit_values)
+        elif d["type"].lower() == "reference":
+            ref = d["option"][0]
+            return ReferenceValue(self.data[ref])
+        elif d["type"].lower() == "string":
+            return StringValue(d.get("_comment", ""))
+        else:
+            raise ValueError(f"unsupported value name: '{name}'")
+
+    def enum_value(self, key, name):
+        options = self.value(key).options
+        options_inv = {v: k for k, v in options.items()}
+        return options_inv[name]
+
+    def enum_name(self, key, value):
+        options = self.value(key).options
+        if value not in options:
+            return "Unknown"
+        return options[value]
+
+    def reference_name(self, key, value):
+        value = str(value)
+        reference = self.value(key).reference
+        if value in reference:
+            return reference[value]["_comment"]
+        return None
+
+
+def time_call(func):
+    return min(timeit.repeat(func, number=NUMBER, repeat=5)) / NUMBER * 1e6
+
+
+def main():
+    with open(FIXTURE, "rb") as f:
+        state = core.json_loads(f.read())
+    data = next(
+        data
+        for url, data in state["model_info"].items()
+        if "RV13B6ES" in url
+    )
+    model = ModelInfo(data).compile()
+    legacy = LegacyModelInfo(data)
+
+    state_name = model.value("State").options["50"]
+    cases = [
+        (
+            "value('DryLevel')",
+            lambda: legacy.value("DryLevel"),
+            lambda: model.value("DryLevel"),
+        ),
+        (
+            "enum_name('State')",
+            lambda: legacy.enum_name("State", "50"),
+            lambda: model.enum_name("State", "50"),
+        ),
+        (
+            "enum_value('State')",
+            lambda: legacy.enum_value("State", state_name),
+            lambda: model.enum_value("State", state_name),
+        ),
+        (
+            "reference_name('Course')",
+            lambda: legacy.reference_name("Course", "2"),
+            lambda: model.reference_name("Course", "2"),
+        ),
+    ]
+
+    print("{:<28} {:>12} {:>12} {:>9}".format("", "uncompiled", "compiled", ""))
+    for name, uncompiled, compiled in cases:
+        before = time_call(uncompiled)
+        after = time_call(compiled)
+        print(
+            "{:<28} {:>9.3f} us {:>9.3f} us {:>8.1f}x".format(
+                name, before, after, before / after
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Benchmark decoding of binary monitoring frames.
+
+Compares the byte-at-a-time protocol walk with the compiled
+`BinaryDecoder`, for single frames and for batches, and with the NumPy
+column decoder in `wideq.frames` when NumPy is installed. Run from the
+repository root:
+
+    $ python3 -m benchmarks.bench_monitor_decode
+"""
+import os
+import timeit
+
+from wideq import core
+from wideq.client import ModelInfo
+
+try:
+    from wideq import frames as np_frames
+except ImportError:
+    np_frames = None  # type: ignore
+
+FIXTURE = "tests/fixtures/client.json"
+BATCH = 1000
+
+
+def decode_uncompiled(model, data):
+    decoded = {}
+    for item in model.data["Monitoring"]["protocol"]:
+        key = item["value"]
+        value = 0
+        for v in data[item["startByte"] : item["startByte"] + item["length"]]:
+            value = (value << 8) + v
+        decoded[key] = str(value)
+    return decoded
+
+
+def main():
+    with open(FIXTURE, "rb") as f:
+        state = core.json_loads(f.read())
+
+    for url, data in state["model_info"].items():
+        model = ModelInfo(data)
+        if not model.binary_monitor_data:
+            continue
+        name = url.split("modelName=")[1].split("&")[0]
+        frames = [os.urandom(24) for _ in range(BATCH)]
+
+        before = min(
+            timeit.repeat(
+                lambda: [decode_uncompiled(model, f) for f in frames],
+                number=10,
+            )
+        )
+        single = min(
+            timeit.repeat(
+                lambda: [model.decode_monitor(f) for f in frames], number=10
+            )
+        )
+        batch = min(
+            timeit.repeat(lambda: model.decode_many(frames), number=10)
+        )
+        per_frame = 1e6 / (10 * BATCH)
+        print(
+            "{:<22} uncompiled {:6.2f} us  compiled {:6.2f} us  "
+            "decode_many {:6.2f} us  ({:.1f}x)".format(
+                name,
+                before * per_frame,
+                single * per_frame,
+                batch * per_frame,
+                before / batch,
+            )
+        )
+
+        if np_frames:
+            buffer = np_frames.pack_frames(frames, 24)
+            columns = min(
+                timeit.repeat(
+                    lambda: np_frames.decode_frames(model, buffer, 24),
+                    number=10,
+                )
+            )
+            print(
+                "{:<22} numpy columns {:6.3f} us  ({:.0f}x)".format(
+                    "", columns * per_frame, before / columns
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 
 import wideq
-import json
 import time
 import argparse
 import sys
@@ -39,43 +38,26 @@ def gen_mon(client, device_id):
     displaying generic information about its status.
     """
 
-    device = client.get_device(device_id)
-    model = client.model_info(device)
-
-    with wideq.Monitor(client.session, device_id) as mon:
-        try:
-            while True:
-                time.sleep(1)
-                print("Polling...")
-                data = mon.poll()
-                if data:
-                    try:
-                        res = model.decode_monitor(data)
-                    except ValueError:
-                        print("status data: {!r}".format(data))
-                    else:
-                        for key, value in res.items():
-                            try:
-                                desc = model.value(key)
-                            except KeyError:
-                                print("- {}: {}".format(key, value))
-                            if isinstance(desc, wideq.EnumValue):
-                                print(
-                                    "- {}: {}".format(
-                                        key, desc.options.get(value, value)
-                                    )
-                                )
-                            elif isinstance(desc, wideq.RangeValue):
-                                print(
-                                    "- {0}: {1} ({2.min}-{2.max})".format(
-                                        key,
-                                        value,
-                                        desc,
-                                    )
-                                )
-
-        except KeyboardInterrupt:
-            pass
+    device = wideq.Device(client, _force_device(client, device_id))
+    scheduler = wideq.PollScheduler()
+    device.monitor_start()
+    try:
+        while True:
+            print("Polling...")
+            try:
+                status = device.poll(snapshot=True)
+            except ValueError as exc:
+                print("could not decode status data: {}".format(exc))
+                status = None
+            if status:
+                for key, value in status.to_dict().items():
+                    print("- {}: {}".format(key, value))
+            time.sleep(scheduler.interval(device, status))
+
+    except KeyboardInterrupt:
+        pass
+    finally:
+        device.monitor_stop()
 
 
 def ac_mon(ac):
@@ -89,9 +71,9 @@ def ac_mon(ac):
         print("Device not available.")
         return
 
+    scheduler = wideq.PollScheduler()
     try:
         while True:
-            time.sleep(1)
             state = ac.poll()
             if state:
                 print(
@@ -104,7 +86,8 @@ def ac_mon(ac):
                     )
                 )
             else:
-                print("no state. Wait 1 more second.")
+                print("no state yet.")
+            time.sleep(scheduler.interval(ac, state))
 
     except KeyboardInterrupt:
         pass
@@ -229,14 +212,14 @@ def example(
     try:
         with open(STATE_FILE) as f:
             LOGGER.debug("State file found '%s'", os.path.abspath(STATE_FILE))
-            state = json.load(f)
+            state = wideq.json_loads(f.read())
     except IOError:
         state = {}
         LOGGER.debug(
             "No state file found (tried: '%s')", os.path.abspath(STATE_FILE)
         )
 
-    client = wideq.Client.load(state)
+    client = wideq.Client.load(state, model_cache=wideq.ModelInfoCache())
     if country:
         client._country = country
     if language:
@@ -246,24 +229,18 @@ def example(
     if not client._auth:
         client._auth = authenticate(client.gateway)
 
-    # Loop to retry if session has expired.
-    while True:
-        try:
-            example_command(client, cmd, args)
-            break
-
-        except wideq.NotLoggedInError:
-            LOGGER.info("Session expired.")
-            client.refresh()
-
-        except UserError as exc:
-            LOGGER.error(exc.msg)
-            sys.exit(1)
+    # Refresh and retry if the session has expired.
+    auth_manager = wideq.AuthManager(client)
+    try:
+        auth_manager.call(example_command, client, cmd, args)
+    except UserError as exc:
+        LOGGER.error(exc.msg)
+        sys.exit(1)
 
     # Save the updated state.
     state = client.dump()
     with open(STATE_FILE, "w") as f:
-        json.dump(state, f)
+        f.write(wideq.json_dumps(state))
         LOGGER.debug("Wrote state file '%s'", os.path.abspath(STATE_FILE))
 
 
@@ -0,0 +1,196 @@
+import asyncio
+import base64
+import functools
+import json
+import unittest
+from unittest import mock
+
+try:
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+
+    from wideq.aio import AsyncClient, AsyncMonitor, AsyncSession
+except ImportError:  # aiohttp is an optional dependency.
+    web = None  # type: ignore
+
+import wideq.core
+from wideq.client import MonitorState
+
+
+STATUS = {"TempCur": "21", "OpMode": "0"}
+
+
+def async_test(func):
+    """Run a coroutine test method on the test case's event loop."""
+
+    @functools.wraps(func)
+    def wrapper(self, *args):
+        return self.loop.run_until_complete(func(self, *args))
+
+    return wrapper
+
+
+@unittest.skipIf(web is None, "aiohttp is not installed")
+class AsyncSessionTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        # IsolatedAsyncioTestCase needs Python 3.8.
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self.async_set_up())
+
+    def tearDown(self):
+        self.loop.run_until_complete(self.async_tear_down())
+        self.loop.close()
+        asyncio.set_event_loop(None)
+        super().tearDown()
+
+    async def async_set_up(self):
+        self.requests = []
+        self.results = []
+        self.statuses = []
+
+        async def handler(request):
+            body = await request.json()
+            self.requests.append((request.path, body["lgedmRoot"]))
+            if self.statuses:
+                out = {"returnCd": "0100", "returnMsg": "Busy"}
+                return web.json_response(
+                    {"lgedmRoot": out}, status=self.statuses.pop(0)
+                )
+            if request.path.endswith("rti/rtiMon"):
+                out = {"returnCd": "0000", "workId": "work-1"}
+            elif request.path.endswith("rti/rtiResult"):
+                out = {"returnCd": "0000", "workList": self.results.pop(0)}
+            else:
+                out = {
+                    "returnCd": "0000",
+                    "item": [{"deviceId": "dev-1"}],
+                    "jsessionId": "session-2",
+                }
+            return web.json_response({"lgedmRoot": out})
+
+        app = web.Application()
+        app.router.add_post("/api/{path:.*}", handler)
+        self.server = TestServer(app)
+        await self.server.start_server()
+
+        gateway = wideq.core.Gateway(
+            "https://us.m.lgaccount.com",
+            str(self.server.make_url("/api")),
+            "https://us.lgeapi.com",
+            "US",
+            "en-US",
+        )
+        auth = wideq.core.Auth(gateway, "access", "refresh")
+        self.session = AsyncSession(auth, "session-id")
+
+    async def async_tear_down(self):
+        await self.session.close()
+        await self.server.close()
+
+    @async_test
+    async def test_get_devices(self):
+        devices = await self.session.get_devices()
+        self.assertEqual([{"deviceId": "dev-1"}], devices)
+        self.assertEqual("/api/device/deviceList", self.requests[0][0])
+
+    @mock.patch("wideq.core.RETRY_FACTOR", 0)
+    @async_test
+    async def test_reads_retried(self):
+        self.statuses = [503, 502]
+        self.results = [{"deviceId": "dev-1", "workId": "work-1"}]
+        self.assertIsNone(await self.session.monitor_poll("dev-1", "work-1"))
+        self.assertEqual(3, len(self.requests))
+
+    @mock.patch("wideq.core.RETRY_FACTOR", 0)
+    @async_test
+    async def test_commands_not_retried(self):
+        self.statuses = [503, 503]
+        with self.assertRaises(wideq.core.FailedRequestError):
+            await self.session.set_device_controls("dev-1", {"Power": "On"})
+        self.assertEqual(1, len(self.requests))
+
+    @async_test
+    async def test_monitor(self):
+        payload = base64.b64encode(json.dumps(STATUS).encode()).decode()
+        self.results = [
+            {"deviceId": "dev-1", "workId": "work-1"},
+            {"deviceId": "dev-1", "returnCode": "0000", "returnData": payload},
+        ]
+        async with AsyncMonitor(self.session, "dev-1") as mon:
+            self.assertEqual("work-1", mon.work_id)
+            self.assertIsNone(await mon.poll())
+            self.assertEqual(STATUS, await mon.poll_json())
+
+        commands = [body.get("cmdOpt") for _, body in self.requests]
+        self.assertEqual(["Start", None, None, "Stop"], commands)
+
+    @async_test
+    async def test_monitor_restarts_on_error(self):
+        self.results = [
+            {"deviceId": "dev-1", "workId": "work-1", "returnCode": "0106"},
+        ]
+        mon = AsyncMonitor(self.session, "dev-1")
+        await mon.start()
+        self.assertIsNone(await mon.poll())
+        await mon.stopping
+        self.assertEqual(MonitorState.RUNNING, mon.state)
+        self.assertEqual(1, mon.failures)
+
+        commands = [body.get("cmdOpt") for _, body in self.requests]
+        self.assertCountEqual(["Start", None, "Stop", "Start"], commands)
+
+    @async_test
+    async def test_monitor_backs_off(self):
+        failure = {
+            "deviceId": "dev-1",
+            "workId": "work-1",
+            "returnCode": "0106",
+        }
+        self.results = [failure, dict(failure)]
+        mon = AsyncMonitor(self.session, "dev-1")
+        await mon.start()
+        self.assertIsNone(await mon.poll())
+        self.assertIsNone(await mon.poll())
+        await mon.stopping
+        self.assertEqual(MonitorState.BACKOFF, mon.state)
+        self.assertEqual(2, mon.failures)
+
+        calls = len(self.requests)
+        self.assertIsNone(await mon.poll())
+        self.assertEqual(calls, len(self.requests))
+
+    @async_test
+    async def test_client_round_trips_state(self):
+        client = AsyncClient.load(
+            {
+                "gateway": self.session.auth.gateway.serialize(),
+                "auth": self.session.auth.serialize(),
+                "session": "session-id",
+            }
+        )
+        self.assertEqual("session-id", (await client.get_session()).session_id)
+        self.assertEqual(["dev-1"], [d.id for d in await client.get_devices()])
+        self.assertEqual("session-id", client.dump()["session"])
+        await client.close()
+
+    @async_test
+    async def test_refresh_updates_session_in_place(self):
+        async def refresh_auth(http, oauth_root, refresh_token):
+            return "access-2"
+
+        client = AsyncClient.load(
+            {
+                "gateway": self.session.auth.gateway.serialize(),
+                "auth": self.session.auth.serialize(),
+                "session": "session-id",
+            }
+        )
+        session = await client.get_session()
+        with mock.patch("wideq.aio.refresh_auth", refresh_auth):
+            await client.refresh()
+        self.assertIs(session, await client.get_session())
+        self.assertEqual("session-2", session.session_id)
+        self.assertEqual("access-2", session.auth.access_token)
+        await client.close()
@@ -1,11 +1,30 @@
+import copy
+import enum
+import os
+import tempfile
+import threading
+import time
 import unittest
+from unittest import mock
 
+import responses
+
+from wideq.core import ModelInfoCache, NotLoggedInError
 from wideq.client import (
+    AuthManager,
+    BinaryDecoder,
+    BitField,
     BitValue,
+    Client,
+    Device,
+    DeviceInfo,
     EnumValue,
+    LazyFrame,
     ModelInfo,
+    ModelRegistry,
     RangeValue,
     ReferenceValue,
+    RegistryStats,
     StringValue,
 )
 
@@ -149,3 +168,471 @@ class ModelInfoTest(unittest.TestCase):
             f" type: 'Unexpected' data: '{data}",
         ):
             self.model_info.value("Unexpected2")
+
+    def test_value_compiled_once(self):
+        first = self.model_info.value("AntiBacterial")
+        self.assertIs(first, self.model_info.value("AntiBacterial"))
+
+    def test_enum_value(self):
+        self.assertEqual(
+            "1", self.model_info.enum_value("AntiBacterial", "@CP_ON_EN_W")
+        )
+        with self.assertRaises(KeyError):
+            self.model_info.enum_value("AntiBacterial", "@CP_MISSING_W")
+
+    def test_enum_member(self):
+        class Switch(enum.Enum):
+            OFF = "@CP_OFF_EN_W"
+            UNKNOWN = "Unknown"
+
+        class Strict(enum.Enum):
+            ON = "@CP_ON_EN_W"
+
+        table = self.model_info.enum_table("AntiBacterial", Switch)
+        self.assertEqual({"0": Switch.OFF}, table)
+        self.assertIs(
+            table, self.model_info.enum_table("AntiBacterial", Switch)
+        )
+        self.assertEqual(
+            Switch.OFF,
+            self.model_info.enum_member("AntiBacterial", "0", Switch),
+        )
+        with mock.patch("wideq.client.LOGGER") as mock_logging:
+            self.assertEqual(
+                Switch.UNKNOWN,
+                self.model_info.enum_member("AntiBacterial", "7", Switch),
+            )
+        self.assertTrue(mock_logging.warning.called)
+
+        self.assertEqual(
+            Strict.ON,
+            self.model_info.enum_member("AntiBacterial", "1", Strict),
+        )
+        with self.assertRaises(ValueError):
+            self.model_info.enum_member("AntiBacterial", "0", Strict)
+
+    def test_reference_name(self):
+        self.assertEqual("Normal", self.model_info.reference_name("Course", 3))
+        self.assertIsNone(self.model_info.reference_name("Course", 4))
+
+    def test_bit_fields(self):
+        fields = self.model_info.bit_fields("Option1")
+        self.assertEqual(BitField("ChildLock", 0, 1), fields[0])
+        self.assertEqual(BitField("AntiBacterial", 7, 1), fields[-1])
+        with self.assertRaises(ValueError):
+            self.model_info.bit_fields("AntiBacterial")
+
+    def test_decode_bits(self):
+        self.assertEqual(
+            {
+                "ChildLock": 1,
+                "ReduceStatic": 0,
+                "EasyIron": 0,
+                "DampDrySingal": 0,
+                "WrinkleCare": 0,
+                "AntiBacterial": 1,
+            },
+            self.model_info.decode_bits("Option1", "129"),
+        )
+
+    def test_decode_bits_multi_bit_field(self):
+        data = copy.deepcopy(DATA)
+        data["Value"]["Option1"]["option"][1]["length"] = 2
+        model_info = ModelInfo(data)
+        bits = model_info.decode_bits("Option1", 0b111)
+        self.assertEqual(1, bits["ChildLock"])
+        self.assertEqual(3, bits["ReduceStatic"])
+
+    def test_decode_options(self):
+        self.assertEqual(("Option1",), self.model_info.bit_keys)
+        options = self.model_info.decode_options({"Option1": "16"})
+        self.assertEqual(1, options["WrinkleCare"])
+        self.assertEqual({}, self.model_info.decode_options({}))
+
+    def test_formatter(self):
+        fmt = self.model_info.formatter
+        self.assertIs(fmt("AntiBacterial"), fmt("AntiBacterial"))
+        self.assertEqual("@CP_ON_EN_W", fmt("AntiBacterial")("1"))
+        self.assertEqual("7", fmt("AntiBacterial")("7"))
+        self.assertEqual(12, fmt("Initial_Time_H")("12"))
+        self.assertEqual(1.5, fmt("Initial_Time_H")("1.5"))
+        self.assertEqual("-", fmt("Initial_Time_H")("-"))
+        self.assertEqual(1, fmt("Option1")("1")["ChildLock"])
+        self.assertEqual("Normal", fmt("Course")("3"))
+        self.assertEqual("4", fmt("Course")("4"))
+        self.assertEqual("0030", fmt("TimeBsOn")("0030"))
+        self.assertEqual("x", fmt("Unexpected")("x"))
+        self.assertEqual("x", fmt("Missing")("x"))
+
+    def test_compile_skips_unsupported(self):
+        self.assertIs(self.model_info, self.model_info.compile())
+        self.assertIn("Option1", self.model_info._values)
+        self.assertNotIn("Unexpected", self.model_info._values)
+        with self.assertRaises(ValueError):
+            self.model_info.value("Unexpected")
+
+
+class DeviceControlsTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = mock.Mock()
+        self.client.model_info.return_value = ModelInfo(DATA)
+        self.device = Device(self.client, DeviceInfo({"deviceId": "dev-1"}))
+        self.set_controls = self.client.session.set_device_controls
+
+    def test_set_control_without_batch(self):
+        self.device._set_control("TempCfg", 21)
+        self.set_controls.assert_called_once_with("dev-1", {"TempCfg": 21})
+
+    def test_controls_coalesces_changes(self):
+        with self.device.controls() as c:
+            c._set_control("OpMode", "0")
+            c._set_control("WindStrength", "4")
+            with c.controls():
+                c._set_control("TempCfg", 20)
+            c._set_control("TempCfg", 21)
+            self.set_controls.assert_not_called()
+        self.set_controls.assert_called_once_with(
+            "dev-1", {"OpMode": "0", "WindStrength": "4", "TempCfg": 21}
+        )
+
+    def test_controls_discarded_on_error(self):
+        with self.assertRaises(RuntimeError):
+            with self.device.controls() as c:
+                c._set_control("OpMode", "0")
+                raise RuntimeError()
+        self.set_controls.assert_not_called()
+        self.device._set_control("OpMode", "1")
+        self.set_controls.assert_called_once_with("dev-1", {"OpMode": "1"})
+
+
+class AuthManagerTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = mock.Mock()
+        self.manager = AuthManager(self.client, lifetime=60, margin=10)
+
+    def test_call_replays_after_refresh(self):
+        func = mock.Mock(side_effect=[NotLoggedInError("0102", ""), "ok"])
+        self.assertEqual("ok", self.manager.call(func, 1, key=2))
+        self.client.refresh.assert_called_once_with()
+        self.assertEqual(2, func.call_count)
+        func.assert_called_with(1, key=2)
+
+    def test_call_refreshes_expiring_token(self):
+        self.manager.refreshed_at -= 55
+        self.assertTrue(self.manager.expiring)
+        self.manager.call(mock.Mock())
+        self.client.refresh.assert_called_once_with()
+        self.assertFalse(self.manager.expiring)
+
+    def test_concurrent_refreshes_are_single_flight(self):
+        barrier = threading.Barrier(4)
+        self.client.refresh.side_effect = lambda: time.sleep(0.05)
+
+        def expired():
+            generation = self.manager.generation
+            barrier.wait()
+            self.manager.refresh(generation)
+
+        threads = [threading.Thread(target=expired) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.client.refresh.assert_called_once_with()
+        self.assertEqual(1, self.manager.generation)
+
+
+def decode_reference(protocol, data):
+    """The byte-at-a-time decoding the compiled decoder replaces."""
+    decoded = {}
+    for item in protocol:
+        value = 0
+        for v in data[item["startByte"] : item["startByte"] + item["length"]]:
+            value = (value << 8) + v
+        decoded[item["value"]] = str(value)
+    return decoded
+
+
+class BinaryDecoderTest(unittest.TestCase):
+    PROTOCOL = [
+        {"value": "State", "startByte": 0, "length": 1},
+        {"value": "Remain", "startByte": 1, "length": 2},
+        {"value": "Course", "startByte": 5, "length": 1},
+        {"value": "Counter", "startByte": 6, "length": 4},
+    ]
+    FRAME = bytes(range(1, 13))
+
+    def test_struct_decoder(self):
+        decoder = BinaryDecoder(self.PROTOCOL)
+        self.assertIsNotNone(decoder.struct)
+        self.assertEqual(
+            decode_reference(self.PROTOCOL, self.FRAME),
+            decoder.decode(self.FRAME),
+        )
+
+    def test_single_byte_fields(self):
+        protocol = [
+            {"value": str(i), "startByte": i, "length": 1} for i in range(4)
+        ]
+        frame = bytes([0, 9, 128, 255])
+        self.assertEqual(
+            {"0": "0", "1": "9", "2": "128", "3": "255"},
+            BinaryDecoder(protocol).decode(frame),
+        )
+
+    def test_fallback_for_odd_sizes_and_overlaps(self):
+        protocol = self.PROTOCOL + [
+            {"value": "Odd", "startByte": 2, "length": 3},
+        ]
+        decoder = BinaryDecoder(protocol)
+        self.assertIsNone(decoder.struct)
+        self.assertEqual(
+            decode_reference(protocol, self.FRAME), decoder.decode(self.FRAME)
+        )
+
+    def test_short_frame(self):
+        decoder = BinaryDecoder(self.PROTOCOL)
+        frame = self.FRAME[:7]
+        self.assertEqual(
+            decode_reference(self.PROTOCOL, frame), decoder.decode(frame)
+        )
+
+    def test_decode_fields(self):
+        decoder = BinaryDecoder(self.PROTOCOL)
+        expected = decode_reference(self.PROTOCOL, self.FRAME)
+        self.assertEqual(
+            {"Remain": expected["Remain"], "State": expected["State"]},
+            decoder.decode_fields(self.FRAME, ["Remain", "State", "Missing"]),
+        )
+
+    def test_lazy_frame(self):
+        decoder = BinaryDecoder(self.PROTOCOL)
+        frame = LazyFrame(decoder, self.FRAME)
+        self.assertEqual({}, frame._values)
+        self.assertEqual("6", frame["Course"])
+        self.assertEqual({"Course": "6"}, frame._values)
+        self.assertIn("Counter", frame)
+        self.assertNotIn("Missing", frame)
+        with self.assertRaises(KeyError):
+            frame["Missing"]
+        self.assertEqual(decoder.decode(self.FRAME), dict(frame))
+
+    def test_decode_monitor_projection(self):
+        model = ModelInfo(
+            {
+                "Monitoring": {
+                    "type": "BINARY(BYTE)",
+                    "protocol": self.PROTOCOL,
+                }
+            }
+        )
+        self.assertEqual(
+            {"State": "1"}, model.decode_monitor(self.FRAME, ["State"])
+        )
+        lazy = model.decode_monitor(self.FRAME, lazy=True)
+        self.assertIsInstance(lazy, LazyFrame)
+        self.assertEqual(model.decode_monitor(self.FRAME), dict(lazy))
+
+        model = ModelInfo({"Monitoring": {"type": "JSON"}})
+        self.assertEqual(
+            {"State": "1"},
+            model.decode_monitor(b'{"State": "1", "Course": "2"}', ["State"]),
+        )
+
+    def test_decode_many(self):
+        model = ModelInfo(
+            {
+                "Monitoring": {
+                    "type": "BINARY(BYTE)",
+                    "protocol": self.PROTOCOL,
+                }
+            }
+        )
+        frames = [self.FRAME, bytes(12)]
+        self.assertEqual(
+            [decode_reference(self.PROTOCOL, f) for f in frames],
+            model.decode_many(frames),
+        )
+
+
+class ModelRegistryTest(unittest.TestCase):
+    URL = "https://aic.lgthinq.com:46030/api/webContents/modelJSON?model=A"
+
+    def test_clients_share_models(self):
+        registry = ModelRegistry()
+        device = DeviceInfo({"modelJsonUrl": self.URL})
+        clients = [Client(registry=registry) for _ in range(3)]
+        for client in clients:
+            # Each client has its own copy of the same JSON.
+            client._model_info[self.URL] = copy.deepcopy(DATA)
+
+        models = [client.model_info(device) for client in clients]
+        self.assertIs(models[0], models[1])
+        self.assertIs(models[0], models[2])
+        self.assertIs(models[0].data, clients[2]._model_info[self.URL])
+        self.assertEqual(RegistryStats(2, 1, 0, 1), registry.stats)
+
+        # Repeated lookups on a client skip the registry.
+        clients[0].model_info(device)
+        self.assertEqual(2, registry.stats.hits)
+
+    def test_changed_content_is_a_new_model(self):
+        registry = ModelRegistry()
+        changed = copy.deepcopy(DATA)
+        changed["Value"]["Course"]["option"] = ["Other"]
+        self.assertIsNot(
+            registry.get(self.URL, DATA), registry.get(self.URL, changed)
+        )
+
+    def test_lru_eviction(self):
+        registry = ModelRegistry(maxsize=2)
+        first = registry.get("a", DATA)
+        registry.get("b", DATA)
+        registry.get("a", DATA)
+        registry.get("c", DATA)
+        self.assertEqual(RegistryStats(1, 3, 1, 2), registry.stats)
+        self.assertIs(first, registry.get("a", DATA))
+        registry.get("b", DATA)  # Evicted, so loaded again.
+        self.assertEqual(RegistryStats(2, 4, 2, 2), registry.stats)
+
+
+class ModelInfoCacheTest(unittest.TestCase):
+    URL = "https://aic.lgthinq.com:46030/api/webContents/modelJSON?model=A"
+
+    def setUp(self):
+        super().setUp()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ModelInfoCache(self.tmp.name)
+        self.device = DeviceInfo({"modelJsonUrl": self.URL})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        super().tearDown()
+
+    def test_state_excludes_cached_models(self):
+        client = Client(registry=ModelRegistry(), model_cache=self.cache)
+        with mock.patch(
+            "wideq.core.fetch_model_info", return_value=(DATA, {})
+        ) as fetch:
+            client.model_info(self.device)
+        fetch.assert_called_once_with(self.URL, client.transport)
+        self.assertNotIn("model_info", client.dump())
+
+        # A fresh client loads the model lazily from the cache.
+        loaded = Client.load(
+            client.dump(), registry=ModelRegistry(), model_cache=self.cache
+        )
+        self.assertEqual({}, loaded._model_info)
+        with mock.patch("wideq.core.fetch_model_info") as fetch:
+            model = loaded.model_info(self.device)
+        fetch.assert_not_called()
+        self.assertEqual(DATA, model.data)
+
+    def test_dump_moves_inline_models_to_cache(self):
+        client = Client.load({"model_info": {self.URL: DATA}})
+        client._model_cache = self.cache
+        self.assertNotIn("model_info", client.dump())
+        self.assertEqual(DATA, self.cache.get(self.URL))
+
+    def test_identical_content_is_stored_once(self):
+        self.cache.put(self.URL, DATA)
+        self.cache.put(self.URL + "&country=NO", copy.deepcopy(DATA))
+        blobs = os.listdir(os.path.join(self.tmp.name, "blobs"))
+        self.assertEqual(1, len(blobs))
+        self.assertTrue(blobs[0].endswith(".json.gz"))
+        self.assertEqual(DATA, self.cache.get(self.URL + "&country=NO"))
+        self.assertIsNone(self.cache.get(self.URL + "&country=SE"))
+
+    def test_key_order_does_not_change_digest(self):
+        self.cache.put(self.URL, DATA)
+        reordered = dict(reversed(list(DATA.items())))
+        self.cache.put(self.URL + "&country=NO", reordered)
+        self.assertEqual(
+            self.cache.entry(self.URL)["digest"],
+            self.cache.entry(self.URL + "&country=NO")["digest"],
+        )
+        self.assertEqual(
+            1, len(os.listdir(os.path.join(self.tmp.name, "blobs")))
+        )
+
+
+class PrefetchModelInfoTest(unittest.TestCase):
+    URLS = [
+        "https://aic.lgthinq.com:46030/api/webContents/modelJSON?model=A",
+        "https://aic.lgthinq.com:46030/api/webContents/modelJSON?model=B",
+    ]
+
+    def setUp(self):
+        super().setUp()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ModelInfoCache(self.tmp.name)
+        self.devices = [
+            DeviceInfo({"modelJsonUrl": url}) for url in self.URLS * 2
+        ]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        super().tearDown()
+
+    def client(self):
+        return Client(registry=ModelRegistry(), model_cache=self.cache)
+
+    @responses.activate
+    def test_fetches_each_model_once(self):
+        for url in self.URLS:
+            responses.add(
+                responses.GET, url, json=DATA, headers={"ETag": '"v1"'}
+            )
+        models = self.client().prefetch_model_info(self.devices)
+        self.assertEqual(set(self.URLS), set(models))
+        self.assertEqual(2, len(responses.calls))
+        self.assertEqual('"v1"', self.cache.entry(self.URLS[0])["etag"])
+
+        # Cached models are not downloaded again.
+        self.client().prefetch_model_info(self.devices)
+        self.assertEqual(2, len(responses.calls))
+
+    @responses.activate
+    def test_revalidates_cached_models(self):
+        self.cache.put(self.URLS[0], DATA, etag='"v1"', last_modified=None)
+        changed = dict(DATA, Course={})
+        responses.add(responses.GET, self.URLS[0], status=304)
+        responses.add(
+            responses.GET, self.URLS[1], json=changed, headers={"ETag": '"v2"'}
+        )
+
+        models = self.client().prefetch_model_info(
+            self.devices, revalidate=True
+        )
+        self.assertEqual(DATA, models[self.URLS[0]].data)
+        self.assertEqual(changed, models[self.URLS[1]].data)
+        headers = {
+            call.request.url: call.request.headers for call in responses.calls
+        }
+        self.assertEqual('"v1"', headers[self.URLS[0]]["If-None-Match"])
+        self.assertNotIn("If-None-Match", headers[self.URLS[1]])
+
+    def test_transport_created_once(self):
+        client = self.client()
+        barrier = threading.Barrier(4)
+
+        def make_transport():
+            time.sleep(0.01)
+            return mock.Mock()
+
+        with mock.patch(
+            "wideq.core.Transport", side_effect=make_transport
+        ) as transport:
+
+            def get():
+                barrier.wait()
+                return client.transport
+
+            threads = [threading.Thread(target=get) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        transport.assert_called_once_with()
@@ -1,4 +1,11 @@
+import json
+import os
+import tempfile
+import time
 import unittest
+from unittest import mock
+
+import requests
 import responses
 
 import wideq.core
@@ -58,3 +65,238 @@ class SimpleTest(unittest.TestCase):
             gatewayInstance.api_root, "https://eic.lgthinq.com:46030/api"
         )
         self.assertEqual(gatewayInstance.oauth_root, "https://no.lgeapi.com")
+
+
+class TransportTest(unittest.TestCase):
+    @responses.activate
+    def test_session_reuses_gateway_transport(self):
+        responses.add(
+            responses.POST,
+            "https://aic.lgthinq.com:46030/api/device/deviceList",
+            json={"lgedmRoot": {"returnCd": "0000", "item": []}},
+        )
+        gateway = wideq.core.Gateway(
+            "https://us.m.lgaccount.com",
+            "https://aic.lgthinq.com:46030/api",
+            "https://us.lgeapi.com",
+            "US",
+            "en-US",
+        )
+        auth = wideq.core.Auth(gateway, "access", "refresh")
+        session = wideq.core.Session(auth, "session-id")
+
+        session.get_devices()
+        pooled = gateway.transport.session
+        session.get_devices()
+        self.assertEqual(len(responses.calls), 2)
+        self.assertIs(pooled, gateway.transport.session)
+
+    def test_close_and_context_manager(self):
+        with wideq.core.Transport(pool_size=4) as transport:
+            first = transport.session
+            adapter = first.get_adapter("https://aic.lgthinq.com")
+            self.assertEqual(adapter._pool_maxsize, 4)
+        self.assertIsNone(transport._session)
+        self.assertIsNot(first, transport.session)
+
+
+class RequestBudgetTest(unittest.TestCase):
+    URL = "https://aic.lgthinq.com:46030/api/device/deviceList"
+
+    def setUp(self):
+        super().setUp()
+        self.transport = wideq.core.Transport(retries=3, backoff_factor=0.01)
+
+    @responses.activate
+    def test_retries_connection_errors(self):
+        responses.add(
+            responses.POST, self.URL, body=requests.ConnectionError()
+        )
+        responses.add(
+            responses.POST,
+            self.URL,
+            json={"lgedmRoot": {"returnCd": "0000", "item": []}},
+        )
+        out = wideq.core.lgedm_post(
+            self.URL, transport=self.transport, idempotent=True
+        )
+        self.assertEqual([], out["item"])
+        self.assertEqual(len(responses.calls), 2)
+
+    @responses.activate
+    def test_post_not_retried_once_sent(self):
+        responses.add(responses.POST, self.URL, status=503)
+        responses.add(
+            responses.POST, self.URL, body=requests.ConnectionError()
+        )
+        self.assertEqual(503, self.transport.post(self.URL).status_code)
+        with self.assertRaises(requests.ConnectionError):
+            self.transport.post(self.URL)
+        self.assertEqual(len(responses.calls), 2)
+
+    @responses.activate
+    def test_post_retried_when_not_sent(self):
+        responses.add(
+            responses.POST, self.URL, body=requests.ConnectTimeout()
+        )
+        responses.add(
+            responses.POST,
+            self.URL,
+            json={"lgedmRoot": {"returnCd": "0000", "item": []}},
+        )
+        out = wideq.core.lgedm_post(self.URL, transport=self.transport)
+        self.assertEqual([], out["item"])
+        self.assertEqual(len(responses.calls), 2)
+
+    @responses.activate
+    def test_timeout_raises_deadline_exceeded(self):
+        responses.add(responses.POST, self.URL, body=requests.ReadTimeout())
+        with self.assertRaises(wideq.core.DeadlineExceededError) as cm:
+            wideq.core.lgedm_post(self.URL, transport=self.transport)
+        self.assertEqual(1, cm.exception.attempts)
+        self.assertIsInstance(cm.exception.__cause__, requests.Timeout)
+
+    @responses.activate
+    def test_deadline_bounds_retries(self):
+        responses.add(responses.POST, self.URL, status=503)
+        transport = wideq.core.Transport(retries=3, backoff_factor=0.05)
+        budget = wideq.core.RequestBudget(timeout=1, deadline=0.12)
+        with self.assertRaises(wideq.core.DeadlineExceededError) as cm:
+            wideq.core.lgedm_post(
+                self.URL, transport=transport, budget=budget, idempotent=True
+            )
+        self.assertEqual(cm.exception.attempts, len(responses.calls))
+        self.assertEqual(2, cm.exception.attempts)
+
+    @responses.activate
+    def test_session_endpoint_budget(self):
+        responses.add(
+            responses.POST,
+            self.URL,
+            json={"lgedmRoot": {"returnCd": "0000", "item": []}},
+        )
+        gateway = wideq.core.Gateway(
+            "https://us.m.lgaccount.com",
+            "https://aic.lgthinq.com:46030/api",
+            "https://us.lgeapi.com",
+            "US",
+            "en-US",
+            self.transport,
+        )
+        auth = wideq.core.Auth(gateway, "access", "refresh")
+        session = wideq.core.Session(
+            auth,
+            "session-id",
+            wideq.core.RequestBudget(5, 10),
+            {"device/deviceList": wideq.core.RequestBudget(2, None)},
+        )
+        with mock.patch.object(
+            self.transport, "post", wraps=self.transport.post
+        ) as post:
+            session.get_devices()
+        self.assertEqual(
+            wideq.core.RequestBudget(2, None), post.call_args[0][1]
+        )
+
+
+class JSONCodecTest(unittest.TestCase):
+    def tearDown(self):
+        wideq.core.set_json_codec()
+        super().tearDown()
+
+    def test_round_trip(self):
+        obj = {"alias": "세탁기", "items": [1, 2.5, None, True]}
+        text = wideq.core.json_dumps(obj)
+        self.assertIsInstance(text, str)
+        self.assertEqual(obj, wideq.core.json_loads(text))
+        self.assertEqual(obj, wideq.core.json_loads(text.encode("utf8")))
+
+    def test_content_hash_is_canonical(self):
+        a = {"b": [1, {"y": 2, "x": "세탁기"}], "a": None}
+        b = {"a": None, "b": [1, {"x": "세탁기", "y": 2}]}
+        self.assertEqual(
+            wideq.core.content_hash(a), wideq.core.content_hash(b)
+        )
+        wideq.core.set_json_codec(
+            wideq.core.JSONCodec(json.loads, lambda o: json.dumps(o, indent=2))
+        )
+        self.assertEqual(
+            wideq.core.content_hash(b), wideq.core.content_hash(a)
+        )
+        self.assertNotEqual(
+            wideq.core.content_hash(a), wideq.core.content_hash(dict(a, a=1))
+        )
+
+    def test_decode_error_is_value_error(self):
+        with self.assertRaises(ValueError):
+            wideq.core.json_loads(b"{not json")
+
+    @responses.activate
+    def test_custom_codec_used_for_requests(self):
+        url = "https://aic.lgthinq.com:46030/api/device/deviceList"
+        responses.add(
+            responses.POST,
+            url,
+            json={"lgedmRoot": {"returnCd": "0000", "alias": "세탁기"}},
+        )
+        loads = mock.Mock(wraps=json.loads)
+        dumps = mock.Mock(wraps=json.dumps)
+        wideq.core.set_json_codec(wideq.core.JSONCodec(loads, dumps))
+
+        out = wideq.core.lgedm_post(url, {"alias": "세탁기"})
+        self.assertEqual("세탁기", out["alias"])
+        loads.assert_called_once()
+        dumps.assert_called_once_with({"lgedmRoot": {"alias": "세탁기"}})
+        self.assertEqual(
+            {"lgedmRoot": {"alias": "세탁기"}},
+            json.loads(responses.calls[0].request.body),
+        )
+
+
+class GatewayCacheTest(unittest.TestCase):
+    GATEWAY = {
+        "lgedmRoot": {
+            "thinqUri": "https://aic.lgthinq.com:46030/api",
+            "empUri": "https://us.m.lgaccount.com",
+            "oauthUri": "https://us.lgeapi.com",
+            "countryCode": "US",
+            "langCode": "en-US",
+        }
+    }
+
+    def setUp(self):
+        super().setUp()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = wideq.core.GatewayCache(self.tmp.name, ttl=60)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        super().tearDown()
+
+    @responses.activate
+    def test_discover_reuses_cached_gateway(self):
+        responses.add(
+            responses.POST, wideq.core.GATEWAY_URL, json=self.GATEWAY
+        )
+        first = wideq.core.Gateway.discover("US", "en-US", cache=self.cache)
+        second = wideq.core.Gateway.discover("US", "en-US", cache=self.cache)
+        self.assertEqual(len(responses.calls), 1)
+        self.assertEqual(first.serialize(), second.serialize())
+
+        # Other locales are cached separately.
+        self.assertIsNone(self.cache.get("NO", "en-NO"))
+
+    @responses.activate
+    def test_expired_entry_is_rediscovered(self):
+        responses.add(
+            responses.POST, wideq.core.GATEWAY_URL, json=self.GATEWAY
+        )
+        wideq.core.Gateway.discover("US", "en-US", cache=self.cache)
+        with mock.patch("time.time", return_value=time.time() + 120):
+            wideq.core.Gateway.discover("US", "en-US", cache=self.cache)
+        self.assertEqual(len(responses.calls), 2)
+
+    def test_corrupt_entry_is_ignored(self):
+        with open(os.path.join(self.tmp.name, "US_en-US.json"), "w") as f:
+            f.write('{"time": ')
+        self.assertIsNone(self.cache.get("US", "en-US"))
@@ -4,6 +4,7 @@ import unittest
 from wideq.client import Client, DeviceInfo
 from wideq.dishwasher import (
     DishWasherDevice,
+    DishWasherProcess,
     DishWasherState,
     DishWasherStatus,
 )
@@ -62,3 +63,17 @@ class DishWasherStatusTest(unittest.TestCase):
         self.assertEqual("Heavy", status.course)
         self.assertEqual("Casseroles", status.smart_course)
         self.assertEqual("No Error", status.error)
+        self.assertFalse(status.child_lock)
+        self.assertFalse(status.door_open)
+        self.assertEqual(1, status.options["NightDry"])
+
+    def test_process(self):
+        status = DishWasherStatus(self.dishwasher, POLL_DATA)
+        self.assertEqual(DishWasherProcess.RUNNING, status.process)
+        self.assertEqual("Running", status.readable_process)
+
+        status = DishWasherStatus(
+            self.dishwasher, dict(POLL_DATA, Process="0")
+        )
+        self.assertIsNone(status.process)
+        self.assertEqual("", status.readable_process)
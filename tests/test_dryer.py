@@ -70,6 +70,18 @@ class DryerStatusTest(unittest.TestCase):
         self.assertEqual("No Error", status.error)
         self.assertEqual(TempControl.MID_HIGH, status.temperature_control)
         self.assertEqual(TimeDry.OFF, status.time_dry)
+        self.assertFalse(status.child_lock)
+        self.assertFalse(status.remote_start)
+
+    def test_options(self):
+        data = dict(POLL_DATA, Option1="129", Option2="1")
+        status = DryerStatus(self.dryer, data)
+        self.assertTrue(status.child_lock)
+        self.assertTrue(status.remote_start)
+        self.assertEqual(1, status.options["AntiBacterial"])
+        self.assertEqual(0, status.options["WrinkleCare"])
+        self.assertEqual("ON", status.get_bit("Option1", 7))
+        self.assertEqual("OFF", status.get_bit("Option1", 4))
 
     @mock.patch("wideq.client.LOGGER")
     def test_properties_unknown_enum_value(self, mock_logging):
@@ -0,0 +1,72 @@
+import json
+import os
+import unittest
+
+from wideq.client import ModelInfo
+
+try:
+    from wideq.frames import decode_frames, monitor_dtype, pack_frames
+except ImportError:  # numpy is an optional dependency.
+    decode_frames = None  # type: ignore
+
+
+PROTOCOL = [
+    {"value": "State", "startByte": 0, "length": 1},
+    {"value": "Remain", "startByte": 1, "length": 2},
+    {"value": "Course", "startByte": 3, "length": 1},
+    {"value": "Odd", "startByte": 4, "length": 3},
+]
+
+DATA = {
+    "Monitoring": {"type": "BINARY(BYTE)", "protocol": PROTOCOL},
+    "Value": {
+        "State": {"type": "Enum", "option": {"0": "@OFF", "1": "@ON"}},
+        "Remain": {"type": "Range", "option": {"min": 0, "max": 999}},
+        "Course": {"type": "Reference", "option": ["Course"]},
+    },
+    "Course": {"2": {"_comment": "Towels"}},
+}
+
+
+@unittest.skipIf(decode_frames is None, "numpy is not installed")
+class DecodeFramesTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.model = ModelInfo(DATA)
+
+    def test_dtype(self):
+        dtype = monitor_dtype(self.model, 8)
+        self.assertEqual(8, dtype.itemsize)
+        self.assertEqual(("State", "Remain", "Course", "Odd"), dtype.names)
+
+    def test_matches_per_frame_decoding(self):
+        frames = [os.urandom(7) for _ in range(50)]
+        columns = decode_frames(self.model, pack_frames(frames, 7))
+        for i, frame in enumerate(frames):
+            expected = self.model.decode_monitor(frame)
+            actual = {k: str(int(v[i])) for k, v in columns.items()}
+            self.assertEqual(expected, actual)
+
+    def test_labels(self):
+        frames = [b"\x01\x00\x05\x02", b"\x00\x00\x00\x03", b"\x07"]
+        columns = decode_frames(
+            self.model, pack_frames(frames, 7), labels=True
+        )
+        self.assertEqual(["@ON", "@OFF", "Unknown"], list(columns["State"]))
+        self.assertEqual(["Towels", None, None], list(columns["Course"]))
+        self.assertEqual([5, 0, 0], list(columns["Remain"]))
+
+    def test_fixture_models(self):
+        with open("./tests/fixtures/client.json") as fp:
+            state = json.load(fp)
+        for data in state["model_info"].values():
+            model = ModelInfo(data)
+            frames = [os.urandom(24) for _ in range(10)]
+            columns = decode_frames(model, pack_frames(frames, 24), 24)
+            self.assertEqual(
+                [model.decode_monitor(f) for f in frames],
+                [
+                    {k: str(int(v[i])) for k, v in columns.items()}
+                    for i in range(len(frames))
+                ],
+            )
@@ -0,0 +1,139 @@
+import enum
+import unittest
+from array import array
+
+from wideq.history import StatusHistory
+
+
+class State(enum.Enum):
+    ON = "on"
+    OFF = "off"
+
+
+class Sample(object):
+    def __init__(self, timestamp, remaining, state, temp=None):
+        self.timestamp = timestamp
+        self._remaining = remaining
+        self._state = state
+        self._temp = temp
+
+    @property
+    def remaining_time(self):
+        return self._remaining
+
+    @property
+    def state(self):
+        return self._state
+
+    @property
+    def is_on(self):
+        return self._state == State.ON
+
+    @property
+    def temperature(self):
+        if self._temp is None:
+            raise KeyError("Temp")
+        return self._temp
+
+    @property
+    def options(self):
+        return {"ChildLock": 0}
+
+
+class StatusHistoryTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.history = StatusHistory(capacity=4)
+        for t in range(6):
+            state = State.ON if t % 2 else State.OFF
+            self.history.append(Sample(float(t), 60 - t, state, 20.5 + t))
+
+    def test_fields_and_types(self):
+        self.assertEqual(
+            ("remaining_time", "state", "is_on", "temperature"),
+            self.history.fields,
+        )
+        last = self.history.last()
+        self.assertEqual([5.0], last["timestamp"])
+        self.assertEqual([55], last["remaining_time"])
+        self.assertIsInstance(last["remaining_time"][0], int)
+        self.assertEqual([State.ON], last["state"])
+        self.assertEqual([True], last["is_on"])
+        self.assertEqual([25.5], last["temperature"])
+
+    def test_capacity(self):
+        self.assertEqual(4, len(self.history))
+        self.assertEqual(
+            [2.0, 3.0, 4.0, 5.0], self.history.last(10)["timestamp"]
+        )
+        # Timestamps and three columns of doubles, one of longs.
+        double, long = array("d").itemsize, array("l").itemsize
+        self.assertEqual(4 * (4 * double + long), self.history.nbytes)
+
+    def test_between(self):
+        rows = self.history.between(3.0, 4.5)
+        self.assertEqual([3.0, 4.0], rows["timestamp"])
+        self.assertEqual([State.ON, State.OFF], rows["state"])
+        self.assertEqual([2.0, 3.0], self.history.between(end=3)["timestamp"])
+        self.assertEqual([], self.history.between(10.0)["timestamp"])
+
+    def test_aggregates(self):
+        self.assertEqual(55, self.history.min("remaining_time"))
+        self.assertEqual(58, self.history.max("remaining_time"))
+        self.assertEqual(56.5, self.history.mean("remaining_time", 3, 4))
+        self.assertIsNone(self.history.mean("remaining_time", 10))
+        with self.assertRaises(ValueError):
+            self.history.mean("state")
+        with self.assertRaises(KeyError):
+            self.history.mean("options")
+
+    def test_missing_values(self):
+        self.history.append(Sample(6.0, 54, State.OFF))
+        self.assertEqual([None], self.history.last()["temperature"])
+        self.assertEqual(24.5, self.history.mean("temperature", 3, 6))
+
+    def test_clear(self):
+        self.history.clear()
+        self.assertEqual(0, len(self.history))
+        self.assertIsNone(self.history.max("remaining_time"))
+
+    def test_type_from_first_present_value(self):
+        history = StatusHistory(capacity=4)
+        history.append(Sample(0.0, None, None))
+        history.append(Sample(1.0, 59, State.ON, 20.0))
+        history.append(Sample(2.0, 58, State.OFF))
+        self.assertEqual(58.5, history.mean("remaining_time"))
+        self.assertEqual(20.0, history.max("temperature"))
+        self.assertEqual([None, State.ON, State.OFF], history.last(3)["state"])
+        with self.assertRaises(ValueError):
+            history.min("state")
+
+    def test_labels_are_compacted(self):
+        history = StatusHistory(capacity=3, fields=["state"])
+        for t in range(20):
+            history.append(Sample(float(t), 0, "state-{}".format(t)))
+            self.assertLessEqual(len(history._columns["state"].labels), 7)
+        self.assertEqual(
+            ["state-17", "state-18", "state-19"], history.last(3)["state"]
+        )
+
+    def test_numeric_column_widens(self):
+        history = StatusHistory(capacity=4, fields=["temperature"])
+        history.append(Sample(0.0, 0, None, 22))
+        history.append(Sample(1.0, 0, None, 22.5))
+        self.assertEqual([22.0, 22.5], history.last(2)["temperature"])
+        self.assertEqual(22.5, history.max("temperature"))
+        self.assertEqual(22.25, history.mean("temperature"))
+
+    def test_numeric_column_becomes_labels(self):
+        history = StatusHistory(capacity=4, fields=["temperature"])
+        history.append(Sample(0.0, 0, None, 22))
+        history.append(Sample(1.0, 0, None))
+        history.append(Sample(2.0, 0, None, "--"))
+        history.append(Sample(3.0, 0, None, True))
+        self.assertEqual(
+            [22, None, "--", True], history.last(4)["temperature"]
+        )
+        self.assertIsInstance(history.last(4)["temperature"][0], int)
+        with self.assertRaises(ValueError):
+            history.max("temperature")
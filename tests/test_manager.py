@@ -0,0 +1,181 @@
+import threading
+import time
+import unittest
+from collections import Counter
+from unittest import mock
+
+from wideq.client import AuthManager, DeviceType
+from wideq.core import NotLoggedInError
+from wideq.manager import MonitorManager
+from wideq.scheduler import PollPolicy, PollScheduler
+
+FAST_POLICY = PollPolicy(0.01, 0.01, 0.01, 0.01, 0.01, 5, 0.0)
+
+
+def make_device(device_id, client=None):
+    device = mock.Mock()
+    device.device.id = device_id
+    device.device.type = DeviceType.OVEN
+    device.client = client or mock.Mock()
+    device.poll.return_value = None
+    device.warmup_remaining.return_value = None
+    return device
+
+
+class MonitorManagerTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.polls = Counter()
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+        self.wanted = 3
+        self.scheduler = PollScheduler(default=FAST_POLICY)
+
+    def callback(self, device, status):
+        with self.lock:
+            self.polls[device.device.id] += 1
+            if len(self.polls) == self.expected and all(
+                count >= self.wanted for count in self.polls.values()
+            ):
+                self.done.set()
+
+    def run_manager(self, devices, expected=None, **kwargs):
+        self.expected = len(devices) if expected is None else expected
+        manager = MonitorManager(self.callback, self.scheduler, **kwargs)
+        for device in devices:
+            manager.add(device)
+        with manager:
+            self.assertTrue(self.done.wait(5))
+        return manager
+
+    def test_lifecycle(self):
+        devices = [make_device("a"), make_device("b")]
+        manager = self.run_manager(devices)
+        for device in devices:
+            device.monitor_start.assert_called_once_with()
+            device.monitor_stop.assert_called_once_with()
+        self.assertEqual(0, len(manager.scheduler))
+        with self.assertRaises(RuntimeError):
+            manager.add(make_device("c"))
+
+    def test_account_limit(self):
+        running = Counter()
+        peaks = Counter()
+
+        def slow_poll(device):
+            def poll():
+                account = device.client
+                with self.lock:
+                    running[account] += 1
+                    peaks[account] = max(peaks[account], running[account])
+                time.sleep(0.01)
+                with self.lock:
+                    running[account] -= 1
+
+            return poll
+
+        accounts = [mock.Mock(), mock.Mock()]
+        devices = []
+        for i in range(12):
+            device = make_device(str(i), accounts[i % 2])
+            device.poll.side_effect = slow_poll(device)
+            devices.append(device)
+
+        self.run_manager(devices, workers=8, account_limit=2)
+        self.assertEqual(set(accounts), set(peaks))
+        for peak in peaks.values():
+            self.assertLessEqual(peak, 2)
+
+    def test_failing_device_does_not_block_others(self):
+        broken = make_device("broken")
+        broken.poll.side_effect = RuntimeError
+        working = make_device("working")
+        self.wanted = 1
+        self.run_manager([working, broken, make_device("other")], 2)
+        self.assertNotIn("broken", self.polls)
+        self.assertGreater(broken.poll.call_count, 0)
+        broken.monitor_stop.assert_called_once_with()
+
+    def test_failed_poll_backs_off(self):
+        scheduler = self.scheduler
+        backoff = scheduler.backoff = mock.Mock(wraps=scheduler.backoff)
+        device = make_device("broken")
+        retried = threading.Event()
+
+        def poll():
+            if device.poll.call_count > 1:
+                retried.set()
+            raise RuntimeError
+
+        device.poll.side_effect = poll
+        manager = MonitorManager(scheduler=scheduler)
+        manager.add(device)
+        with manager:
+            self.assertTrue(retried.wait(5))
+        backoff.assert_any_call(device)
+
+    def test_expired_session_refreshed_once(self):
+        client = mock.Mock()
+        auth = AuthManager(client)
+
+        def poll():
+            if not client.refresh.called:
+                raise NotLoggedInError("0102", "Expired")
+
+        devices = [make_device(device_id, client) for device_id in "abc"]
+        for device in devices:
+            device.poll.side_effect = poll
+        self.run_manager(devices, auth=[auth])
+        client.refresh.assert_called_once_with()
+        self.assertEqual(1, auth.generation)
+
+    def test_slow_device_does_not_starve_others(self):
+        account = mock.Mock()
+        slow = make_device("slow", account)
+        # Hold one worker and account slot until the others are done.
+        slow.poll.side_effect = lambda: self.done.wait(5)
+        devices = [slow, make_device("a", account), make_device("b", account)]
+        self.run_manager(devices, 2, workers=2, account_limit=2)
+        self.assertEqual(1, slow.poll.call_count)
+
+    def test_remove(self):
+        device = make_device("a")
+        polled = threading.Event()
+        device.poll.side_effect = lambda: polled.set()
+        manager = MonitorManager(scheduler=PollScheduler(default=FAST_POLICY))
+        manager.add(device)
+        with manager:
+            self.assertTrue(polled.wait(5))
+            manager.remove("a")
+            self.assertNotIn("a", manager)
+            with manager._idle:
+                while manager._busy:
+                    manager._idle.wait()
+            device.monitor_stop.assert_called_once_with()
+            calls = device.poll.call_count
+            time.sleep(0.05)
+            self.assertEqual(calls, device.poll.call_count)
+        device.monitor_stop.assert_called_once_with()
+
+    def test_remove_while_starting(self):
+        device = make_device("a")
+        starting = threading.Event()
+        release = threading.Event()
+        stopped = threading.Event()
+        device.monitor_start.side_effect = lambda: (
+            starting.set(),
+            release.wait(5),
+        )
+        device.monitor_stop.side_effect = lambda: stopped.set()
+        manager = MonitorManager(scheduler=PollScheduler(default=FAST_POLICY))
+        manager.add(device)
+        with manager:
+            self.assertTrue(starting.wait(5))
+            manager.remove("a")
+            release.set()
+            self.assertTrue(stopped.wait(5))
+        device.monitor_start.assert_called_once_with()
+        device.monitor_stop.assert_called_once_with()
+        device.poll.assert_not_called()
+        self.assertFalse(manager._started)
+        self.assertFalse(manager._closing)
@@ -0,0 +1,372 @@
+import base64
+import json
+import time
+import unittest
+
+import requests
+import responses
+
+import wideq.core
+from wideq.client import (
+    Monitor,
+    MonitorGroup,
+    MonitorState,
+    RestartPolicy,
+    WarmupStats,
+)
+
+
+API_ROOT = "https://aic.lgthinq.com:46030/api"
+
+
+def make_session():
+    gateway = wideq.core.Gateway(
+        "https://us.m.lgaccount.com",
+        API_ROOT,
+        "https://us.lgeapi.com",
+        "US",
+        "en-US",
+    )
+    auth = wideq.core.Auth(gateway, "access", "refresh")
+    return wideq.core.Session(auth, "session-id")
+
+
+def request_body(call):
+    return json.loads(call.request.body)["lgedmRoot"]
+
+
+class MonitorGroupTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.session = make_session()
+        self.work_ids = iter(["work-a", "work-b", "work-c"])
+
+        def mon_callback(request):
+            body = json.loads(request.body)["lgedmRoot"]
+            out = {"returnCd": "0000"}
+            if body["cmdOpt"] == "Start":
+                out["workId"] = next(self.work_ids)
+            return (200, {}, json.dumps({"lgedmRoot": out}))
+
+        responses.add_callback(
+            responses.POST, API_ROOT + "/rti/rtiMon", callback=mon_callback
+        )
+
+    @responses.activate
+    def test_poll_batches_devices(self):
+        responses.add(
+            responses.POST,
+            API_ROOT + "/rti/rtiResult",
+            json={
+                "lgedmRoot": {
+                    "returnCd": "0000",
+                    "workList": [
+                        {
+                            "deviceId": "a",
+                            "workId": "work-a",
+                            "returnCode": "0000",
+                            "returnData": base64.b64encode(b"\x01").decode(),
+                        },
+                        {"deviceId": "b", "workId": "work-b"},
+                    ],
+                }
+            },
+        )
+        with MonitorGroup(self.session, ["a", "b"]) as group:
+            self.assertEqual({"a": b"\x01", "b": None}, group.poll())
+
+        polls = [
+            c for c in responses.calls if c.request.url.endswith("rtiResult")
+        ]
+        self.assertEqual(1, len(polls))
+        self.assertEqual(
+            [
+                {"deviceId": "a", "workId": "work-a"},
+                {"deviceId": "b", "workId": "work-b"},
+            ],
+            request_body(polls[0])["workList"],
+        )
+
+    @responses.activate
+    def test_poll_restarts_only_failed_monitors(self):
+        responses.add(
+            responses.POST,
+            API_ROOT + "/rti/rtiResult",
+            json={
+                "lgedmRoot": {
+                    "returnCd": "0000",
+                    "workList": [
+                        {
+                            "deviceId": "a",
+                            "workId": "work-a",
+                            "returnCode": "0000",
+                        },
+                        {
+                            "deviceId": "b",
+                            "workId": "work-b",
+                            "returnCode": "0106",
+                        },
+                    ],
+                }
+            },
+        )
+        group = MonitorGroup(self.session, ["a", "b"])
+        group.start()
+        self.assertEqual({"a": None, "b": None}, group.poll())
+
+        group.monitors["b"].stopping.result()
+
+        self.assertEqual("work-a", group.monitors["a"].work_id)
+        self.assertEqual("work-c", group.monitors["b"].work_id)
+        restarts = [
+            (body["cmdOpt"], body["deviceId"])
+            for body in map(request_body, responses.calls[3:])
+        ]
+        self.assertCountEqual([("Stop", "b"), ("Start", "b")], restarts)
+        self.assertEqual(MonitorState.RUNNING, group.monitors["b"].state)
+        self.assertEqual(1, group.monitors["b"].failures)
+
+    @responses.activate
+    def test_poll_skips_monitors_in_backoff(self):
+        responses.add(
+            responses.POST,
+            API_ROOT + "/rti/rtiResult",
+            json={
+                "lgedmRoot": {
+                    "returnCd": "0000",
+                    "workList": {"deviceId": "a", "workId": "work-a"},
+                }
+            },
+        )
+        group = MonitorGroup(self.session, ["a", "b"])
+        group.start()
+        mon = group.monitors["b"]
+        mon.work_id = None
+        mon.failures = 2
+        mon.retry_at = time.monotonic() + 60
+
+        self.assertEqual({"a": None, "b": None}, group.poll())
+        self.assertEqual(MonitorState.BACKOFF, mon.state)
+        polls = [
+            c for c in responses.calls if c.request.url.endswith("rtiResult")
+        ]
+        self.assertEqual(
+            [{"deviceId": "a", "workId": "work-a"}],
+            request_body(polls[0])["workList"],
+        )
+
+
+class MonitorRestartTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.session = make_session()
+        self.policy = RestartPolicy(
+            min_delay=2.0, factor=2.0, max_delay=3.0, threshold=4, cooldown=60
+        )
+        self.mon = Monitor(self.session, "a", restart_policy=self.policy)
+
+    def add_failure(self):
+        responses.add(
+            responses.POST,
+            API_ROOT + "/rti/rtiResult",
+            json={
+                "lgedmRoot": {
+                    "returnCd": "0000",
+                    "workList": {
+                        "deviceId": "a",
+                        "workId": "work-a",
+                        "returnCode": "0106",
+                    },
+                }
+            },
+        )
+
+    def test_restart_delays(self):
+        delays = []
+        for failures in range(1, 6):
+            self.mon.failures = failures
+            delays.append(self.mon._restart_delay())
+        self.assertEqual([0.0, 2.0, 3.0, 60, 60], delays)
+
+    @responses.activate
+    def test_failed_stop_does_not_prevent_restart(self):
+        work_ids = iter(["work-a", "work-b"])
+
+        def mon_callback(request):
+            body = json.loads(request.body)["lgedmRoot"]
+            if body["cmdOpt"] == "Stop":
+                out = {"returnCd": "0100", "returnMsg": "Failed"}
+            else:
+                out = {"returnCd": "0000", "workId": next(work_ids)}
+            return (200, {}, json.dumps({"lgedmRoot": out}))
+
+        responses.add_callback(
+            responses.POST, API_ROOT + "/rti/rtiMon", callback=mon_callback
+        )
+        self.add_failure()
+        self.mon.start()
+        self.assertIsNone(self.mon.poll())
+        self.mon.stopping.result()
+        self.assertEqual("work-b", self.mon.work_id)
+        self.assertEqual(MonitorState.RUNNING, self.mon.state)
+        self.assertEqual(1, self.mon.failures)
+
+    @responses.activate
+    def test_breaker_opens_after_repeated_failures(self):
+        responses.add(
+            responses.POST,
+            API_ROOT + "/rti/rtiMon",
+            json={"lgedmRoot": {"returnCd": "0000", "workId": "work-a"}},
+        )
+        self.add_failure()
+        self.mon.start()
+        for _ in range(self.policy.threshold):
+            self.assertIsNone(self.mon.poll())
+            self.mon.stopping.result()
+            # Skip the backoff.
+            if self.mon.state is MonitorState.BACKOFF:
+                self.mon.retry_at = 0.0
+                self.mon.poll()
+        self.assertEqual(MonitorState.OPEN, self.mon.state)
+        self.assertEqual(self.policy.threshold, self.mon.failures)
+        self.assertGreater(self.mon.retry_at, time.monotonic() + 59)
+
+        calls = len(responses.calls)
+        self.assertIsNone(self.mon.poll())
+        self.assertEqual(calls, len(responses.calls))
+
+    @responses.activate
+    def test_expired_session_raises_on_restart(self):
+        responses.add(
+            responses.POST,
+            API_ROOT + "/rti/rtiMon",
+            json={"lgedmRoot": {"returnCd": "0102", "returnMsg": "Expired"}},
+        )
+        self.mon.failures = 1
+        self.mon.retry_at = 0.0
+        with self.assertRaises(wideq.core.NotLoggedInError):
+            self.mon.poll()
+        self.assertEqual(1, self.mon.failures)
+
+    @responses.activate
+    def test_connection_error_on_restart_backs_off(self):
+        responses.add(
+            responses.POST,
+            API_ROOT + "/rti/rtiMon",
+            body=requests.ConnectionError("down"),
+        )
+        self.mon.failures = 1
+        self.mon.retry_at = 0.0
+        with self.assertRaises(requests.ConnectionError):
+            self.mon.poll()
+        self.assertEqual(2, self.mon.failures)
+        self.assertEqual(MonitorState.BACKOFF, self.mon.state)
+        self.assertGreater(self.mon.retry_at, time.monotonic() + 1)
+
+        calls = len(responses.calls)
+        self.assertIsNone(self.mon.poll())
+        self.assertEqual(calls, len(responses.calls))
+
+    @responses.activate
+    def test_stop_cancels_restart(self):
+        self.mon.failures = 4
+        self.mon.retry_at = 0.0
+        self.mon.stop()
+        self.assertEqual(MonitorState.STOPPED, self.mon.state)
+        self.assertIsNone(self.mon.poll())
+        self.assertEqual(0, len(responses.calls))
+
+
+class WarmupTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.session = make_session()
+        self.stats = WarmupStats()
+        self.sleeps = []
+        responses.add(
+            responses.POST,
+            API_ROOT + "/rti/rtiMon",
+            json={"lgedmRoot": {"returnCd": "0000", "workId": "work-a"}},
+        )
+
+    def add_results(self, empty):
+        for _ in range(empty):
+            responses.add(
+                responses.POST,
+                API_ROOT + "/rti/rtiResult",
+                json={
+                    "lgedmRoot": {
+                        "returnCd": "0000",
+                        "workList": {"deviceId": "a", "workId": "work-a"},
+                    }
+                },
+            )
+        responses.add(
+            responses.POST,
+            API_ROOT + "/rti/rtiResult",
+            json={
+                "lgedmRoot": {
+                    "returnCd": "0000",
+                    "workList": {
+                        "deviceId": "a",
+                        "workId": "work-a",
+                        "returnCode": "0000",
+                        "returnData": base64.b64encode(b"\x01").decode(),
+                    },
+                }
+            },
+        )
+
+    @responses.activate
+    def test_wait_ready_backs_off(self):
+        self.add_results(empty=3)
+        mon = Monitor(self.session, "a", "MODEL", self.stats)
+        mon.start()
+        self.assertEqual(b"\x01", mon.wait_ready(sleep=self.sleeps.append))
+        self.assertEqual([0.5, 0.75, 1.125], self.sleeps)
+        self.assertIsNotNone(mon.time_to_first_data)
+        self.assertEqual([mon.time_to_first_data], self.stats.samples("MODEL"))
+        self.assertEqual({"MODEL"}, set(self.stats.summary()))
+
+    @responses.activate
+    def test_wait_ready_uses_observed_warmup(self):
+        self.add_results(empty=0)
+        self.stats.record("MODEL", 10.0)
+        mon = Monitor(self.session, "a", "MODEL", self.stats)
+        mon.start()
+        self.assertEqual(b"\x01", mon.wait_ready(sleep=self.sleeps.append))
+        self.assertEqual(1, len(self.sleeps))
+        self.assertAlmostEqual(8.0, self.sleeps[0], places=1)
+
+    @responses.activate
+    def test_wait_ready_timeout(self):
+        self.add_results(empty=5)
+        mon = Monitor(self.session, "a", "MODEL", self.stats)
+        mon.start()
+        self.assertIsNone(mon.wait_ready(timeout=0, sleep=self.sleeps.append))
+        self.assertEqual([], self.sleeps)
+        self.assertEqual([], self.stats.samples("MODEL"))
+
+    def test_wait_ready_not_started(self):
+        mon = Monitor(self.session, "a", "MODEL", self.stats)
+        with self.assertRaises(RuntimeError):
+            mon.wait_ready(sleep=self.sleeps.append)
+        self.assertEqual([], self.sleeps)
+
+    @responses.activate
+    def test_ready_in(self):
+        mon = Monitor(self.session, "a", "MODEL", self.stats)
+        self.assertIsNone(mon.ready_in())
+        mon.start()
+        self.assertIsNone(mon.ready_in())
+        self.stats.record("MODEL", 10.0)
+        self.assertAlmostEqual(8.0, mon.ready_in(), places=1)
+        mon.started_at -= 20.0
+        self.assertEqual(0.0, mon.ready_in())
+
+    def test_estimate(self):
+        self.assertIsNone(self.stats.estimate("MODEL"))
+        for seconds in (3.0, 1.0, 2.0, 9.0):
+            self.stats.record("MODEL", seconds)
+        self.assertEqual(3.0, self.stats.estimate("MODEL"))
+        self.assertEqual((4, 3.0, 9.0), tuple(self.stats.summary()["MODEL"]))
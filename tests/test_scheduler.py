@@ -0,0 +1,137 @@
+import random
+import threading
+import unittest
+from unittest import mock
+
+from wideq.client import DeviceType
+from wideq.scheduler import (
+    DEFAULT_POLICY,
+    FAILURE_MAX_DELAY,
+    PollPolicy,
+    PollScheduler,
+    activity,
+)
+
+
+class Status(object):
+    def __init__(self, is_on=True, remaining_time=None):
+        self.is_on = is_on
+        if remaining_time is not None:
+            self.remaining_time = remaining_time
+
+
+def make_device(device_id, device_type=DeviceType.WASHER, status=None):
+    device = mock.Mock()
+    device.device.id = device_id
+    device.device.type = device_type
+    device.poll.return_value = status
+    device.warmup_remaining.return_value = None
+    return device
+
+
+class ActivityTest(unittest.TestCase):
+    def test_activity(self):
+        self.assertEqual("pending", activity(None))
+        self.assertEqual("off", activity(Status(False, 3)))
+        self.assertEqual("finishing", activity(Status(True, 3)))
+        self.assertEqual("active", activity(Status(True, 30)))
+        self.assertEqual("active", activity(Status(True, 0)))
+        self.assertEqual("idle", activity(object()))
+
+
+class PollSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.now = 0.0
+        self.scheduler = PollScheduler(
+            default=DEFAULT_POLICY._replace(jitter=0.0),
+            clock=lambda: self.now,
+            rng=random.Random(0),
+        )
+
+    def test_interval_per_type_policy(self):
+        washer = make_device("washer")
+        oven = make_device("oven", DeviceType.OVEN)
+        self.assertIs(DEFAULT_POLICY, PollScheduler().policy(oven))
+        self.assertEqual(30.0, PollScheduler().policy(washer).active)
+        policy = PollPolicy(1.0, 100.0, 50.0, 10.0, 2.0, 5, 0.0)
+        self.scheduler.set_policy(DeviceType.WASHER, policy)
+        self.assertEqual(100.0, self.scheduler.interval(washer, Status(False)))
+        self.assertEqual(2.0, self.scheduler.interval(washer, Status(True, 4)))
+        self.assertEqual(1.0, self.scheduler.interval(washer, None))
+
+    def test_pending_waits_for_warmup(self):
+        oven = make_device("oven", DeviceType.OVEN)
+        oven.warmup_remaining.return_value = 7.5
+        self.assertEqual(7.5, self.scheduler.interval(oven, None))
+        self.assertEqual(60.0, self.scheduler.interval(oven, Status(None)))
+        oven.warmup_remaining.return_value = 0.0
+        self.assertEqual(2.0, self.scheduler.interval(oven, None))
+
+    def test_jitter(self):
+        scheduler = PollScheduler(rng=random.Random(1))
+        washer = make_device("washer")
+        intervals = {scheduler.interval(washer, Status(False)) for _ in "abc"}
+        self.assertEqual(3, len(intervals))
+        for interval in intervals:
+            self.assertLessEqual(abs(interval - 120.0), 12.0)
+
+    def test_poll_due(self):
+        off = make_device("off", DeviceType.OVEN, Status(False))
+        busy = make_device("busy", DeviceType.OVEN, Status(True, 2))
+        self.scheduler.add(off)
+        self.scheduler.add(busy, delay=1.0)
+
+        self.assertEqual(
+            [(off, off.poll.return_value)], self.scheduler.poll_due()
+        )
+        self.assertEqual(1.0, self.scheduler.next_due())
+
+        self.now = 1.0
+        self.assertEqual([busy], [d for d, _ in self.scheduler.poll_due()])
+        self.assertEqual(6.0, self.scheduler.next_due())
+
+        self.now = 120.0
+        self.assertEqual([busy, off], self.scheduler.due())
+        self.assertIsNone(self.scheduler.next_due())
+
+    def test_failed_polls_back_off(self):
+        device = make_device("dev", DeviceType.OVEN)
+        device.poll.side_effect = RuntimeError
+        self.scheduler.add(device)
+        for delay in (60.0, 120.0, 240.0):
+            self.assertEqual([(device, None)], self.scheduler.poll_due())
+            self.now += delay
+            self.assertEqual(self.now, self.scheduler.next_due())
+
+        device.poll.side_effect = None
+        self.assertEqual([(device, None)], self.scheduler.poll_due())
+        self.assertEqual(self.now + 2.0, self.scheduler.next_due())
+        self.assertEqual(60.0, self.scheduler.backoff(device))
+
+    def test_backoff_is_capped(self):
+        device = make_device("dev", DeviceType.OVEN)
+        self.scheduler.add(device)
+        delays = [self.scheduler.backoff(device) for _ in range(8)]
+        self.assertEqual(FAILURE_MAX_DELAY, delays[-1])
+
+    def test_remove(self):
+        device = make_device("dev", DeviceType.OVEN)
+        self.scheduler.add(device)
+        self.scheduler.add(device, delay=5.0)
+        self.assertEqual(5.0, self.scheduler.next_due())
+        self.scheduler.remove("dev")
+        self.assertNotIn("dev", self.scheduler)
+        self.assertEqual([], self.scheduler.due(100.0))
+
+    def test_run(self):
+        scheduler = PollScheduler()
+        stop = threading.Event()
+        device = make_device("dev", DeviceType.OVEN, Status(False))
+        scheduler.add(device)
+
+        def callback(device, status):
+            stop.set()
+
+        scheduler.run(callback, stop)
+        device.poll.assert_called_once_with()
@@ -0,0 +1,257 @@
+import json
+import unittest
+from unittest import mock
+
+from wideq.client import Client, Device, DeviceInfo
+from wideq.status import (
+    DeltaTracker,
+    DeviceStatus,
+    FieldChange,
+    ModelSnapshot,
+    StatusSnapshot,
+    snapshot,
+    snapshot_type,
+)
+from wideq.washer import WasherDevice, WasherState, WasherStatus
+
+POLL_DATA = {
+    "APCourse": "10",
+    "Error": "0",
+    "Initial_Time_H": "0",
+    "Initial_Time_M": "58",
+    "Option1": "0",
+    "Option2": "0",
+    "Option3": "2",
+    "PreState": "23",
+    "Remain_Time_H": "0",
+    "Remain_Time_M": "13",
+    "RinseOption": "1",
+    "SmartCourse": "51",
+    "State": "30",
+}
+
+
+class WasherStatusTestCase(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        with open("./tests/fixtures/client.json") as fp:
+            state = json.load(fp)
+        self.client = Client.load(state)
+        self.washer = WasherDevice(
+            self.client,
+            DeviceInfo(
+                {
+                    "alias": "WASHER",
+                    "deviceId": "33330ba80-107d-11e9-96c8-0051ede85d3f",
+                    "deviceType": 201,
+                    "modelJsonUrl": (
+                        "https://aic.lgthinq.com:46030/api/webContents/"
+                        "modelJSON?modelName=F3L2CYV5W_WIFI&countryCode=WW&"
+                        "contentsId=JS1217232703654216&authKey=thinq"
+                    ),
+                    "modelNm": "F3L2CYV5W_WIFI",
+                }
+            ),
+        )
+        self.status = WasherStatus(self.washer, POLL_DATA)
+
+
+class SnapshotTest(WasherStatusTestCase):
+    def test_snapshot_type(self):
+        cls = snapshot_type(WasherStatus)
+        self.assertIs(cls, snapshot_type(WasherStatus))
+        self.assertTrue(issubclass(cls, StatusSnapshot))
+        self.assertEqual("WasherStatusSnapshot", cls.__name__)
+        self.assertEqual(
+            ("state", "previous_state", "is_on", "remaining_time"),
+            cls.fields[:4],
+        )
+        self.assertNotIn("data", cls.fields)
+
+    def test_snapshot(self):
+        snap = self.status.snapshot(timestamp=12.5)
+        self.assertEqual(12.5, snap.timestamp)
+        self.assertEqual(WasherState.RINSING, snap.state)
+        self.assertEqual(13, snap.remaining_time)
+        self.assertEqual("Towels", snap.course)
+        self.assertFalse(snap.child_lock)
+        self.assertFalse(hasattr(snap, "__dict__"))
+
+        out = snap.to_dict()
+        self.assertEqual(13, out["remaining_time"])
+        self.assertIsInstance(out["options"], dict)
+        self.assertEqual(1, out["options"]["RinseCount"])
+
+    def test_immutable(self):
+        snap = snapshot(self.status)
+        with self.assertRaises(AttributeError):
+            snap.state = WasherState.OFF
+        with self.assertRaises(AttributeError):
+            del snap.state
+        with self.assertRaises(TypeError):
+            snap.options["RinseCount"] = 2
+
+    def test_equality_ignores_timestamp(self):
+        self.assertEqual(
+            snapshot(self.status, 1.0), snapshot(self.status, 2.0)
+        )
+        other = WasherStatus(self.washer, dict(POLL_DATA, Remain_Time_M="12"))
+        self.assertNotEqual(snapshot(self.status), snapshot(other))
+
+    def test_missing_keys(self):
+        status = WasherStatus(self.washer, {"State": "30"})
+        snap = snapshot(status)
+        self.assertEqual(WasherState.RINSING, snap.state)
+        self.assertIsNone(snap.remaining_time)
+
+
+class DeltaTrackerTest(WasherStatusTestCase):
+    def make_snapshot(self, **data):
+        return snapshot(WasherStatus(self.washer, dict(POLL_DATA, **data)))
+
+    def test_first_update_reports_everything(self):
+        tracker = DeltaTracker()
+        delta = tracker.update(self.make_snapshot())
+        self.assertTrue(delta)
+        self.assertEqual(
+            FieldChange(None, WasherState.RINSING), delta.changes["state"]
+        )
+        self.assertEqual(set(delta.snapshot.fields), set(delta.changes))
+
+    def test_changed_fields(self):
+        tracker = DeltaTracker()
+        tracker.update(self.make_snapshot())
+        delta = tracker.update(
+            self.make_snapshot(State="0", Remain_Time_M="12")
+        )
+        self.assertEqual(
+            {
+                "state": FieldChange(WasherState.RINSING, WasherState.OFF),
+                "is_on": FieldChange(True, False),
+                "remaining_time": FieldChange(13, 12),
+            },
+            delta.changes,
+        )
+        self.assertEqual(
+            {"state": WasherState.OFF, "is_on": False, "remaining_time": 12},
+            delta.to_dict(),
+        )
+
+        delta = tracker.update(
+            self.make_snapshot(State="0", Remain_Time_M="12")
+        )
+        self.assertFalse(delta)
+        self.assertEqual({}, delta.to_dict())
+
+    def test_update_raw_skips_decoding_identical_data(self):
+        tracker = DeltaTracker()
+        decode = mock.Mock(side_effect=lambda data: self.make_snapshot())
+        self.assertTrue(tracker.update_raw(b"frame", decode))
+        delta = tracker.update_raw(b"frame", decode)
+        self.assertFalse(delta)
+        self.assertIs(tracker.last, delta.snapshot)
+        self.assertEqual(1, decode.call_count)
+        self.assertFalse(tracker.update_raw(b"other", decode))
+        self.assertEqual(2, decode.call_count)
+
+    def test_subscribers(self):
+        tracker = DeltaTracker()
+        seen = []
+        tracker.subscribe(seen.append)
+        failing = tracker.subscribe(mock.Mock(side_effect=RuntimeError))
+        tracker.update(self.make_snapshot())
+        tracker.update(self.make_snapshot())
+        tracker.update(self.make_snapshot(State="0"))
+        self.assertEqual(2, len(seen))
+        self.assertEqual(2, failing.call_count)
+
+        tracker.unsubscribe(seen.append)
+        tracker.update(self.make_snapshot(State="30"))
+        self.assertEqual(2, len(seen))
+
+
+class DeviceStatusTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        with open("./tests/fixtures/client.json") as fp:
+            state = json.load(fp)
+        self.device = Device(
+            Client.load(state),
+            DeviceInfo(
+                {
+                    "alias": "DISHWASHER",
+                    "deviceId": "33330ba80-107d-11e9-96c8-0051ede85d3f",
+                    "deviceType": 204,
+                    "modelJsonUrl": (
+                        "https://aic.lgthinq.com:46030/api/webContents/"
+                        "modelJSON?modelName=D3210&countryCode=WW&contentsId="
+                        "JS0719082250749334&authKey=thinq"
+                    ),
+                    "modelNm": "D3210",
+                }
+            ),
+        )
+        self.data = {"State": "2", "Course": "2", "Option1": "1", "16~19": "0"}
+
+    def test_format(self):
+        status = DeviceStatus(self.device, self.data)
+        self.assertEqual("@DW_STATE_RUNNING_W", status["State"])
+        self.assertEqual("Haeavy", status["Course"])
+        self.assertEqual(1, status["Option1"]["ChildLock"])
+        self.assertEqual(list(self.data), list(status))
+        self.assertEqual(dict(status), status.to_dict())
+
+    def test_snapshot(self):
+        snap = DeviceStatus(self.device, self.data).snapshot(timestamp=1.0)
+        self.assertIsInstance(snap, ModelSnapshot)
+        self.assertEqual(tuple(self.data), snap.fields)
+        self.assertEqual("0", snap["16~19"])
+        self.assertEqual(1, snap["Option1"]["ChildLock"])
+        self.assertEqual(dict(snap), snap.to_dict())
+        with self.assertRaises(KeyError):
+            snap["Missing"]
+        self.assertIsNone(snap.get("Missing"))
+        with self.assertRaises(AttributeError):
+            snap.State = "x"
+        self.assertEqual(
+            snap, DeviceStatus(self.device, self.data).snapshot(timestamp=2.0)
+        )
+
+        delta = DeltaTracker().update(snap)
+        self.assertEqual("Haeavy", delta.to_dict()["Course"])
+
+    def test_keys_do_not_shadow_attributes(self):
+        snap = ModelSnapshot(1.0, {"timestamp": 5, "fields": "x"})
+        self.assertEqual(1.0, snap.timestamp)
+        self.assertEqual(5, snap["timestamp"])
+        self.assertEqual({"timestamp": 5, "fields": "x"}, snap.to_dict())
+
+    def test_delta_added_and_removed_keys(self):
+        tracker = DeltaTracker()
+        tracker.update(ModelSnapshot(1.0, {"a": 1, "c": 3}))
+        delta = tracker.update(ModelSnapshot(2.0, {"a": 1, "b": 2}))
+        self.assertEqual(
+            {"b": FieldChange(None, 2), "c": FieldChange(3, None)},
+            delta.changes,
+        )
+
+    def test_history(self):
+        self.device.mon = mock.Mock()
+        self.device.mon.poll.return_value = bytes(range(30))
+        history = self.device.enable_history(capacity=4)
+        self.device.poll()
+        self.device.poll(snapshot=True)
+        self.assertEqual(2, len(history))
+        self.assertIn("State", history.fields)
+        self.assertEqual(
+            ["@DW_STATE_POWER_OFF_W"] * 2, history.last(2)["State"]
+        )
+
+    def test_poll(self):
+        self.assertIsNone(self.device.poll())
+        self.device.mon = mock.Mock()
+        self.device.mon.poll.return_value = bytes(range(30))
+        status = self.device.poll(fields=["State"])
+        self.assertIsInstance(status, DeviceStatus)
+        self.assertEqual({"State": "@DW_STATE_POWER_OFF_W"}, status.to_dict())
+        self.assertTrue(self.device.poll_delta())
@@ -1,5 +1,6 @@
 import json
 import unittest
+from unittest import mock
 
 from wideq.client import Client, DeviceInfo
 from wideq.washer import WasherDevice, WasherState, WasherStatus
@@ -62,3 +63,75 @@ class WasherStatusTest(unittest.TestCase):
         self.assertEqual("Towels", status.course)
         self.assertEqual("SmallLoad", status.smart_course)
         self.assertEqual("No Error", status.error)
+        self.assertFalse(status.child_lock)
+        self.assertFalse(status.remote_start)
+        self.assertEqual(1, status.rinse_count)
+        self.assertEqual(0, status.options["ExtraRinseCount"])
+
+    def encode_frame(self, data):
+        frame = bytearray(
+            max(
+                item["startByte"] + item["length"]
+                for item in self.washer.model.data["Monitoring"]["protocol"]
+            )
+        )
+        for item in self.washer.model.data["Monitoring"]["protocol"]:
+            start, length = item["startByte"], item["length"]
+            value = int(data.get(item["value"], 0))
+            frame[start : start + length] = value.to_bytes(length, "big")
+        return bytes(frame)
+
+    def test_poll_projection(self):
+        self.washer.mon = mock.Mock()
+        self.washer.mon.poll.return_value = self.encode_frame(POLL_DATA)
+
+        status = self.washer.poll(fields=["State", "Remain_Time_H"])
+        self.assertEqual({"State": "30", "Remain_Time_H": "0"}, status.data)
+        self.assertEqual(WasherState.RINSING, status.state)
+        with self.assertRaises(KeyError):
+            status.remaining_time
+
+        status = self.washer.poll(lazy=True)
+        self.assertEqual(WasherState.RINSING, status.state)
+        self.assertEqual(13, status.remaining_time)
+        self.assertEqual(POLL_DATA, dict(status.data))
+
+        snap = self.washer.poll(snapshot=True)
+        self.assertEqual(WasherState.RINSING, snap.state)
+        self.assertEqual(13, snap.remaining_time)
+
+    def test_poll_delta(self):
+        self.assertIsNone(self.washer.poll_delta())
+        frame = self.encode_frame(POLL_DATA)
+        self.washer.mon = mock.Mock()
+        self.washer.mon.poll.return_value = frame
+
+        delta = self.washer.poll_delta()
+        self.assertEqual(WasherState.RINSING, delta.changes["state"].new)
+        self.assertFalse(self.washer.poll_delta())
+
+        self.washer.mon.poll.return_value = self.encode_frame(
+            dict(POLL_DATA, Remain_Time_M="12")
+        )
+        delta = self.washer.poll_delta()
+        self.assertEqual({"remaining_time": 12}, delta.to_dict())
+
+    def test_history(self):
+        self.assertIsNone(self.washer.history)
+        history = self.washer.enable_history(10, ["state", "remaining_time"])
+        self.washer.mon = mock.Mock()
+        for minutes in ("13", "12"):
+            self.washer.mon.poll.return_value = self.encode_frame(
+                dict(POLL_DATA, Remain_Time_M=minutes)
+            )
+            self.washer.poll(lazy=True)
+        self.washer.poll_delta()
+
+        self.assertEqual(3, len(history))
+        self.assertEqual([13, 12, 12], history.last(3)["remaining_time"])
+        self.assertEqual([WasherState.RINSING], history.last()["state"])
+        self.assertEqual(12, history.min("remaining_time"))
+
+        self.washer.disable_history()
+        self.washer.poll()
+        self.assertEqual(3, len(history))
@@ -5,7 +5,9 @@ from .client import *  # noqa
 from .ac import *  # noqa
 from .dishwasher import *  # noqa
 from .dryer import *  # noqa
+from .manager import *  # noqa
 from .refrigerator import *  # noqa
+from .scheduler import *  # noqa
 from .washer import *  # noqa
 
 __version__ = "1.5.0"
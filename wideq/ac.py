@@ -2,8 +2,9 @@
 """
 import enum
 
-from .client import Device
-from .util import lookup_enum
+from .client import Device, Monitor
+from .status import snapshot
+from .util import lookup_member
 from .core import FailedRequestError, InvalidRequestError
 
 
@@ -370,23 +371,22 @@ class ACDevice(Device):
         except FailedRequestError:
             return 0  # Device does not support volume control.
 
-    def poll(self):
+    def _decode_status(self, data, fields=None, lazy=False):
+        res = Monitor.decode_json(data)
+        if fields is not None:
+            res = {key: res[key] for key in fields if key in res}
+        return ACStatus(self, res)
+
+    def poll(self, snapshot=False):
         """Poll the device's current state.
 
         Monitoring must be started first with `monitor_start`. Return
         either an `ACStatus` object or `None` if the status is not yet
-        available.
+        available. With `snapshot`, return an immutable `StatusSnapshot`
+        of the status instead.
         """
 
-        # Abort if monitoring has not started yet.
-        if not hasattr(self, "mon"):
-            return None
-
-        res = self.mon.poll_json()
-        if res:
-            return ACStatus(self, res)
-        else:
-            return None
+        return super().poll(snapshot=snapshot)
 
 
 class ACStatus(object):
@@ -429,24 +429,28 @@ class ACStatus(object):
 
     @property
     def mode(self):
-        return ACMode(lookup_enum("OpMode", self.data, self.ac))
+        return lookup_member(ACMode, "OpMode", self.data, self.ac)
 
     @property
     def fan_speed(self):
-        return ACFanSpeed(lookup_enum("WindStrength", self.data, self.ac))
+        return lookup_member(ACFanSpeed, "WindStrength", self.data, self.ac)
 
     @property
     def horz_swing(self):
-        return ACHSwingMode(lookup_enum("WDirHStep", self.data, self.ac))
+        return lookup_member(ACHSwingMode, "WDirHStep", self.data, self.ac)
 
     @property
     def vert_swing(self):
-        return ACVSwingMode(lookup_enum("WDirVStep", self.data, self.ac))
+        return lookup_member(ACVSwingMode, "WDirVStep", self.data, self.ac)
 
     @property
     def is_on(self):
-        op = ACOp(lookup_enum("Operation", self.data, self.ac))
+        op = lookup_member(ACOp, "Operation", self.data, self.ac)
         return op != ACOp.OFF
 
+    def snapshot(self, timestamp=None):
+        """Decode every property once into an immutable snapshot."""
+        return snapshot(self, timestamp)
+
     def __str__(self):
         return "ACStatus(%r %r)" % (self.ac, self.data)
@@ -0,0 +1,576 @@
+"""An asyncio counterpart of the session, client, and monitor APIs.
+
+This module requires the optional `aiohttp` dependency. The classes
+here mirror their synchronous equivalents in `wideq.core` and
+`wideq.client`, and share the same `Gateway`, `Auth`, and model
+descriptions with them.
+"""
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+import aiohttp
+
+from . import core
+from .client import (
+    DEFAULT_RESTART_POLICY,
+    MODEL_REGISTRY,
+    DeviceInfo,
+    ModelInfo,
+    MonitorRestarts,
+    RestartPolicy,
+)
+
+LOGGER = logging.getLogger("wideq.aio")
+
+
+async def lgedm_post(
+    http: aiohttp.ClientSession,
+    url,
+    data=None,
+    access_token=None,
+    session_id=None,
+    idempotent=False,
+):
+    """Make an HTTP request in the format used by the API servers.
+
+    This is the asynchronous version of `core.lgedm_post`. Requests
+    marked `idempotent` that fail with a retryable status or a
+    connection error are retried with the same exponential backoff as
+    the synchronous transport. Other requests are only retried when
+    the connection could not be made, since they may have reached the
+    server.
+    """
+
+    headers = core.lgedm_headers(access_token, session_id)
+    for attempt in range(core.RETRY_COUNT + 1):
+        try:
+            async with http.post(
+                url, json={core.DATA_ROOT: data}, headers=headers
+            ) as res:
+                if (
+                    res.status in core.RETRY_STATUSES
+                    and idempotent
+                    and attempt < core.RETRY_COUNT
+                ):
+                    LOGGER.debug("retrying %s after HTTP %d", url, res.status)
+                else:
+                    body = core.json_loads(await res.read())
+                    return core.lgedm_result(body)
+        except aiohttp.ClientConnectionError as exc:
+            if attempt == core.RETRY_COUNT or not (
+                idempotent or isinstance(exc, aiohttp.ClientConnectorError)
+            ):
+                raise
+            LOGGER.debug("retrying %s after connection error", url)
+        await asyncio.sleep(core.RETRY_FACTOR * (2 ** attempt))
+
+
+async def login(http, api_root, access_token, country, language):
+    """Use an access token to log into the API and obtain a session and
+    return information about the session.
+    """
+
+    url = urljoin(api_root + "/", "member/login")
+    data = {
+        "countryCode": country,
+        "langCode": language,
+        "loginType": "EMP",
+        "token": access_token,
+    }
+    return await lgedm_post(http, url, data)
+
+
+async def refresh_auth(http, oauth_root, refresh_token):
+    """Get a new access_token using a refresh_token.
+
+    May raise a `TokenError`.
+    """
+
+    token_url, data, headers = core.refresh_auth_request(
+        oauth_root, refresh_token
+    )
+    async with http.post(token_url, data=data, headers=headers) as res:
+        return core.refresh_auth_result(core.json_loads(await res.read()))
+
+
+class AsyncSession(object):
+    """An API session whose requests run on the asyncio event loop.
+
+    The HTTP connections are pooled in an `aiohttp.ClientSession`, which
+    is created on first use unless one is passed in as `http`. Close the
+    session with `close` or use it as an async context manager.
+    """
+
+    def __init__(
+        self,
+        auth: core.Auth,
+        session_id,
+        http: Optional[aiohttp.ClientSession] = None,
+    ) -> None:
+        self.auth = auth
+        self.session_id = session_id
+        self._http = http
+        self._owns_http = http is None
+
+    @property
+    def http(self) -> aiohttp.ClientSession:
+        """The pooled `aiohttp` session used for requests."""
+
+        if self._http is None or self._http.closed:
+            connector = aiohttp.TCPConnector(
+                limit_per_host=self.auth.gateway.transport.pool_size
+            )
+            self._http = aiohttp.ClientSession(
+                connector=connector, json_serialize=core.json_dumps
+            )
+            self._owns_http = True
+        return self._http
+
+    async def close(self) -> None:
+        """Close the HTTP session, if this object created it."""
+
+        if self._owns_http and self._http is not None:
+            await self._http.close()
+        self._http = None
+
+    async def __aenter__(self) -> "AsyncSession":
+        return self
+
+    async def __aexit__(self, type, value, tb) -> None:
+        await self.close()
+
+    async def post(self, path, data=None, idempotent=False):
+        """Make a POST request to the API server.
+
+        This is like `lgedm_post`, but it pulls the context for the
+        request from an active AsyncSession. Set `idempotent` for
+        requests that only read state, so they are retried after any
+        failure.
+        """
+
+        url = urljoin(self.auth.gateway.api_root + "/", path)
+        return await lgedm_post(
+            self.http,
+            url,
+            data,
+            self.auth.access_token,
+            self.session_id,
+            idempotent,
+        )
+
+    async def get_devices(self) -> List[Dict[str, Any]]:
+        """Get a list of devices associated with the user's account.
+
+        Return a list of dicts with information about the devices.
+        """
+
+        return core.get_list(
+            await self.post("device/deviceList", idempotent=True), "item"
+        )
+
+    async def monitor_start(self, device_id):
+        """Begin monitoring a device's status.
+
+        Return a "work ID" that can be used to retrieve the result of
+        monitoring.
+        """
+
+        res = await self.post(
+            "rti/rtiMon",
+            {
+                "cmd": "Mon",
+                "cmdOpt": "Start",
+                "deviceId": device_id,
+                "workId": core.gen_uuid(),
+            },
+        )
+        return res["workId"]
+
+    async def monitor_poll(self, device_id, work_id) -> Optional[bytes]:
+        """Get the result of a monitoring task.
+
+        Return a status bytestring, or None if the monitoring is not yet
+        ready. May raise a `MonitorError`.
+        """
+
+        work_list = [{"deviceId": device_id, "workId": work_id}]
+        res = await self.post(
+            "rti/rtiResult", {"workList": work_list}, idempotent=True
+        )
+        return core.monitor_result(device_id, res["workList"])
+
+    async def monitor_poll_many(self, work_ids: Dict[str, str]):
+        """Get the results of several monitoring tasks in one request.
+
+        See `core.Session.monitor_poll_many`.
+        """
+
+        work_list = [
+            {"deviceId": device_id, "workId": work_id}
+            for device_id, work_id in work_ids.items()
+        ]
+        res = await self.post(
+            "rti/rtiResult", {"workList": work_list}, idempotent=True
+        )
+        return core.monitor_results(work_ids, res["workList"])
+
+    async def monitor_stop(self, device_id, work_id):
+        """Stop monitoring a device."""
+
+        await self.post(
+            "rti/rtiMon",
+            {
+                "cmd": "Mon",
+                "cmdOpt": "Stop",
+                "deviceId": device_id,
+                "workId": work_id,
+            },
+        )
+
+    async def set_device_controls(self, device_id, values):
+        """Control a device's settings.
+
+        `values` is a key/value map containing the settings to update.
+        """
+
+        return await self.post(
+            "rti/rtiControl",
+            {
+                "cmd": "Control",
+                "cmdOpt": "Set",
+                "value": values,
+                "deviceId": device_id,
+                "workId": core.gen_uuid(),
+                "data": "",
+            },
+        )
+
+    async def get_device_config(self, device_id, key, category="Config"):
+        """Get a device configuration option.
+
+        The `category` string should probably either be "Config" or
+        "Control"; the right choice appears to depend on the key.
+        """
+
+        res = await self.post(
+            "rti/rtiControl",
+            {
+                "cmd": category,
+                "cmdOpt": "Get",
+                "value": key,
+                "deviceId": device_id,
+                "workId": core.gen_uuid(),
+                "data": "",
+            },
+        )
+        return res["returnData"]
+
+
+class AsyncMonitor(MonitorRestarts):
+    """A monitoring task for a device, driven from the event loop.
+
+    Like `Monitor`, it restarts the task automatically when the
+    monitoring session fails, backing off as described by
+    `MonitorRestarts`. The failed task is stopped in the background.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        device_id: str,
+        restart_policy: RestartPolicy = DEFAULT_RESTART_POLICY,
+    ) -> None:
+        super().__init__(device_id, restart_policy)
+        self.session = session
+        #: The background stop of the last replaced task, if any.
+        self.stopping: Optional[asyncio.Future] = None
+
+    async def start(self) -> None:
+        self.work_id = await self.session.monitor_start(self.device_id)
+        self.retry_at = None
+
+    async def stop(self) -> None:
+        """Stop the task and cancel any pending restart. Errors from
+        the server are logged and ignored.
+        """
+        work_id, self.work_id = self.work_id, None
+        self.retry_at = None
+        self.failures = 0
+        if work_id is not None:
+            await self._stop_task(work_id)
+
+    async def _stop_task(self, work_id: str) -> None:
+        """Stop a task, ignoring errors: it may already be gone."""
+        try:
+            await self.session.monitor_stop(self.device_id, work_id)
+        except Exception as exc:
+            LOGGER.debug(
+                "Stopping monitor %s for %s failed: %r",
+                work_id,
+                self.device_id,
+                exc,
+            )
+
+    def _failed(self) -> None:
+        """Drop the failed task, stopping it in the background, and
+        schedule a restart.
+        """
+        work_id, self.work_id = self.work_id, None
+        if work_id is not None:
+            self.stopping = asyncio.ensure_future(self._stop_task(work_id))
+        self._schedule_restart()
+
+    async def _restart_if_due(self) -> None:
+        """Start a new task if a restart is pending and due."""
+        if not self._restart_due():
+            return
+        try:
+            await self.start()
+        except (core.NotLoggedInError, core.TokenError):
+            # Retrying cannot help until the session is refreshed.
+            raise
+        except core.APIError as exc:
+            LOGGER.debug(
+                "Restarting monitor for %s failed: %r", self.device_id, exc
+            )
+            self._failed()
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            self._failed()
+            raise
+
+    async def poll(self) -> Optional[bytes]:
+        """Get the current status data (a bytestring) or None if the
+        device is not yet ready, or the task failed and is waiting to
+        be restarted.
+        """
+
+        if self.work_id is None:
+            await self._restart_if_due()
+            return None
+        try:
+            data = await self.session.monitor_poll(
+                self.device_id, self.work_id
+            )
+        except core.MonitorError:
+            self._failed()
+            await self._restart_if_due()
+            return None
+        self._succeeded()
+        return data
+
+    async def poll_json(self) -> Optional[Dict[str, Any]]:
+        """For devices where status is reported via JSON data, get the
+        decoded status result (or None if status is not available).
+        """
+
+        data = await self.poll()
+        return core.json_loads(data) if data else None
+
+    async def __aenter__(self) -> "AsyncMonitor":
+        await self.start()
+        return self
+
+    async def __aexit__(self, type, value, tb) -> None:
+        await self.stop()
+
+
+class AsyncClient(object):
+    """The asyncio counterpart of `Client`.
+
+    Serialized state is shared with `Client`, so state dumped by one can
+    be loaded by the other.
+    """
+
+    def __init__(
+        self,
+        gateway: Optional[core.Gateway] = None,
+        auth: Optional[core.Auth] = None,
+        session: Optional[AsyncSession] = None,
+        country: str = core.DEFAULT_COUNTRY,
+        language: str = core.DEFAULT_LANGUAGE,
+        http: Optional[aiohttp.ClientSession] = None,
+    ) -> None:
+        self._gateway: Optional[core.Gateway] = gateway
+        self._auth: Optional[core.Auth] = auth
+        self._session: Optional[AsyncSession] = session
+        self._devices: List[Dict[str, Any]] = []
+        self._model_info: Dict[str, Any] = {}
+        self._country: str = country
+        self._language: str = language
+        self._http: Optional[aiohttp.ClientSession] = http
+
+    @property
+    def http(self) -> aiohttp.ClientSession:
+        """The pooled `aiohttp` session shared by this client's
+        requests.
+        """
+
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(json_serialize=core.json_dumps)
+        return self._http
+
+    async def close(self) -> None:
+        """Close the HTTP sessions used by this client."""
+
+        if self._session is not None:
+            await self._session.close()
+        if self._http is not None:
+            await self._http.close()
+        self._http = None
+
+    async def __aenter__(self) -> "AsyncClient":
+        return self
+
+    async def __aexit__(self, type, value, tb) -> None:
+        await self.close()
+
+    async def get_gateway(self) -> core.Gateway:
+        if not self._gateway:
+            gw = await lgedm_post(
+                self.http,
+                core.GATEWAY_URL,
+                {"countryCode": self._country, "langCode": self._language},
+                idempotent=True,
+            )
+            self._gateway = core.Gateway(
+                gw["empUri"],
+                gw["thinqUri"],
+                gw["oauthUri"],
+                self._country,
+                self._language,
+            )
+        return self._gateway
+
+    @property
+    def auth(self) -> core.Auth:
+        if not self._auth:
+            assert False, "unauthenticated"
+        return self._auth
+
+    async def _start_session(
+        self,
+    ) -> Tuple[AsyncSession, List[Dict[str, Any]]]:
+        gateway = await self.get_gateway()
+        session_info = await login(
+            self.http,
+            gateway.api_root,
+            self.auth.access_token,
+            gateway.country,
+            gateway.language,
+        )
+        session = AsyncSession(
+            self.auth, session_info["jsessionId"], self.http
+        )
+        return session, core.get_list(session_info, "item")
+
+    async def get_session(self) -> AsyncSession:
+        if not self._session:
+            self._session, self._devices = await self._start_session()
+        return self._session
+
+    async def get_devices(self) -> List[DeviceInfo]:
+        """DeviceInfo objects describing the user's devices."""
+
+        if not self._devices:
+            session = await self.get_session()
+            self._devices = await session.get_devices()
+        return [DeviceInfo(d) for d in self._devices]
+
+    async def get_device(self, device_id) -> Optional[DeviceInfo]:
+        """Look up a DeviceInfo object by device ID.
+
+        Return None if the device does not exist.
+        """
+
+        for device in await self.get_devices():
+            if device.id == device_id:
+                return device
+        return None
+
+    async def refresh(self) -> None:
+        gateway = await self.get_gateway()
+        access_token = await refresh_auth(
+            self.http, gateway.oauth_root, self.auth.refresh_token
+        )
+        self._auth = core.Auth(gateway, access_token, self.auth.refresh_token)
+        session, self._devices = await self._start_session()
+        if self._session:
+            # Update the existing session in place so objects that hold
+            # on to it, like monitors, pick up the new credentials.
+            self._session.auth = session.auth
+            self._session.session_id = session.session_id
+        else:
+            self._session = session
+
+    async def model_info(self, device: DeviceInfo) -> ModelInfo:
+        """For a DeviceInfo object, get a ModelInfo object describing
+        the model's capabilities.
+        """
+
+        url = device.model_info_url
+        if url not in self._model_info:
+            async with self.http.get(url) as res:
+                self._model_info[url] = core.json_loads(await res.read())
+        model = MODEL_REGISTRY.get(url, self._model_info[url])
+        self._model_info[url] = model.data
+        return model
+
+    def monitor(self, device_id: str) -> AsyncMonitor:
+        """Create an `AsyncMonitor` for a device on the current
+        session.
+
+        The session must have been started with `get_session` first.
+        """
+
+        assert self._session, "no session"
+        return AsyncMonitor(self._session, device_id)
+
+    @classmethod
+    def load(cls, state: Dict[str, Any]) -> "AsyncClient":
+        """Load a client from serialized state."""
+
+        client = cls(
+            country=state.get("country", core.DEFAULT_COUNTRY),
+            language=state.get("language", core.DEFAULT_LANGUAGE),
+        )
+
+        if "gateway" in state:
+            client._gateway = core.Gateway.deserialize(state["gateway"])
+
+        if "auth" in state:
+            assert client._gateway, "auth state requires a gateway"
+            data = state["auth"]
+            client._auth = core.Auth(
+                client._gateway, data["access_token"], data["refresh_token"]
+            )
+
+        if "session" in state:
+            client._session = AsyncSession(client.auth, state["session"])
+
+        if "model_info" in state:
+            client._model_info = state["model_info"]
+
+        return client
+
+    def dump(self) -> Dict[str, Any]:
+        """Serialize the client state."""
+
+        out: Dict[str, Any] = {
+            "model_info": self._model_info,
+        }
+
+        if self._gateway:
+            out["gateway"] = self._gateway.serialize()
+
+        if self._auth:
+            out["auth"] = self._auth.serialize()
+
+        if self._session:
+            out["session"] = self._session.session_id
+
+        out["country"] = self._country
+        out["language"] = self._language
+
+        return out
@@ -1,59 +1,407 @@
 """A high-level, convenient abstraction for interacting with the LG
 SmartThinQ API for most use cases.
 """
-import json
 import enum
 import logging
-import requests
 import base64
+import contextlib
 import re
-from collections import namedtuple
-from typing import Any, Dict, Generator, List, Optional
+import struct
+import threading
+import time
+from collections import OrderedDict, deque, namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    cast,
+)
+
+import requests
 
 from . import core
+from .history import HISTORY_CAPACITY, StatusHistory
+from .status import DeltaTracker, DeviceStatus, StatusDelta
 
 
 #: Represents an unknown enum value.
 _UNKNOWN = "Unknown"
 LOGGER = logging.getLogger("wideq.client")
 
+#: How long an access token stays valid, in seconds.
+TOKEN_LIFETIME = 3600
+#: How long before expiry `AuthManager` refreshes a token, in seconds.
+REFRESH_MARGIN = 300
+
+#: How many model descriptions `Client.prefetch_model_info` loads at once.
+PREFETCH_WORKERS = 8
+
+#: Backoff between polls in `Monitor.wait_ready`, in seconds: the first
+#: delay, the growth factor, and the largest delay.
+WARMUP_MIN_DELAY = 0.5
+WARMUP_FACTOR = 1.5
+WARMUP_MAX_DELAY = 5.0
+#: How many recent warmup times `WarmupStats` keeps per model.
+WARMUP_SAMPLES = 32
+
+#: How many threads stop replaced monitoring tasks in the background.
+STOP_WORKERS = 2
+
+R = TypeVar("R")
+E = TypeVar("E", bound=enum.Enum)
+
+WarmupSummary = namedtuple("WarmupSummary", ["count", "median", "max"])
+
+#: How a `Monitor` restarts a failed monitoring task, in seconds.
+#:
+#: The first failure restarts the task right away, since tasks expire
+#: routinely. Each further consecutive failure waits `min_delay`,
+#: growing by `factor` up to `max_delay`. After `threshold` consecutive
+#: failures the circuit breaker opens: the monitor makes no requests
+#: for `cooldown` seconds, then tries a single restart.
+RestartPolicy = namedtuple(
+    "RestartPolicy",
+    ["min_delay", "factor", "max_delay", "threshold", "cooldown"],
+)
+
+DEFAULT_RESTART_POLICY = RestartPolicy(
+    min_delay=2.0, factor=2.0, max_delay=120.0, threshold=5, cooldown=600.0
+)
+
+
+class MonitorState(enum.Enum):
+    """Where a `Monitor` is in its lifecycle."""
+
+    #: The monitor has not been started, or was stopped.
+    STOPPED = "stopped"
+    #: A monitoring task is running.
+    RUNNING = "running"
+    #: The task failed and will be restarted after a delay.
+    BACKOFF = "backoff"
+    #: The task failed repeatedly, and restarts are suspended for the
+    #: policy's cooldown.
+    OPEN = "open"
+
+
+class WarmupStats(object):
+    """Time-to-first-data of monitoring tasks, per device model.
+
+    Monitors record how long each task took, after `start`, to return
+    its first status data. `Monitor.wait_ready` and `PollScheduler` use
+    the typical time for a model to skip polls that would come back
+    empty.
+    """
+
+    def __init__(self, samples: int = WARMUP_SAMPLES) -> None:
+        self._samples: Dict[Optional[str], deque] = {}
+        self._maxlen = samples
+        self._lock = threading.Lock()
+
+    def record(self, model_id: Optional[str], seconds: float) -> None:
+        """Record how long a monitor for a model took to return data."""
+        with self._lock:
+            samples = self._samples.get(model_id)
+            if samples is None:
+                samples = self._samples[model_id] = deque(maxlen=self._maxlen)
+            samples.append(seconds)
+
+    def samples(self, model_id: Optional[str]) -> List[float]:
+        """Get the recorded times for a model, oldest first."""
+        with self._lock:
+            return list(self._samples.get(model_id, ()))
+
+    def estimate(self, model_id: Optional[str]) -> Optional[float]:
+        """Get the median recorded time for a model, or None if none
+        have been recorded.
+        """
+        samples = sorted(self.samples(model_id))
+        if not samples:
+            return None
+        return samples[len(samples) // 2]
+
+    def summary(self) -> Dict[Optional[str], WarmupSummary]:
+        """Get the number, median and maximum of the recorded times for
+        every model.
+        """
+        with self._lock:
+            models = list(self._samples)
+        out = {}
+        for model_id in models:
+            samples = sorted(self.samples(model_id))
+            out[model_id] = WarmupSummary(
+                len(samples), samples[len(samples) // 2], samples[-1]
+            )
+        return out
+
+    def clear(self) -> None:
+        with self._lock:
+            self._samples.clear()
+
+
+#: The warmup times shared by all monitors by default.
+WARMUP_STATS = WarmupStats()
+
+_stop_executor: Optional[ThreadPoolExecutor] = None
+_stop_executor_lock = threading.Lock()
+
+
+def _stopper() -> ThreadPoolExecutor:
+    """Get the shared executor that stops replaced monitoring tasks."""
+    global _stop_executor
+    with _stop_executor_lock:
+        if _stop_executor is None:
+            _stop_executor = ThreadPoolExecutor(
+                STOP_WORKERS, thread_name_prefix="wideq-monitor-stop"
+            )
+        return _stop_executor
+
+
+class MonitorRestarts(object):
+    """The restart state of a monitoring task, shared by `Monitor` and
+    `aio.AsyncMonitor`.
+
+    Repeated failures are retried with exponential backoff, and stop
+    being retried for a while once they pass the `RestartPolicy`'s
+    threshold. `state`, `failures` and `retry_at` describe the restart
+    state.
+    """
+
+    def __init__(self, device_id: str, restart_policy: RestartPolicy) -> None:
+        self.device_id = device_id
+        self.restart_policy = restart_policy
+        #: The ID of the running monitoring task, or None.
+        self.work_id: Optional[str] = None
+        #: The number of consecutive failures of the task.
+        self.failures = 0
+        #: When the next restart is due (by `time.monotonic`), or None
+        #: if none is pending.
+        self.retry_at: Optional[float] = None
+
+    @property
+    def state(self) -> MonitorState:
+        if self.work_id is not None:
+            return MonitorState.RUNNING
+        if self.retry_at is None:
+            return MonitorState.STOPPED
+        if self.failures >= self.restart_policy.threshold:
+            return MonitorState.OPEN
+        return MonitorState.BACKOFF
+
+    def _restart_delay(self) -> float:
+        policy = self.restart_policy
+        if self.failures >= policy.threshold:
+            return policy.cooldown
+        if self.failures <= 1:
+            return 0.0
+        return min(
+            policy.min_delay * policy.factor ** (self.failures - 2),
+            policy.max_delay,
+        )
+
+    def _restart_due(self) -> bool:
+        return self.retry_at is not None and time.monotonic() >= self.retry_at
+
+    def _schedule_restart(self) -> None:
+        """Count a failure and schedule the next restart."""
+        self.failures += 1
+        self.retry_at = time.monotonic() + self._restart_delay()
+        if self.failures == self.restart_policy.threshold:
+            LOGGER.warning(
+                "Monitoring %s failed %d times; pausing restarts",
+                self.device_id,
+                self.failures,
+            )
+
+    def _succeeded(self) -> None:
+        self.failures = 0
 
-class Monitor(object):
+
+class Monitor(MonitorRestarts):
     """A monitoring task for a device.
 
     This task is robust to some API-level failures. If the monitoring
     task expires, it attempts to start a new one automatically. This
     makes one `Monitor` object suitable for long-term monitoring.
+
+    Restarts back off as described by `MonitorRestarts`. While a
+    restart is pending, `poll` returns None without making a request.
+    A restart that fails because the session expired raises, and one
+    that fails to reach the server counts as a failure and raises.
     """
 
-    def __init__(self, session: core.Session, device_id: str) -> None:
+    def __init__(
+        self,
+        session: core.Session,
+        device_id: str,
+        model_id: Optional[str] = None,
+        warmup_stats: Optional[WarmupStats] = None,
+        restart_policy: RestartPolicy = DEFAULT_RESTART_POLICY,
+    ) -> None:
+        super().__init__(device_id, restart_policy)
         self.session = session
-        self.device_id = device_id
+        #: The background stop of the last replaced task, if any.
+        self.stopping: Optional[Future] = None
+        #: The device's model, used to group warmup times.
+        self.model_id = model_id
+        self.warmup_stats = (
+            WARMUP_STATS if warmup_stats is None else warmup_stats
+        )
+        #: When the current task was started (by `time.monotonic`).
+        self.started_at: Optional[float] = None
+        #: How long the current task took to return its first data, or
+        #: None if it has not yet.
+        self.time_to_first_data: Optional[float] = None
 
     def start(self) -> None:
         self.work_id = self.session.monitor_start(self.device_id)
+        self.started_at = time.monotonic()
+        self.time_to_first_data = None
+        self.retry_at = None
+
+    def _failed(self) -> None:
+        """Drop the failed task, stopping it in the background, and
+        schedule a restart.
+        """
+        work_id, self.work_id = self.work_id, None
+        if work_id is not None:
+            self.stopping = _stopper().submit(self._stop_task, work_id)
+        self._schedule_restart()
+
+    def _stop_task(self, work_id: str) -> None:
+        """Stop a task, ignoring errors: it may already be gone."""
+        try:
+            self.session.monitor_stop(self.device_id, work_id)
+        except Exception as exc:
+            LOGGER.debug(
+                "Stopping monitor %s for %s failed: %r",
+                work_id,
+                self.device_id,
+                exc,
+            )
+
+    def _restart_if_due(self) -> None:
+        """Start a new task if a restart is pending and due."""
+        if not self._restart_due():
+            return
+        try:
+            self.start()
+        except (core.NotLoggedInError, core.TokenError):
+            # Retrying cannot help until the session is refreshed.
+            raise
+        except core.APIError as exc:
+            LOGGER.debug(
+                "Restarting monitor for %s failed: %r", self.device_id, exc
+            )
+            self._failed()
+        except requests.RequestException:
+            self._failed()
+            raise
+
+    def ready_in(self) -> Optional[float]:
+        """Get the seconds left until most of the model's typical warmup
+        time has passed since `start`, or None if the task has already
+        returned data or no warmup time is known for the model.
+        """
+        if self.started_at is None or self.time_to_first_data is not None:
+            return None
+        estimate = self.warmup_stats.estimate(self.model_id)
+        if estimate is None:
+            return None
+        # Aim a little early, so fast tasks are not held back.
+        ready_at = self.started_at + estimate * 0.8
+        return max(0.0, ready_at - time.monotonic())
+
+    def _observe(self, data: Optional[bytes]) -> Optional[bytes]:
+        """Note polled data, recording the task's time to first data."""
+        if (
+            data is not None
+            and self.time_to_first_data is None
+            and self.started_at is not None
+        ):
+            elapsed = time.monotonic() - self.started_at
+            self.time_to_first_data = elapsed
+            self.warmup_stats.record(self.model_id, elapsed)
+        return data
 
     def stop(self) -> None:
-        self.session.monitor_stop(self.device_id, self.work_id)
+        """Stop the task and cancel any pending restart. Errors from
+        the server are logged and ignored.
+        """
+        work_id, self.work_id = self.work_id, None
+        self.retry_at = None
+        self.failures = 0
+        if work_id is not None:
+            self._stop_task(work_id)
 
     def poll(self) -> Optional[bytes]:
         """Get the current status data (a bytestring) or None if the
-        device is not yet ready.
+        device is not yet ready, or the task failed and is waiting to
+        be restarted.
         """
 
+        if self.work_id is None:
+            self._restart_if_due()
+            return None
         try:
-            return self.session.monitor_poll(self.device_id, self.work_id)
+            data = self.session.monitor_poll(self.device_id, self.work_id)
         except core.MonitorError:
-            # Try to restart the task.
-            self.stop()
-            self.start()
+            self._failed()
+            self._restart_if_due()
             return None
+        self._succeeded()
+        return self._observe(data)
+
+    def wait_ready(
+        self,
+        timeout: float = 30.0,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> Optional[bytes]:
+        """Poll until the task returns its first status data.
+
+        Before the first poll, wait until most of the model's typical
+        warmup time (see `WarmupStats`) has passed since `start`. After
+        that, poll with exponential backoff between `WARMUP_MIN_DELAY`
+        and `WARMUP_MAX_DELAY` seconds.
+
+        :param timeout: The longest time to wait, in seconds.
+        :returns: The first status data, or None if none arrived in time.
+        :raises RuntimeError: If the monitor has not been started.
+        """
+        if self.work_id is None and self.retry_at is None:
+            raise RuntimeError(
+                "monitor for {} is not started".format(self.device_id)
+            )
+        deadline = time.monotonic() + timeout
+        wait = self.ready_in()
+        if wait:
+            sleep(min(wait, max(0.0, deadline - time.monotonic())))
+
+        delay = WARMUP_MIN_DELAY
+        while True:
+            data = self.poll()
+            if data is not None:
+                return data
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            sleep(min(delay, remaining))
+            delay = min(delay * WARMUP_FACTOR, WARMUP_MAX_DELAY)
 
     @staticmethod
     def decode_json(data: bytes) -> Dict[str, Any]:
         """Decode a bytestring that encodes JSON status data."""
 
-        return json.loads(data.decode("utf8"))
+        return core.json_loads(data)
 
     def poll_json(self) -> Optional[Dict[str, Any]]:
         """For devices where status is reported via JSON data, get the
@@ -71,6 +419,99 @@ class Monitor(object):
         self.stop()
 
 
+class MonitorGroup(object):
+    """A set of monitoring tasks polled together.
+
+    Each call to `poll` fetches the status of every device in the group
+    with a single `rti/rtiResult` request. Monitors that fail are
+    restarted individually, with each monitor's backoff; the others
+    keep their tasks.
+    """
+
+    def __init__(
+        self,
+        session: core.Session,
+        device_ids=(),
+        restart_policy: RestartPolicy = DEFAULT_RESTART_POLICY,
+    ) -> None:
+        self.session = session
+        self.restart_policy = restart_policy
+        self.monitors: Dict[str, Monitor] = {}
+        for device_id in device_ids:
+            self.add(device_id)
+
+    def add(self, device_id: str, model_id: Optional[str] = None) -> Monitor:
+        """Add a device to the group, returning its `Monitor`.
+
+        The monitor is not started; call `start` (or the monitor's own
+        `start`) before polling.
+        """
+
+        mon = Monitor(
+            self.session,
+            device_id,
+            model_id,
+            restart_policy=self.restart_policy,
+        )
+        self.monitors[device_id] = mon
+        return mon
+
+    def remove(self, device_id: str) -> None:
+        """Stop monitoring a device and drop it from the group."""
+
+        self.monitors.pop(device_id).stop()
+
+    def start(self) -> None:
+        for mon in self.monitors.values():
+            mon.start()
+
+    def stop(self) -> None:
+        for mon in self.monitors.values():
+            mon.stop()
+
+    def poll(self) -> Dict[str, Optional[bytes]]:
+        """Get the current status data for every started monitor.
+
+        Return a map from device IDs to status bytestrings, or None for
+        devices that are not yet ready or whose monitor had to be
+        restarted. Monitors waiting to restart are not polled; those
+        whose backoff has passed are restarted.
+        """
+
+        out: Dict[str, Optional[bytes]] = {}
+        work_ids = {}
+        for device_id, mon in self.monitors.items():
+            if mon.work_id is not None:
+                work_ids[device_id] = mon.work_id
+            elif mon.retry_at is not None:
+                mon._restart_if_due()
+                out[device_id] = None
+        if not work_ids:
+            return out
+
+        results = self.session.monitor_poll_many(work_ids)
+        for device_id, res in results.items():
+            mon = self.monitors[device_id]
+            if isinstance(res, core.MonitorError):
+                LOGGER.debug(
+                    "Restarting monitor for %s (code %s)", device_id, res.code
+                )
+                mon._failed()
+                mon._restart_if_due()
+                out[device_id] = None
+            else:
+                mon._succeeded()
+                out[device_id] = mon._observe(res)
+        return out
+
+    def __enter__(self) -> "MonitorGroup":
+        self.start()
+        return self
+
+    def __exit__(self, type, value, tb) -> None:
+        self.stop()
+
+
 class Client(object):
     """A higher-level API wrapper that provides a session more easily
     and allows serialization of state.
@@ -83,6 +524,10 @@ class Client(object):
         session: Optional[core.Session] = None,
         country: str = core.DEFAULT_COUNTRY,
         language: str = core.DEFAULT_LANGUAGE,
+        transport: Optional[core.Transport] = None,
+        gateway_cache: Optional[core.GatewayCache] = None,
+        registry: Optional["ModelRegistry"] = None,
+        model_cache: Optional[core.ModelInfoCache] = None,
     ) -> None:
         # The three steps required to get access to call the API.
         self._gateway: Optional[core.Gateway] = gateway
@@ -97,15 +542,39 @@ class Client(object):
         # responses.
         self._model_info: Dict[str, Any] = {}
 
+        # The compiled models this client has used, by URL. The objects
+        # are shared with other clients through the registry.
+        self._registry: ModelRegistry = (
+            MODEL_REGISTRY if registry is None else registry
+        )
+        self._models: Dict[str, ModelInfo] = {}
+
+        # Where model info JSON is kept between runs, if anywhere. With a
+        # cache, the serialized state does not include the model info.
+        self._model_cache: Optional[core.ModelInfoCache] = model_cache
+
         # Locale information used to discover a gateway, if necessary.
         self._country: str = country
         self._language: str = language
 
+        # The pooled HTTP transport to use for a discovered gateway. It
+        # may be shared between several clients.
+        self._transport: Optional[core.Transport] = transport
+
+        # Where to look for a previously discovered gateway, if anywhere.
+        self._gateway_cache: Optional[core.GatewayCache] = gateway_cache
+
+        # Guards state created lazily by concurrent prefetch workers.
+        self._lock = threading.Lock()
+
     @property
     def gateway(self) -> core.Gateway:
         if not self._gateway:
             self._gateway = core.Gateway.discover(
-                self._country, self._language
+                self._country,
+                self._language,
+                self._transport,
+                self._gateway_cache,
             )
         return self._gateway
 
@@ -160,14 +629,42 @@ class Client(object):
         )
         return Device(self, device_info)
 
+    def close(self) -> None:
+        """Close the pooled connections used by this client."""
+
+        if self._gateway:
+            self._gateway.close()
+        elif self._transport:
+            self._transport.close()
+
+    def __enter__(self) -> "Client":
+        return self
+
+    def __exit__(self, type, value, tb) -> None:
+        self.close()
+
     @classmethod
-    def load(cls, state: Dict[str, Any]) -> "Client":
+    def load(
+        cls,
+        state: Dict[str, Any],
+        transport: Optional[core.Transport] = None,
+        gateway_cache: Optional[core.GatewayCache] = None,
+        model_cache: Optional[core.ModelInfoCache] = None,
+        registry: Optional["ModelRegistry"] = None,
+    ) -> "Client":
         """Load a client from serialized state."""
 
-        client = cls()
+        client = cls(
+            transport=transport,
+            gateway_cache=gateway_cache,
+            model_cache=model_cache,
+            registry=registry,
+        )
 
         if "gateway" in state:
-            client._gateway = core.Gateway.deserialize(state["gateway"])
+            client._gateway = core.Gateway.deserialize(
+                state["gateway"], transport
+            )
 
         if "auth" in state:
             data = state["auth"]
@@ -190,11 +687,20 @@ class Client(object):
         return client
 
     def dump(self) -> Dict[str, Any]:
-        """Serialize the client state."""
+        """Serialize the client state.
 
-        out: Dict[str, Any] = {
-            "model_info": self._model_info,
-        }
+        With a model cache, the model info is written to the cache
+        instead of being included in the state.
+        """
+
+        out: Dict[str, Any] = {}
+
+        if self._model_cache is None:
+            out["model_info"] = self._model_info
+        else:
+            for url, data in self._model_info.items():
+                if url not in self._model_cache:
+                    self._model_cache.put(url, data)
 
         if self._gateway:
             out["gateway"] = self._gateway.serialize()
@@ -212,35 +718,259 @@ class Client(object):
 
     def refresh(self) -> None:
         self._auth = self.auth.refresh()
-        self._session, self._devices = self.auth.start_session()
+        session, self._devices = self.auth.start_session()
+        if self._session:
+            # Update the existing session in place so objects that hold
+            # on to it, like monitors, pick up the new credentials.
+            self._session.auth = session.auth
+            self._session.session_id = session.session_id
+        else:
+            self._session = session
 
     @classmethod
     def from_token(
-        cls, refresh_token, country=None, language=None
+        cls,
+        refresh_token,
+        country=None,
+        language=None,
+        transport=None,
+        gateway_cache=None,
+        model_cache=None,
     ) -> "Client":
         """Construct a client using just a refresh token.
 
         This allows simpler state storage (e.g., for human-written
         configuration) but it is a little less efficient because we need
-        to reload the gateway servers and restart the session.
+        to reload the gateway servers and restart the session. Pass a
+        `GatewayCache` to skip the gateway discovery when possible.
         """
 
         client = cls(
             country=country or core.DEFAULT_COUNTRY,
             language=language or core.DEFAULT_LANGUAGE,
+            transport=transport,
+            gateway_cache=gateway_cache,
+            model_cache=model_cache,
         )
         client._auth = core.Auth(client.gateway, None, refresh_token)
         client.refresh()
         return client
 
+    @property
+    def transport(self) -> core.Transport:
+        """The pooled HTTP transport for this client's requests."""
+
+        if self._gateway:
+            return self._gateway.transport
+        with self._lock:
+            if self._transport is None:
+                self._transport = core.Transport()
+            return self._transport
+
+    def _fetch_model_info(
+        self, url: str, revalidate: bool = False
+    ) -> Dict[str, Any]:
+        """Get a model's JSON data from the model cache, or download it
+        (and cache it).
+
+        With `revalidate`, a cached copy is checked with the server
+        using its ETag and Last-Modified validators and only downloaded
+        again if it changed.
+        """
+        cache = self._model_cache
+        entry = cache.entry(url) if cache is not None else None
+        cached = cache.get(url) if cache is not None and entry else None
+        if cached is not None and not revalidate:
+            return cached
+
+        validators: Dict[str, Optional[str]] = {}
+        if cached is not None and entry is not None:
+            validators = {
+                "etag": entry.get("etag"),
+                "last_modified": entry.get("last_modified"),
+            }
+        data, validators = core.fetch_model_info(
+            url, self.transport, **validators
+        )
+        if data is None:
+            # Only a cached copy is revalidated, so there is one.
+            assert cached is not None
+            LOGGER.debug("Model info not modified: %s", url)
+            return cached
+        if cache is not None:
+            cache.put(url, data, **validators)
+        return data
+
+    def prefetch_model_info(
+        self,
+        devices: Optional[Iterable["DeviceInfo"]] = None,
+        max_workers: int = PREFETCH_WORKERS,
+        revalidate: bool = False,
+    ) -> Dict[str, "ModelInfo"]:
+        """Load the model info for several devices concurrently.
+
+        `devices` defaults to all the user's devices. Models this client
+        has not loaded yet are fetched from the model cache or the
+        server, at most `max_workers` at a time. With `revalidate`,
+        cached copies are revalidated with the server, as in
+        `_fetch_model_info`. Return the loaded models by URL.
+        """
+        if devices is None:
+            devices = self.devices
+        urls = {device.model_info_url for device in devices}
+        missing = [
+            url for url in urls if revalidate or url not in self._model_info
+        ]
+
+        if missing:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                fetched = executor.map(
+                    lambda url: self._fetch_model_info(url, revalidate),
+                    missing,
+                )
+                for url, data in zip(missing, fetched):
+                    if data != self._model_info.get(url):
+                        self._models.pop(url, None)
+                        self._model_info[url] = data
+
+        return {url: self._model(url) for url in urls}
+
     def model_info(self, device: "DeviceInfo") -> "ModelInfo":
         """For a DeviceInfo object, get a ModelInfo object describing
         the model's capabilities.
         """
-        url = device.model_info_url
-        if url not in self._model_info:
-            self._model_info[url] = device.load_model_info()
-        return ModelInfo(self._model_info[url])
+        return self._model(device.model_info_url)
+
+    def _model(self, url: str) -> "ModelInfo":
+        model = self._models.get(url)
+        if model is None:
+            if url not in self._model_info:
+                self._model_info[url] = self._fetch_model_info(url)
+            model = self._registry.get(url, self._model_info[url])
+
+            # Keep the registry's copy of the data rather than our own.
+            self._model_info[url] = model.data
+            self._models[url] = model
+        return model
+
+
+class AuthManager(object):
+    """Keeps a `Client`'s authentication and session fresh.
+
+    The manager tracks the age of the access token and refreshes it
+    before it expires, either on the next `call` or from a background
+    thread started with `start`. Refreshes are single-flight: when
+    several threads find the session expired at once, one of them
+    refreshes and the others wait for it and reuse the result.
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        lifetime: float = TOKEN_LIFETIME,
+        margin: float = REFRESH_MARGIN,
+    ) -> None:
+        self.client = client
+        self.lifetime = lifetime
+        self.margin = margin
+
+        # The token's age is unknown for restored state, so count from
+        # now. A reactive refresh in `call` covers older tokens.
+        self.refreshed_at = time.monotonic()
+
+        # Incremented by every refresh, so a caller can tell whether the
+        # session it saw fail has already been replaced.
+        self.generation = 0
+
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def age(self) -> float:
+        """Seconds since the token was last refreshed."""
+        return time.monotonic() - self.refreshed_at
+
+    @property
+    def expiring(self) -> bool:
+        """Whether the token is due for a proactive refresh."""
+        return self.age >= self.lifetime - self.margin
+
+    def refresh(self, generation: Optional[int] = None) -> None:
+        """Refresh the client's authentication and session.
+
+        If `generation` is given and another caller has refreshed since
+        that generation was observed, return without refreshing again.
+        """
+
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            LOGGER.debug("Refreshing authentication")
+            self.client.refresh()
+            self.refreshed_at = time.monotonic()
+            self.generation += 1
+
+    def call(self, func: Callable[..., R], *args, **kwargs) -> R:
+        """Call `func`, refreshing the session around it as needed.
+
+        An expiring token is refreshed first. If `func` raises
+        `NotLoggedInError`, the session is refreshed (or the concurrent
+        refresh is awaited) and `func` is called once more. `func`
+        should look up `client.session` when it runs rather than
+        capturing a session beforehand.
+        """
+
+        generation = self.generation
+        if self.expiring:
+            self.refresh(generation)
+            generation = self.generation
+
+        try:
+            return func(*args, **kwargs)
+        except core.NotLoggedInError:
+            LOGGER.info("Session expired.")
+            self.refresh(generation)
+            return func(*args, **kwargs)
+
+    def start(self, interval: float = 60) -> None:
+        """Refresh the token in a background thread, checking its age
+        every `interval` seconds.
+        """
+
+        if self._thread:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(interval,), daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background refresh thread."""
+
+        self._stopped.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self, interval: float) -> None:
+        while not self._stopped.wait(interval):
+            if not self.expiring:
+                continue
+            try:
+                self.refresh(self.generation)
+            except Exception:
+                # Keep the thread alive; `call` still refreshes
+                # reactively if the token does expire.
+                LOGGER.exception("Background refresh failed")
+
+    def __enter__(self) -> "AuthManager":
+        self.start()
+        return self
+
+    def __exit__(self, type, value, tb) -> None:
+        self.stop()
 
 
 class DeviceType(enum.Enum):
@@ -304,12 +1034,16 @@ class DeviceInfo(object):
 
         return DeviceType(self.data["deviceType"])
 
-    def load_model_info(self):
+    def load_model_info(self, transport: Optional[core.Transport] = None):
         """Load JSON data describing the model's capabilities."""
-        return requests.get(self.model_info_url).json()
+        data, _ = core.fetch_model_info(self.model_info_url, transport)
+        return data
 
 
 BitValue = namedtuple("BitValue", ["options"])
+#: One flag packed into a `Bit` value: `length` bits starting at
+#: `startbit`, counting from the least significant bit.
+BitField = namedtuple("BitField", ["name", "startbit", "length"])
 EnumValue = namedtuple("EnumValue", ["options"])
 RangeValue = namedtuple("RangeValue", ["min", "max", "step"])
 #: This is a value that is a reference to another key in the data that is at
@@ -318,56 +1052,284 @@ ReferenceValue = namedtuple("ReferenceValue", ["reference"])
 StringValue = namedtuple("StringValue", ["comment"])
 
 
-class ModelInfo(object):
-    """A description of a device model's capabilities."""
+#: `struct` codes for the big-endian unsigned field sizes it can unpack.
+_STRUCT_CODES = {1: "B", 2: "H", 4: "I", 8: "Q"}
+#: Preformatted strings for single-byte values.
+_BYTE_STRINGS = tuple(str(i) for i in range(256))
 
-    def __init__(self, data):
-        self.data = data
 
-    def value(self, name: str):
-        """Look up information about a value.
+class BinaryDecoder(object):
+    """A decoder for a model's binary monitoring frames, built once from
+    its `Monitoring.protocol`.
 
-        :param name: The name to look up.
-        :returns: One of (`BitValue`, `EnumValue`, `RangeValue`,
-            `ReferenceValue`, `StringValue`).
-        :raises ValueError: If an unsupported type is encountered.
+    Each protocol item is a big-endian unsigned integer field. When the
+    fields do not overlap and have sizes `struct` supports, a whole
+    frame is unpacked with one precompiled `struct.Struct`; otherwise,
+    and for frames shorter than the protocol, each field is sliced out
+    with `int.from_bytes`. Values are returned as strings, like the
+    keys in the JSON monitoring data.
+    """
+
+    __slots__ = ("fields", "keys", "struct", "ranges", "_format")
+
+    def __init__(self, protocol: List[Dict[str, Any]]) -> None:
+        #: `(key, start, end)` byte ranges, in protocol order.
+        self.fields: List[Tuple[str, int, int]] = [
+            (
+                item["value"],
+                item["startByte"],
+                item["startByte"] + item["length"],
+            )
+            for item in protocol
+        ]
+        #: `(start, end)` byte ranges by key, for decoding single fields.
+        self.ranges: Dict[str, Tuple[int, int]] = {
+            key: (start, end) for key, start, end in self.fields
+        }
+        self.keys: List[str] = []
+        self.struct: Optional[struct.Struct] = None
+        self._format: Callable[[int], str] = str
+
+        fmt = ">"
+        offset = 0
+        for key, start, end in sorted(self.fields, key=lambda f: f[1]):
+            code = _STRUCT_CODES.get(end - start)
+            if code is None or start < offset:
+                return  # Fall back to slicing every field.
+            fmt += "x" * (start - offset) + code
+            offset = end
+            self.keys.append(key)
+        self.struct = struct.Struct(fmt)
+
+        # Formatting ints is most of the work, so when every field is a
+        # single byte, look the strings up instead.
+        if all(end - start == 1 for _, start, end in self.fields):
+            self._format = _BYTE_STRINGS.__getitem__
+
+    def decode(self, data) -> Dict[str, str]:
+        """Decode one frame into a map from keys to value strings."""
+
+        if self.struct is not None and len(data) >= self.struct.size:
+            values = self.struct.unpack_from(data)
+            return dict(zip(self.keys, map(self._format, values)))
+
+        view = memoryview(data)
+        return {
+            key: str(int.from_bytes(view[start:end], "big"))
+            for key, start, end in self.fields
+        }
+
+    def decode_field(self, data, key: str) -> str:
+        """Decode a single field of a frame.
+
+        :raises KeyError: If `key` is not part of the protocol.
+        """
+
+        start, end = self.ranges[key]
+        return str(int.from_bytes(data[start:end], "big"))
+
+    def decode_fields(self, data, fields: Iterable[str]) -> Dict[str, str]:
+        """Decode only the given fields of a frame. Keys that are not
+        part of the protocol are skipped.
         """
+
+        view = memoryview(data)
+        ranges = self.ranges
+        out = {}
+        for key in fields:
+            if key in ranges:
+                start, end = ranges[key]
+                out[key] = str(int.from_bytes(view[start:end], "big"))
+        return out
+
+    def decode_many(self, frames: Iterable[bytes]) -> List[Dict[str, str]]:
+        """Decode a batch of frames."""
+
+        decode = self.decode
+        return [decode(frame) for frame in frames]
+
+
+class LazyFrame(Mapping):
+    """A read-only view of a binary monitoring frame that decodes each
+    field the first time it is read.
+
+    It behaves like the dict returned by `BinaryDecoder.decode`, so it
+    can be handed to the status classes in its place.
+    """
+
+    __slots__ = ("decoder", "data", "_values")
+
+    def __init__(self, decoder: BinaryDecoder, data: bytes) -> None:
+        self.decoder = decoder
+        self.data = data
+        self._values: Dict[str, str] = {}
+
+    def __getitem__(self, key: str) -> str:
+        try:
+            return self._values[key]
+        except KeyError:
+            value = self._values[key] = self.decoder.decode_field(
+                self.data, key
+            )
+            return value
+
+    def __contains__(self, key) -> bool:
+        return key in self.decoder.ranges
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.decoder.ranges)
+
+    def __len__(self) -> int:
+        return len(self.decoder.ranges)
+
+    def __repr__(self) -> str:
+        return "<LazyFrame {!r}>".format(dict(self))
+
+
+class ValueInfo(object):
+    """A compiled `Value` entry of a model description.
+
+    `value` is the descriptor returned by `ModelInfo.value`. For enum
+    and bit values, `inverse` maps friendly names back to their encoded
+    values. For bit values, `bits` holds a `BitField` for every flag.
+    """
+
+    __slots__ = ("value", "inverse", "bits")
+
+    def __init__(
+        self,
+        value,
+        inverse: Optional[Dict[str, Any]] = None,
+        bits: Optional[Tuple[BitField, ...]] = None,
+    ):
+        self.value = value
+        self.inverse = inverse
+        self.bits = bits
+
+
+def _identity(value):
+    return value
+
+
+def _to_number(value):
+    """Convert a range value, which is often a string, to an `int` or a
+    `float`. Values that are not numbers are returned unchanged.
+    """
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return value
+
+
+class ModelInfo(object):
+    """A description of a device model's capabilities.
+
+    Each `Value` entry is compiled into a `ValueInfo` the first time it
+    is used (or up front, with `compile`), so later lookups are simple
+    dictionary hits.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self._values: Dict[str, ValueInfo] = {}
+        self._binary: Optional[bool] = None
+        self._binary_decoder: Optional[BinaryDecoder] = None
+        self._bit_keys: Optional[Tuple[str, ...]] = None
+        # Each table's values are members of the enum class in its key.
+        self._enum_tables: Dict[Tuple[str, type], Dict[Any, Any]] = {}
+        self._formatters: Dict[str, Callable[[Any], Any]] = {}
+
+    def _compile_value(self, name: str) -> ValueInfo:
         d = self.data["Value"][name]
         if d["type"] in ("Enum", "enum"):
-            return EnumValue(d["option"])
+            options = d["option"]
+            return ValueInfo(
+                EnumValue(options), {v: k for k, v in options.items()}
+            )
         elif d["type"] == "Range":
-            return RangeValue(
-                d["option"]["min"],
-                d["option"]["max"],
-                d["option"].get("step", 1),
+            return ValueInfo(
+                RangeValue(
+                    d["option"]["min"],
+                    d["option"]["max"],
+                    d["option"].get("step", 1),
+                )
             )
         elif d["type"].lower() == "bit":
             bit_values = {opt["startbit"]: opt["value"] for opt in d["option"]}
-            return BitValue(bit_values)
+            bits = tuple(
+                BitField(
+                    opt["value"],
+                    int(opt["startbit"]),
+                    int(opt.get("length", 1)),
+                )
+                for opt in d["option"]
+            )
+            return ValueInfo(
+                BitValue(bit_values),
+                {v: k for k, v in bit_values.items()},
+                bits,
+            )
         elif d["type"].lower() == "reference":
             ref = d["option"][0]
-            return ReferenceValue(self.data[ref])
+            return ValueInfo(ReferenceValue(self.data[ref]))
         elif d["type"].lower() == "string":
-            return StringValue(d.get("_comment", ""))
+            return ValueInfo(StringValue(d.get("_comment", "")))
         else:
             raise ValueError(
                 f"unsupported value name: '{name}'"
                 f" type: '{str(d['type'])}' data: '{str(d)}'"
             )
 
+    def value_info(self, name: str) -> ValueInfo:
+        """Get the compiled `ValueInfo` for a value, compiling it on
+        first use.
+
+        :raises ValueError: If an unsupported type is encountered.
+        """
+        try:
+            return self._values[name]
+        except KeyError:
+            info = self._values[name] = self._compile_value(name)
+            return info
+
+    def compile(self) -> "ModelInfo":
+        """Compile every supported value up front.
+
+        Values of unsupported types are skipped; looking them up still
+        raises `ValueError`.
+        """
+        for name in self.data.get("Value", {}):
+            try:
+                self.value_info(name)
+            except (ValueError, KeyError, TypeError, IndexError):
+                LOGGER.debug("Not compiling value %s", name)
+        return self
+
+    def value(self, name: str):
+        """Look up information about a value.
+
+        :param name: The name to look up.
+        :returns: One of (`BitValue`, `EnumValue`, `RangeValue`,
+            `ReferenceValue`, `StringValue`).
+        :raises ValueError: If an unsupported type is encountered.
+        """
+        return self.value_info(name).value
+
     def default(self, name):
         """Get the default value, if it exists, for a given value."""
         return self.data["Value"][name]["default"]
 
     def enum_value(self, key, name):
         """Look up the encoded value for a friendly enum name."""
-        options = self.value(key).options
-        options_inv = {v: k for k, v in options.items()}  # Invert the map.
-        return options_inv[name]
+        return self.value_info(key).inverse[name]
 
     def enum_name(self, key, value):
         """Look up the friendly enum name for an encoded value."""
-        options = self.value(key).options
+        options = self.value_info(key).value.options
         if value not in options:
             LOGGER.warning(
                 "Value `%s` for key `%s` not in options: %s. Values from API: "
@@ -380,6 +1342,39 @@ class ModelInfo(object):
             return _UNKNOWN
         return options[value]
 
+    def enum_table(self, key: str, enum_cls: Type[E]) -> Dict[Any, E]:
+        """Get a map from the encoded values of an enum value straight to
+        the members of `enum_cls`, built on first use.
+
+        Codes whose friendly names are not members of `enum_cls` are
+        left out.
+        """
+        try:
+            return cast(Dict[Any, E], self._enum_tables[key, enum_cls])
+        except KeyError:
+            pass
+
+        table: Dict[Any, E] = {}
+        for code, name in self.value_info(key).value.options.items():
+            try:
+                table[code] = enum_cls(name)
+            except ValueError:
+                continue
+        self._enum_tables[key, enum_cls] = table
+        return table
+
+    def enum_member(self, key: str, value: Any, enum_cls: Type[E]) -> E:
+        """Look up the member of `enum_cls` for an encoded enum value.
+
+        Codes missing from the table fall back to `enum_name`, which logs
+        unknown values, so enums with an `UNKNOWN` member get it and
+        others raise `ValueError`.
+        """
+        try:
+            return self.enum_table(key, enum_cls)[value]
+        except KeyError:
+            return enum_cls(self.enum_name(key, value))
+
     def reference_name(self, key: str, value: Any) -> Optional[str]:
         """Look up the friendly name for an encoded reference value.
 
@@ -389,39 +1384,231 @@ class ModelInfo(object):
             can be found None will be returned.
         """
         value = str(value)
-        reference = self.value(key).reference
+        reference = self.value_info(key).value.reference
         if value in reference:
             return reference[value]["_comment"]
         return None
 
+    def bit_fields(self, key: str) -> Tuple[BitField, ...]:
+        """Get the flags packed into a `Bit` value.
+
+        :raises ValueError: If `key` is not a bit value.
+        """
+        bits = self.value_info(key).bits
+        if bits is None:
+            raise ValueError(f"value '{key}' is not a bit value")
+        return bits
+
+    def decode_bits(self, key: str, raw: Any) -> Dict[str, int]:
+        """Unpack every flag of a `Bit` value.
+
+        :param key: The name of the bit value, e.g. `Option1`.
+        :param raw: The encoded value, as an int or a numeric string.
+        :returns: A map from flag names to their integer values. One-bit
+            flags are 0 or 1.
+        """
+        raw = int(raw)
+        return {
+            field.name: (raw >> field.startbit) & ((1 << field.length) - 1)
+            for field in self.bit_fields(key)
+        }
+
+    @property
+    def bit_keys(self) -> Tuple[str, ...]:
+        """The names of every `Bit` value in the model."""
+        if self._bit_keys is None:
+            self._bit_keys = tuple(
+                name
+                for name, d in self.data.get("Value", {}).items()
+                if str(d.get("type", "")).lower() == "bit"
+            )
+        return self._bit_keys
+
+    def decode_options(self, data: Mapping[str, Any]) -> Dict[str, int]:
+        """Unpack the flags of every `Bit` value present in status data.
+
+        Flags are merged into one map. When several values define a flag
+        with the same name, the later value wins.
+        """
+        options: Dict[str, int] = {}
+        for key in self.bit_keys:
+            if key in data:
+                options.update(self.decode_bits(key, data[key]))
+        return options
+
+    def _compile_formatter(self, key: str) -> Callable[[Any], Any]:
+        try:
+            desc = self.value(key)
+        except (KeyError, ValueError, TypeError, IndexError):
+            # Unknown keys and unsupported types are left as they are.
+            return _identity
+
+        if isinstance(desc, EnumValue):
+            options = desc.options
+
+            def format_enum(value):
+                return options.get(value, value)
+
+            return format_enum
+        elif isinstance(desc, RangeValue):
+            return _to_number
+        elif isinstance(desc, BitValue):
+
+            def format_bits(value):
+                try:
+                    return self.decode_bits(key, value)
+                except (TypeError, ValueError):
+                    return value
+
+            return format_bits
+        elif isinstance(desc, ReferenceValue):
+
+            def format_reference(value):
+                name = self.reference_name(key, value)
+                return value if name is None else name
+
+            return format_reference
+        return _identity
+
+    def formatter(self, key: str) -> Callable[[Any], Any]:
+        """Get a function that turns an encoded status value for `key`
+        into a friendly one, compiled on first use.
+
+        Enum codes become their friendly names, ranges become numbers,
+        bit values become maps of flags (see `decode_bits`), and
+        references become their names. Values that cannot be formatted,
+        and values of unknown keys, are returned unchanged.
+        """
+        try:
+            return self._formatters[key]
+        except KeyError:
+            fmt = self._formatters[key] = self._compile_formatter(key)
+            return fmt
+
     @property
     def binary_monitor_data(self):
         """Check that type of monitoring is BINARY(BYTE)."""
-        return self.data["Monitoring"]["type"] == "BINARY(BYTE)"
+        if self._binary is None:
+            self._binary = self.data["Monitoring"]["type"] == "BINARY(BYTE)"
+        return self._binary
+
+    @property
+    def binary_decoder(self) -> BinaryDecoder:
+        """The compiled decoder for this model's binary status data."""
+        if self._binary_decoder is None:
+            self._binary_decoder = BinaryDecoder(
+                self.data["Monitoring"]["protocol"]
+            )
+        return self._binary_decoder
 
     def decode_monitor_binary(self, data):
         """Decode binary encoded status data."""
-        decoded = {}
-        for item in self.data["Monitoring"]["protocol"]:
-            key = item["value"]
-            value = 0
-            for v in data[
-                item["startByte"] : item["startByte"] + item["length"]
-            ]:
-                value = (value << 8) + v
-            decoded[key] = str(value)
-        return decoded
+        return self.binary_decoder.decode(data)
 
     def decode_monitor_json(self, data):
         """Decode a bytestring that encodes JSON status data."""
-        return json.loads(data.decode("utf8"))
+        return core.json_loads(data)
 
-    def decode_monitor(self, data):
-        """Decode  status data."""
+    def decode_monitor(
+        self,
+        data,
+        fields: Optional[Iterable[str]] = None,
+        lazy: bool = False,
+    ) -> Mapping[str, Any]:
+        """Decode  status data.
+
+        :param fields: If given, decode only these keys. Keys missing
+            from the data are left out of the result.
+        :param lazy: For binary data, return a `LazyFrame` that decodes
+            each field on first access. Ignored when `fields` is given.
+        """
         if self.binary_monitor_data:
-            return self.decode_monitor_binary(data)
+            decoder = self.binary_decoder
+            if fields is not None:
+                return decoder.decode_fields(data, fields)
+            if lazy:
+                return LazyFrame(decoder, data)
+            return decoder.decode(data)
+
+        res = self.decode_monitor_json(data)
+        if fields is not None:
+            return {key: res[key] for key in fields if key in res}
+        return res
+
+    def decode_many(self, frames: Iterable[bytes]) -> List[Dict[str, Any]]:
+        """Decode a batch of status data frames."""
+        if self.binary_monitor_data:
+            return self.binary_decoder.decode_many(frames)
         else:
-            return self.decode_monitor_json(data)
+            return [self.decode_monitor_json(frame) for frame in frames]
+
+
+#: The default number of models a `ModelRegistry` keeps.
+MODEL_REGISTRY_SIZE = 128
+
+RegistryStats = namedtuple(
+    "RegistryStats", ["hits", "misses", "evictions", "size"]
+)
+
+
+class ModelRegistry(object):
+    """A thread-safe store of `ModelInfo` objects shared across clients.
+
+    Models are keyed by their URL and `core.content_hash`, so every
+    device of the same model, in any client, shares one compiled
+    `ModelInfo`. At most `maxsize` models are kept; the least recently
+    used ones are evicted first.
+    """
+
+    def __init__(self, maxsize: int = MODEL_REGISTRY_SIZE) -> None:
+        self.maxsize = maxsize
+        self._models: "OrderedDict[Tuple[str, str], ModelInfo]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, url: str, data: Dict[str, Any]) -> ModelInfo:
+        """Get the shared `ModelInfo` for a model's data, adding it to
+        the registry if necessary.
+        """
+        key = (url, core.content_hash(data))
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._hits += 1
+                self._models.move_to_end(key)
+                return model
+
+            self._misses += 1
+            model = self._models[key] = ModelInfo(data)
+            while len(self._models) > self.maxsize:
+                self._models.popitem(last=False)
+                self._evictions += 1
+            return model
+
+    @property
+    def stats(self) -> RegistryStats:
+        """Hit, miss, and eviction counts, and the current size."""
+        with self._lock:
+            return RegistryStats(
+                self._hits, self._misses, self._evictions, len(self._models)
+            )
+
+    def clear(self) -> None:
+        """Drop every model and reset the statistics."""
+        with self._lock:
+            self._models.clear()
+            self._hits = self._misses = self._evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+
+#: The process-wide registry used by clients by default.
+MODEL_REGISTRY = ModelRegistry()
 
 
 class Device(object):
@@ -440,13 +1627,55 @@ class Device(object):
         self.device = device
         self.model: ModelInfo = client.model_info(device)
 
+        # Control changes collected by an active `controls` block, or
+        # None when changes are sent immediately.
+        self._pending_controls: Optional[Dict[str, Any]] = None
+        self._deltas: Optional[DeltaTracker] = None
+        #: Recent statuses, if enabled with `enable_history`.
+        self.history: Optional[StatusHistory] = None
+
     def _set_control(self, key, value):
-        """Set a device's control for `key` to `value`."""
+        """Set a device's control for `key` to `value`.
+
+        Inside a `controls` block, the change is queued and sent along
+        with the others when the block exits.
+        """
+        if self._pending_controls is not None:
+            self._pending_controls[key] = value
+            return
         self.client.session.set_device_controls(
             self.device.id,
             {key: value},
         )
 
+    @contextlib.contextmanager
+    def controls(self) -> Iterator["Device"]:
+        """Batch several control changes into one request.
+
+        Setters called on the device inside the block are merged into a
+        single `set_device_controls` payload, which is sent when the
+        block exits normally. If the block raises, nothing is sent.
+        Later changes to the same key replace earlier ones::
+
+            with ac.controls() as c:
+                c.set_mode(ACMode.COOL)
+                c.set_fan_speed(ACFanSpeed.HIGH)
+
+        Nested blocks join the outermost one.
+        """
+        if self._pending_controls is not None:
+            yield self
+            return
+
+        self._pending_controls = {}
+        try:
+            yield self
+            values = self._pending_controls
+        finally:
+            self._pending_controls = None
+        if values:
+            self.client.session.set_device_controls(self.device.id, values)
+
     def _get_config(self, key):
         """Look up a device's configuration for a given value.
 
@@ -458,14 +1687,14 @@ class Device(object):
         )
         data = base64.b64decode(data).decode("utf8")
         try:
-            return json.loads(data)
-        except json.decoder.JSONDecodeError:
+            return core.json_loads(data)
+        except ValueError:
             # Sometimes, the service returns JSON wrapped in an extra
             # pair of curly braces. Try removing them and re-parsing.
             LOGGER.debug("attempting to fix JSON format")
             try:
-                return json.loads(re.sub(r"^\{(.*?)\}$", r"\1", data))
-            except json.decoder.JSONDecodeError:
+                return core.json_loads(re.sub(r"^\{(.*?)\}$", r"\1", data))
+            except ValueError:
                 raise core.MalformedResponseError(data)
 
     def _get_control(self, key):
@@ -480,9 +1709,120 @@ class Device(object):
         _, value = data[1:-1].split(":")
         return value
 
+    def _decode_status(
+        self,
+        data: bytes,
+        fields: Optional[Iterable[str]] = None,
+        lazy: bool = False,
+    ):
+        """Wrap raw monitoring data in this device's status class.
+
+        Subclasses with their own status classes override this; the
+        default is a `DeviceStatus` built from the model.
+        """
+        return DeviceStatus(
+            self, self.model.decode_monitor(data, fields, lazy)
+        )
+
+    def poll(
+        self,
+        fields: Optional[Iterable[str]] = None,
+        lazy: bool = False,
+        snapshot: bool = False,
+    ):
+        """Poll the device's current state.
+
+        Monitoring must be started first with `monitor_start`.
+
+        :param fields: Decode only these keys; properties that read
+            other keys will raise `KeyError`.
+        :param lazy: Decode each key the first time it is read.
+        :param snapshot: Return an immutable `StatusSnapshot` of the
+            status instead.
+        :returns: Either a status object (a `DeviceStatus`, unless the
+            subclass has its own) or `None` if the status is not yet
+            available.
+        """
+        # Abort if monitoring has not started yet.
+        if not hasattr(self, "mon"):
+            return None
+
+        data = self.mon.poll()
+        if not data:
+            return None
+        status = self._decode_status(data, fields, lazy)
+        if snapshot:
+            status = status.snapshot()
+        self._record(status)
+        return status
+
+    def enable_history(
+        self,
+        capacity: int = HISTORY_CAPACITY,
+        fields: Optional[Iterable[str]] = None,
+    ) -> StatusHistory:
+        """Start recording every polled status in `history`.
+
+        :param capacity: The number of samples to keep.
+        :param fields: The status properties to record; by default, all
+            of them except option maps.
+        """
+        self.history = StatusHistory(capacity, fields)
+        return self.history
+
+    def disable_history(self) -> None:
+        """Stop recording statuses and drop the history."""
+        self.history = None
+
+    def _record(self, status, timestamp: Optional[float] = None) -> None:
+        """Add a polled status to the history, if it is enabled."""
+        if self.history is not None:
+            self.history.append(status, timestamp)
+
+    @property
+    def deltas(self) -> DeltaTracker:
+        """The `DeltaTracker` that `poll_delta` feeds. Subscribe to it to
+        be called with every change.
+        """
+        if self._deltas is None:
+            self._deltas = DeltaTracker()
+        return self._deltas
+
+    def poll_delta(self) -> Optional[StatusDelta]:
+        """Poll the device and compare its status with the previous one.
+
+        Monitoring must be started first with `monitor_start`.
+
+        :returns: A `StatusDelta`, which is false if nothing changed, or
+            `None` if the status is not yet available. When the device
+            reports exactly the same data as last time, it is not decoded
+            again.
+        """
+        if not hasattr(self, "mon"):
+            return None
+
+        data = self.mon.poll()
+        if not data:
+            return None
+        delta = self.deltas.update_raw(
+            data, lambda raw: self._decode_status(raw).snapshot()
+        )
+        self._record(delta.snapshot, delta.timestamp)
+        return delta
+
+    def warmup_remaining(self) -> Optional[float]:
+        """Get the seconds until the monitor is expected to return its
+        first status data (see `Monitor.ready_in`), or None if unknown.
+        """
+        if not hasattr(self, "mon"):
+            return None
+        return self.mon.ready_in()
+
     def monitor_start(self):
         """Start monitoring the device's status."""
-        mon = Monitor(self.client.session, self.device.id)
+        mon = Monitor(
+            self.client.session, self.device.id, self.device.model_id
+        )
         mon.start()
         self.mon = mon
 
@@ -1,6 +1,8 @@
 """A low-level, general abstraction for the LG SmartThinQ API.
 """
 import base64
+import gzip
+import json
 import uuid
 from urllib.parse import urljoin, urlencode, urlparse, parse_qs
 import hashlib
@@ -8,8 +10,14 @@ import hmac
 import datetime
 import requests
 import logging
-from typing import Any, Dict, List, Tuple
+import os
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from typing import Any, Dict, List, Optional, Tuple, Union
 from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.exceptions import NewConnectionError
 from requests.packages.urllib3.util.retry import Retry
 
 GATEWAY_URL = "https://kic.lgthinq.com:46030/api/common/gatewayUriList"
@@ -23,10 +31,90 @@ OAUTH_CLIENT_KEY = "LGAO221A02"
 DATE_FORMAT = "%a, %d %b %Y %H:%M:%S +0000"
 DEFAULT_COUNTRY = "US"
 DEFAULT_LANGUAGE = "en-US"
+GATEWAY_CACHE_TTL = 24 * 60 * 60  # Gateways rarely change; keep a day.
 
 RETRY_COUNT = 5  # Anecdotally this seems sufficient.
 RETRY_FACTOR = 0.5
 RETRY_STATUSES = (502, 503, 504)
+#: Methods that are safe to send twice, as in urllib3's `Retry`.
+IDEMPOTENT_METHODS = frozenset(
+    ["DELETE", "GET", "HEAD", "OPTIONS", "PUT", "TRACE"]
+)
+POOL_SIZE = 10  # Connections kept alive per host.
+
+#: Time limits for one API call: `timeout` bounds each HTTP attempt and
+#: `deadline` bounds the whole call, including retries and backoff. Both
+#: are in seconds; None means unlimited.
+RequestBudget = namedtuple("RequestBudget", ["timeout", "deadline"])
+UNLIMITED = RequestBudget(None, None)
+
+
+#: The JSON functions used throughout the library: `loads` accepts text or
+#: bytes and `dumps` returns text.
+JSONCodec = namedtuple("JSONCodec", ["loads", "dumps"])
+
+
+def _default_json_codec() -> JSONCodec:
+    """Pick the fastest available JSON library, falling back to the
+    standard library.
+    """
+
+    try:
+        import orjson  # type: ignore
+
+        def orjson_dumps(obj) -> str:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+        return JSONCodec(orjson.loads, orjson_dumps)
+    except ImportError:
+        pass
+
+    try:
+        import ujson  # type: ignore
+
+        return JSONCodec(ujson.loads, ujson.dumps)
+    except ImportError:
+        pass
+
+    return JSONCodec(json.loads, json.dumps)
+
+
+_json_codec = _default_json_codec()
+
+
+def set_json_codec(codec: Optional[JSONCodec] = None) -> None:
+    """Replace the JSON codec used by the library.
+
+    Pass None to restore the default (orjson or ujson if installed,
+    otherwise the standard library). Decoding errors must be raised as
+    `ValueError` subclasses, as they are by all three.
+    """
+
+    global _json_codec
+    _json_codec = codec or _default_json_codec()
+
+
+def json_loads(data: Union[str, bytes]) -> Any:
+    """Decode JSON text or UTF-8 bytes with the configured codec."""
+    return _json_codec.loads(data)
+
+
+def json_dumps(obj: Any) -> str:
+    """Encode an object as JSON text with the configured codec."""
+    return _json_codec.dumps(obj)
+
+
+def content_hash(obj: Any) -> str:
+    """Get a stable hash of JSON data.
+
+    The data is hashed in a canonical encoding, with sorted keys and no
+    whitespace, made by the standard library rather than the configured
+    codec, so equal data always has the same hash.
+    """
+    text = json.dumps(
+        obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.sha1(text.encode("utf8")).hexdigest()
 
 
 def get_wideq_logger() -> logging.Logger:
@@ -84,6 +172,222 @@ def retry_session():
     return session
 
 
+class Transport(object):
+    """A long-lived, thread-safe HTTP transport for talking to the API
+    servers.
+
+    Unlike `retry_session`, which builds a fresh `requests.Session` for
+    every request, a `Transport` keeps its connections alive and pools
+    up to `pool_size` of them per host, so repeated requests to the
+    same server skip the TCP and TLS handshakes. Close it with `close`
+    or use it as a context manager when it is no longer needed.
+
+    Failed connections and the `RETRY_STATUSES` are retried up to
+    `retries` times with exponential backoff, within the limits of the
+    `RequestBudget` given to each request. Like urllib3's `Retry`, only
+    idempotent requests are retried after a read timeout or a retryable
+    status; others, including every POST unless the caller marks it
+    idempotent, are only retried when the connection could not be made,
+    so the server never saw them.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = POOL_SIZE,
+        retries: int = RETRY_COUNT,
+        backoff_factor: float = RETRY_FACTOR,
+    ) -> None:
+        self.pool_size = pool_size
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self._session: Optional[requests.Session] = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        """The underlying Requests session, created on first use."""
+
+        with self._lock:
+            if self._session is None:
+                self._session = self._build_session()
+            return self._session
+
+    def _build_session(self) -> requests.Session:
+        # Retries are handled by `post` so they can respect deadlines.
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_size,
+            pool_maxsize=self.pool_size,
+            max_retries=0,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def post(
+        self,
+        url,
+        budget: RequestBudget = UNLIMITED,
+        idempotent: bool = False,
+        **kwargs,
+    ) -> requests.Response:
+        """Send a POST request through the pooled session.
+
+        Raise a `DeadlineExceededError` if the budget's deadline runs
+        out, or the last attempt times out, before a response arrives.
+        Set `idempotent` if the request is safe to repeat, so it is
+        retried on any failure.
+        """
+
+        return self.request("POST", url, budget, idempotent, **kwargs)
+
+    def get(
+        self, url, budget: RequestBudget = UNLIMITED, **kwargs
+    ) -> requests.Response:
+        """Send a GET request through the pooled session."""
+
+        return self.request("GET", url, budget, **kwargs)
+
+    def request(
+        self,
+        method,
+        url,
+        budget: RequestBudget = UNLIMITED,
+        idempotent: Optional[bool] = None,
+        **kwargs,
+    ) -> requests.Response:
+        """Send a request, retrying within the limits of `budget`.
+
+        `idempotent` defaults to whether `method` is one of the
+        `IDEMPOTENT_METHODS`.
+        """
+
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        start = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            timeout = budget.timeout
+            if budget.deadline is not None:
+                remaining = budget.deadline - (time.monotonic() - start)
+                if remaining <= 0:
+                    raise DeadlineExceededError(
+                        url, attempt - 1, time.monotonic() - start
+                    )
+                timeout = min(timeout or remaining, remaining)
+
+            try:
+                res = self.session.request(
+                    method, url, timeout=timeout, **kwargs
+                )
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                if attempt > self.retries or not (
+                    idempotent or _not_sent(exc)
+                ):
+                    if isinstance(exc, requests.Timeout):
+                        raise DeadlineExceededError(
+                            url, attempt, time.monotonic() - start
+                        ) from exc
+                    raise
+                error: Optional[Exception] = exc
+            else:
+                if res.status_code not in RETRY_STATUSES:
+                    return res
+                if attempt > self.retries or not idempotent:
+                    return res
+                error = None
+
+            delay = self.backoff_factor * (2 ** (attempt - 1))
+            elapsed = time.monotonic() - start
+            if budget.deadline is not None:
+                if elapsed + delay >= budget.deadline:
+                    raise DeadlineExceededError(
+                        url, attempt, elapsed
+                    ) from error
+            LOGGER.debug(
+                "Retrying %s in %.2fs (attempt %d failed)", url, delay, attempt
+            )
+            time.sleep(delay)
+
+    def close(self) -> None:
+        """Close all pooled connections.
+
+        The transport stays usable: a later request opens a new pool.
+        """
+
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def __enter__(self) -> "Transport":
+        return self
+
+    def __exit__(self, type, value, tb) -> None:
+        self.close()
+
+
+def _not_sent(exc: Exception) -> bool:
+    """Tell whether a failed request never reached the server, because
+    no connection could be made.
+    """
+
+    if isinstance(exc, requests.ConnectTimeout):
+        return True
+    reason = getattr(exc.args[0], "reason", None) if exc.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+def _post(
+    transport: Optional[Transport],
+    url,
+    budget: RequestBudget = UNLIMITED,
+    idempotent: bool = False,
+    **kwargs,
+):
+    """POST through `transport`, or through a one-off transport when
+    none is given.
+    """
+
+    if transport is not None:
+        return transport.post(url, budget, idempotent, **kwargs)
+    with Transport() as transport:
+        return transport.post(url, budget, idempotent, **kwargs)
+
+
+def cache_dir() -> str:
+    """Get the directory for wideq's on-disk caches.
+
+    This is `$XDG_CACHE_HOME/wideq`, defaulting to `~/.cache/wideq`.
+    """
+
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "wideq")
+
+
+def atomic_write(path: str, data: bytes) -> None:
+    """Write a file so that concurrent readers see either the old or the
+    new contents, never a partial write.
+
+    The data goes to a temporary file in the same directory, which then
+    replaces `path`. Parent directories are created as needed.
+    """
+
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
 def set_log_level(level: int):
     logger = get_wideq_logger()
     logger.setLevel(level)
@@ -169,6 +473,25 @@ class MonitorError(APIError):
         self.code = code
 
 
+class DeadlineExceededError(APIError):
+    """A request could not complete within its `RequestBudget`
+    deadline.
+
+    `attempts` is the number of HTTP attempts made and `elapsed` the
+    time spent, in seconds.
+    """
+
+    def __init__(self, url, attempts, elapsed):
+        self.url = url
+        self.attempts = attempts
+        self.elapsed = elapsed
+
+    def __str__(self):
+        return "deadline exceeded for {} after {} attempts ({:.2f}s)".format(
+            self.url, self.attempts, self.elapsed
+        )
+
+
 class MalformedResponseError(APIError):
     """The server produced malformed data, such as invalid JSON."""
 
@@ -185,17 +508,9 @@ API_ERRORS = {
 }
 
 
-def lgedm_post(url, data=None, access_token=None, session_id=None):
-    """Make an HTTP request in the format used by the API servers.
-
-    In this format, the request POST data sent as JSON under a special
-    key; authentication sent in headers. Return the JSON data extracted
-    from the response.
+def lgedm_headers(access_token=None, session_id=None) -> Dict[str, str]:
+    """Build the headers sent with every request to the API servers."""
 
-    The `access_token` and `session_id` are required for most normal,
-    authenticated requests. They are not required, for example, to load
-    the gateway server data or to start a session.
-    """
     headers = {
         "x-thinq-application-key": APP_KEY,
         "x-thinq-security-key": SECURITY_KEY,
@@ -205,10 +520,16 @@ def lgedm_post(url, data=None, access_token=None, session_id=None):
         headers["x-thinq-token"] = access_token
     if session_id:
         headers["x-thinq-jsessionId"] = session_id
+    return headers
+
+
+def lgedm_result(body: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract the data from a decoded API response body.
+
+    Raise the appropriate `APIError` if the response reports an error.
+    """
 
-    with retry_session() as session:
-        res = session.post(url, json={DATA_ROOT: data}, headers=headers)
-    out = res.json()[DATA_ROOT]
+    out = body[DATA_ROOT]
 
     # Check for API errors.
     if "returnCd" in out:
@@ -223,6 +544,43 @@ def lgedm_post(url, data=None, access_token=None, session_id=None):
     return out
 
 
+def lgedm_post(
+    url,
+    data=None,
+    access_token=None,
+    session_id=None,
+    transport=None,
+    budget=UNLIMITED,
+    idempotent=False,
+):
+    """Make an HTTP request in the format used by the API servers.
+
+    In this format, the request POST data sent as JSON under a special
+    key; authentication sent in headers. Return the JSON data extracted
+    from the response.
+
+    The `access_token` and `session_id` are required for most normal,
+    authenticated requests. They are not required, for example, to load
+    the gateway server data or to start a session.
+
+    Requests go through `transport` when one is given, reusing its
+    pooled connections. The `budget` limits how long the request and
+    its retries may take. Only requests marked `idempotent` are retried
+    once they may have reached the server.
+    """
+    headers = lgedm_headers(access_token, session_id)
+    headers["Content-Type"] = "application/json"
+    res = _post(
+        transport,
+        url,
+        budget,
+        idempotent,
+        data=json_dumps({DATA_ROOT: data}).encode("utf8"),
+        headers=headers,
+    )
+    return lgedm_result(json_loads(res.content))
+
+
 def oauth_url(auth_base, country, language):
     """Construct the URL for users to log in (in a browser) to start an
     authenticated session.
@@ -253,7 +611,7 @@ def parse_oauth_callback(url):
     return params["access_token"][0], params["refresh_token"][0]
 
 
-def login(api_root, access_token, country, language):
+def login(api_root, access_token, country, language, transport=None):
     """Use an access token to log into the API and obtain a session and
     return information about the session.
     """
@@ -265,13 +623,12 @@ def login(api_root, access_token, country, language):
         "loginType": "EMP",
         "token": access_token,
     }
-    return lgedm_post(url, data)
-
+    return lgedm_post(url, data, transport=transport)
 
-def refresh_auth(oauth_root, refresh_token):
-    """Get a new access_token using a refresh_token.
 
-    May raise a `TokenError`.
+def refresh_auth_request(oauth_root, refresh_token):
+    """Build the URL, form data, and headers for a token refresh
+    request.
     """
 
     token_url = urljoin(oauth_root, "/oauth2/token")
@@ -302,37 +659,249 @@ def refresh_auth(oauth_root, refresh_token):
         "lgemp-x-date": timestamp,
         "Accept": "application/json",
     }
+    return token_url, data, headers
+
 
-    with retry_session() as session:
-        res = session.post(token_url, data=data, headers=headers)
-    res_data = res.json()
+def refresh_auth_result(res_data: Dict[str, Any]) -> str:
+    """Extract the new access token from a decoded token refresh
+    response.
+
+    May raise a `TokenError`.
+    """
 
     if res_data["status"] != 1:
         raise TokenError()
     return res_data["access_token"]
 
 
+def refresh_auth(oauth_root, refresh_token, transport=None):
+    """Get a new access_token using a refresh_token.
+
+    May raise a `TokenError`.
+    """
+
+    token_url, data, headers = refresh_auth_request(oauth_root, refresh_token)
+    res = _post(transport, token_url, data=data, headers=headers)
+    return refresh_auth_result(json_loads(res.content))
+
+
+class GatewayCache(object):
+    """An on-disk cache of discovered gateways, keyed by country and
+    language.
+
+    Each entry is a small JSON file in `path` (by default under
+    `cache_dir()`), replaced atomically, so the cache can be shared by
+    concurrent processes. Entries older than `ttl` seconds are ignored.
+    """
+
+    def __init__(
+        self, path: Optional[str] = None, ttl: float = GATEWAY_CACHE_TTL
+    ) -> None:
+        self.path = path or os.path.join(cache_dir(), "gateways")
+        self.ttl = ttl
+
+    def _entry_path(self, country: str, language: str) -> str:
+        return os.path.join(self.path, "{}_{}.json".format(country, language))
+
+    def get(self, country: str, language: str) -> Optional[Dict[str, Any]]:
+        """Get the serialized gateway for a locale, or None if it is
+        missing, expired, or unreadable.
+        """
+
+        try:
+            with open(self._entry_path(country, language), "rb") as f:
+                entry = json_loads(f.read())
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - entry.get("time", 0) > self.ttl:
+            return None
+        return entry.get("gateway")
+
+    def put(self, gateway: "Gateway") -> None:
+        """Store a discovered gateway.
+
+        Failures to write are logged and otherwise ignored: the cache
+        only saves a round trip.
+        """
+
+        entry = {"time": time.time(), "gateway": gateway.serialize()}
+        path = self._entry_path(gateway.country, gateway.language)
+        try:
+            atomic_write(path, json_dumps(entry).encode("utf8"))
+        except OSError:
+            LOGGER.warning("Could not write gateway cache %s", path)
+
+
+def fetch_model_info(
+    url,
+    transport: Optional[Transport] = None,
+    etag: Optional[str] = None,
+    last_modified: Optional[str] = None,
+) -> Tuple[Optional[Dict[str, Any]], Dict[str, Optional[str]]]:
+    """Download the JSON data describing a device model.
+
+    If `etag` or `last_modified` validators from an earlier download are
+    given, the server may answer that the data has not changed; then the
+    returned data is None. Also return the validators for the response,
+    as a dict with `etag` and `last_modified` keys, to use next time.
+    """
+
+    headers = {"Accept": "application/json"}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
+    if transport is not None:
+        res = transport.get(url, headers=headers)
+    else:
+        with Transport() as transport:
+            res = transport.get(url, headers=headers)
+
+    validators = {
+        "etag": res.headers.get("ETag") or etag,
+        "last_modified": res.headers.get("Last-Modified") or last_modified,
+    }
+    if res.status_code == 304:
+        return None, validators
+    res.raise_for_status()
+    return json_loads(res.content), validators
+
+
+class ModelInfoCache(object):
+    """An on-disk, content-addressed cache of model info JSON.
+
+    Model descriptions are stored gzip-compressed under `path` (by
+    default under `cache_dir()`) in files named by their
+    `content_hash`, so identical models published at different URLs are stored
+    once. A small index file per URL, named by a hash of the URL, points
+    to the content. All files are replaced atomically, so the cache can
+    be shared by concurrent processes.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path or os.path.join(cache_dir(), "models")
+
+    def _index_path(self, url: str) -> str:
+        name = hashlib.sha1(url.encode("utf8")).hexdigest() + ".json"
+        return os.path.join(self.path, "urls", name)
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.path, "blobs", digest + ".json.gz")
+
+    def entry(self, url: str) -> Optional[Dict[str, Any]]:
+        """Get the index entry for a URL, or None if there is none.
+
+        The entry holds the `digest` of the stored content, plus any
+        metadata stored with it.
+        """
+
+        try:
+            with open(self._index_path(url), "rb") as f:
+                return json_loads(f.read())
+        except (OSError, ValueError):
+            return None
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Get the model info JSON for a URL, or None if it is not
+        cached or cannot be read.
+        """
+
+        entry = self.entry(url)
+        if entry is None:
+            return None
+        try:
+            with gzip.open(self._blob_path(entry["digest"]), "rb") as f:
+                return json_loads(f.read())
+        except (OSError, ValueError, KeyError, EOFError):
+            return None
+
+    def put(self, url: str, data: Dict[str, Any], **metadata) -> None:
+        """Store the model info JSON for a URL.
+
+        Extra keyword arguments are saved in the URL's index entry.
+        Failures to write are logged and otherwise ignored.
+        """
+
+        raw = json_dumps(data).encode("utf8")
+        digest = content_hash(data)
+        entry = dict(metadata, url=url, digest=digest)
+        try:
+            blob_path = self._blob_path(digest)
+            if not os.path.exists(blob_path):
+                atomic_write(blob_path, gzip.compress(raw))
+            atomic_write(
+                self._index_path(url), json_dumps(entry).encode("utf8")
+            )
+        except OSError:
+            LOGGER.warning("Could not write model info cache for %s", url)
+
+    def __contains__(self, url: str) -> bool:
+        entry = self.entry(url)
+        return entry is not None and os.path.exists(
+            self._blob_path(entry["digest"])
+        )
+
+
 class Gateway(object):
-    def __init__(self, auth_base, api_root, oauth_root, country, language):
+    def __init__(
+        self,
+        auth_base,
+        api_root,
+        oauth_root,
+        country,
+        language,
+        transport: Optional[Transport] = None,
+    ):
         self.auth_base = auth_base
         self.api_root = api_root
         self.oauth_root = oauth_root
         self.country = country
         self.language = language
 
+        # The pooled transport shared by every request made through
+        # this gateway, including its sessions.
+        self.transport = transport or Transport()
+
     @classmethod
-    def discover(cls, country, language) -> "Gateway":
+    def discover(
+        cls,
+        country,
+        language,
+        transport: Optional[Transport] = None,
+        cache: Optional[GatewayCache] = None,
+    ) -> "Gateway":
         """Load information about the hosts to use for API interaction.
 
         `country` and `language` are codes, like "US" and "en-US,"
-        respectively.
+        respectively. If a `cache` is given, a fresh cached gateway is
+        used instead of asking the server, and newly discovered ones are
+        stored in it.
         """
+        if cache:
+            data = cache.get(country, language)
+            if data:
+                return cls.deserialize(data, transport)
+
+        transport = transport or Transport()
         gw = lgedm_post(
-            GATEWAY_URL, {"countryCode": country, "langCode": language}
+            GATEWAY_URL,
+            {"countryCode": country, "langCode": language},
+            transport=transport,
+            idempotent=True,
         )
-        return cls(
-            gw["empUri"], gw["thinqUri"], gw["oauthUri"], country, language
+        gateway = cls(
+            gw["empUri"],
+            gw["thinqUri"],
+            gw["oauthUri"],
+            country,
+            language,
+            transport,
         )
+        if cache:
+            cache.put(gateway)
+        return gateway
 
     def oauth_url(self):
         return oauth_url(self.auth_base, self.country, self.language)
@@ -346,14 +915,21 @@ class Gateway(object):
             "language": self.language,
         }
 
+    def close(self) -> None:
+        """Close the pooled connections of the gateway's transport."""
+        self.transport.close()
+
     @classmethod
-    def deserialize(cls, data: Dict[str, Any]) -> "Gateway":
+    def deserialize(
+        cls, data: Dict[str, Any], transport: Optional[Transport] = None
+    ) -> "Gateway":
         return cls(
             data["auth_base"],
             data["api_root"],
             data["oauth_root"],
             data.get("country", DEFAULT_COUNTRY),
             data.get("language", DEFAULT_LANGUAGE),
+            transport,
         )
 
 
@@ -380,6 +956,7 @@ class Auth(object):
             self.access_token,
             self.gateway.country,
             self.gateway.language,
+            self.gateway.transport,
         )
         session_id = session_info["jsessionId"]
         return Session(self, session_id), get_list(session_info, "item")
@@ -388,7 +965,9 @@ class Auth(object):
         """Refresh the authentication, returning a new Auth object."""
 
         new_access_token = refresh_auth(
-            self.gateway.oauth_root, self.refresh_token
+            self.gateway.oauth_root,
+            self.refresh_token,
+            self.gateway.transport,
         )
         return Auth(self.gateway, new_access_token, self.refresh_token)
 
@@ -399,20 +978,108 @@ class Auth(object):
         }
 
 
+def monitor_result(device_id, res: Dict[str, Any]) -> Optional[bytes]:
+    """Interpret one `workList` entry of an `rti/rtiResult` response.
+
+    Return the status bytestring, or None if the monitoring is not yet
+    ready. Raise a `MonitorError` if the monitoring task failed.
+    """
+
+    # When monitoring first starts, it usually takes a few
+    # iterations before data becomes available. In the initial
+    # "warmup" phase, `returnCode` is missing from the response.
+    if "returnCode" not in res:
+        return None
+
+    # Check for errors.
+    code = res.get("returnCode")  # returnCode can be missing.
+    if code != "0000":
+        raise MonitorError(device_id, code)
+
+    # The return data may or may not be present, depending on the
+    # monitoring task status.
+    if "returnData" in res:
+        # The main response payload is base64-encoded binary data in
+        # the `returnData` field. This sometimes contains JSON data
+        # and sometimes other binary data.
+        return base64.b64decode(res["returnData"])
+    else:
+        return None
+
+
+def monitor_results(
+    work_ids: Dict[str, str], work_list
+) -> Dict[str, Union[Optional[bytes], "MonitorError"]]:
+    """Split a multi-device `rti/rtiResult` `workList` back out per
+    device.
+
+    `work_ids` maps the polled device IDs to their work IDs. Return a
+    map from each of those device IDs to either its status result (as
+    with `monitor_result`) or the `MonitorError` for that device.
+    Devices missing from the response are treated as warming up.
+    """
+
+    results: Dict[str, Union[Optional[bytes], MonitorError]] = {
+        device_id: None for device_id in work_ids
+    }
+    entries = work_list if isinstance(work_list, list) else [work_list]
+    for res in entries:
+        device_id = res.get("deviceId")
+        if device_id not in results:
+            continue
+        try:
+            results[device_id] = monitor_result(device_id, res)
+        except MonitorError as exc:
+            results[device_id] = exc
+    return results
+
+
 class Session(object):
-    def __init__(self, auth, session_id) -> None:
+    def __init__(
+        self,
+        auth,
+        session_id,
+        budget: RequestBudget = UNLIMITED,
+        endpoint_budgets: Optional[Dict[str, RequestBudget]] = None,
+    ) -> None:
         self.auth = auth
         self.session_id = session_id
 
-    def post(self, path, data=None):
+        # Time limits for requests: `endpoint_budgets` maps API paths
+        # (like "rti/rtiResult") to budgets that override `budget`.
+        self.budget = budget
+        self.endpoint_budgets: Dict[str, RequestBudget] = dict(
+            endpoint_budgets or {}
+        )
+
+    def post(
+        self,
+        path,
+        data=None,
+        budget: Optional[RequestBudget] = None,
+        idempotent: bool = False,
+    ):
         """Make a POST request to the API server.
 
         This is like `lgedm_post`, but it pulls the context for the
-        request from an active Session.
+        request from an active Session. Unless a `budget` is given, the
+        session's budget for `path` applies. Set `idempotent` for
+        requests that only read state, so they are retried after any
+        failure.
         """
 
+        if budget is None:
+            budget = self.endpoint_budgets.get(path, self.budget)
         url = urljoin(self.auth.gateway.api_root + "/", path)
-        return lgedm_post(url, data, self.auth.access_token, self.session_id)
+        return lgedm_post(
+            url,
+            data,
+            self.auth.access_token,
+            self.session_id,
+            self.auth.gateway.transport,
+            budget,
+            idempotent,
+        )
 
     def get_devices(self) -> List[Dict[str, Any]]:
         """Get a list of devices associated with the user's account.
@@ -420,7 +1087,9 @@ class Session(object):
         Return a list of dicts with information about the devices.
         """
 
-        return get_list(self.post("device/deviceList"), "item")
+        return get_list(
+            self.post("device/deviceList", idempotent=True), "item"
+        )
 
     def monitor_start(self, device_id):
         """Begin monitoring a device's status.
@@ -452,28 +1121,32 @@ class Session(object):
         """
 
         work_list = [{"deviceId": device_id, "workId": work_id}]
-        res = self.post("rti/rtiResult", {"workList": work_list})["workList"]
-
-        # When monitoring first starts, it usually takes a few
-        # iterations before data becomes available. In the initial
-        # "warmup" phase, `returnCode` is missing from the response.
-        if "returnCode" not in res:
-            return None
+        res = self.post(
+            "rti/rtiResult", {"workList": work_list}, idempotent=True
+        )
+        return monitor_result(device_id, res["workList"])
+
+    def monitor_poll_many(
+        self, work_ids: Dict[str, str]
+    ) -> Dict[str, Union[Optional[bytes], MonitorError]]:
+        """Get the results of several monitoring tasks in one request.
+
+        `work_ids` maps device IDs to the work IDs retrieved from
+        `monitor_start`. Return a map from device IDs to results: a
+        status bytestring, None if that monitor is not yet ready, or
+        the `MonitorError` raised for that device. Errors are returned
+        rather than raised so one failed monitor does not hide the
+        results of the others.
+        """
 
-        # Check for errors.
-        code = res.get("returnCode")  # returnCode can be missing.
-        if code != "0000":
-            raise MonitorError(device_id, code)
-
-        # The return data may or may not be present, depending on the
-        # monitoring task status.
-        if "returnData" in res:
-            # The main response payload is base64-encoded binary data in
-            # the `returnData` field. This sometimes contains JSON data
-            # and sometimes other binary data.
-            return base64.b64decode(res["returnData"])
-        else:
-            return None
+        work_list = [
+            {"deviceId": device_id, "workId": work_id}
+            for device_id, work_id in work_ids.items()
+        ]
+        res = self.post(
+            "rti/rtiResult", {"workList": work_list}, idempotent=True
+        )
+        return monitor_results(work_ids, res["workList"])
 
     def monitor_stop(self, device_id, work_id):
         """Stop monitoring a device."""
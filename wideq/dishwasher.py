@@ -1,8 +1,14 @@
 import enum
-from typing import Optional
+from typing import Any, Dict, Iterable, Mapping, Optional, Union
 
 from .client import Device
-from .util import lookup_enum, lookup_reference
+from .status import StatusSnapshot, snapshot
+from .util import (
+    lookup_enum,
+    lookup_member,
+    lookup_options,
+    lookup_reference,
+)
 
 
 class DishWasherState(enum.Enum):
@@ -58,24 +64,35 @@ DISHWASHER_COURSE_MAP = {
 class DishWasherDevice(Device):
     """A higher-level interface for a dishwasher."""
 
-    def poll(self) -> Optional["DishWasherStatus"]:
+    def _decode_status(
+        self,
+        data: bytes,
+        fields: Optional[Iterable[str]] = None,
+        lazy: bool = False,
+    ) -> "DishWasherStatus":
+        return DishWasherStatus(
+            self, self.model.decode_monitor(data, fields, lazy)
+        )
+
+    def poll(
+        self,
+        fields: Optional[Iterable[str]] = None,
+        lazy: bool = False,
+        snapshot: bool = False,
+    ) -> Optional[Union["DishWasherStatus", StatusSnapshot]]:
         """Poll the device's current state.
 
         Monitoring must be started first with `monitor_start`.
 
+        :param fields: Decode only these keys; properties that read
+            other keys will raise `KeyError`.
+        :param lazy: Decode each key the first time it is read.
+        :param snapshot: Return an immutable `StatusSnapshot` of the
+            status instead.
         :returns: Either a `DishWasherStatus` instance or `None` if the status
             is not yet available.
         """
-        # Abort if monitoring has not started yet.
-        if not hasattr(self, "mon"):
-            return None
-
-        data = self.mon.poll()
-        if data:
-            res = self.model.decode_monitor(data)
-            return DishWasherStatus(self, res)
-        else:
-            return None
+        return super().poll(fields, lazy, snapshot)
 
 
 class DishWasherStatus(object):
@@ -85,15 +102,16 @@ class DishWasherStatus(object):
     :param data: Binary data from the API.
     """
 
-    def __init__(self, dishwasher: DishWasherDevice, data: dict):
+    def __init__(self, dishwasher: DishWasherDevice, data: Mapping[str, Any]):
         self.dishwasher = dishwasher
         self.data = data
+        self._options: Optional[Dict[str, int]] = None
 
     @property
     def state(self) -> DishWasherState:
         """Get the state of the dishwasher."""
-        return DishWasherState(
-            lookup_enum("State", self.data, self.dishwasher)
+        return lookup_member(
+            DishWasherState, "State", self.data, self.dishwasher
         )
 
     @property
@@ -104,6 +122,11 @@ class DishWasherStatus(object):
     @property
     def process(self) -> Optional[DishWasherProcess]:
         """Get the process of the dishwasher."""
+        table = self.dishwasher.model.enum_table("Process", DishWasherProcess)
+        member = table.get(self.data["Process"])
+        if member is not None:
+            return member
+
         process = lookup_enum("Process", self.data, self.dishwasher)
         if process and process != "-":
             return DishWasherProcess(process)
@@ -162,3 +185,24 @@ class DishWasherStatus(object):
     def error(self) -> str:
         """Get the current error."""
         return lookup_reference("Error", self.data, self.dishwasher)
+
+    @property
+    def options(self) -> Dict[str, int]:
+        """Get every option flag, unpacked from the bit values."""
+        if self._options is None:
+            self._options = lookup_options(self.data, self.dishwasher)
+        return self._options
+
+    @property
+    def child_lock(self) -> bool:
+        """Check if the child lock is engaged."""
+        return bool(self.options.get("ChildLock"))
+
+    @property
+    def door_open(self) -> bool:
+        """Check if the door is open."""
+        return bool(self.options.get("Door"))
+
+    def snapshot(self, timestamp: Optional[float] = None) -> StatusSnapshot:
+        """Decode every property once into an immutable snapshot."""
+        return snapshot(self, timestamp)
@@ -1,8 +1,9 @@
 import enum
-from typing import Optional
+from typing import Any, Dict, Iterable, Mapping, Optional, Union
 
 from .client import Device, _UNKNOWN
-from .util import lookup_enum, lookup_reference
+from .status import StatusSnapshot, snapshot
+from .util import lookup_member, lookup_options, lookup_reference
 
 
 class DryerState(enum.Enum):
@@ -85,24 +86,33 @@ class TimeDry(enum.Enum):
 class DryerDevice(Device):
     """A higher-level interface for a dryer."""
 
-    def poll(self) -> Optional["DryerStatus"]:
+    def _decode_status(
+        self,
+        data: bytes,
+        fields: Optional[Iterable[str]] = None,
+        lazy: bool = False,
+    ) -> "DryerStatus":
+        return DryerStatus(self, self.model.decode_monitor(data, fields, lazy))
+
+    def poll(
+        self,
+        fields: Optional[Iterable[str]] = None,
+        lazy: bool = False,
+        snapshot: bool = False,
+    ) -> Optional[Union["DryerStatus", StatusSnapshot]]:
         """Poll the device's current state.
 
         Monitoring must be started first with `monitor_start`.
 
+        :param fields: Decode only these keys; properties that read
+            other keys will raise `KeyError`.
+        :param lazy: Decode each key the first time it is read.
+        :param snapshot: Return an immutable `StatusSnapshot` of the
+            status instead.
         :returns: Either a `DryerStatus` instance or `None` if the status is
             not yet available.
         """
-        # Abort if monitoring has not started yet.
-        if not hasattr(self, "mon"):
-            return None
-
-        data = self.mon.poll()
-        if data:
-            res = self.model.decode_monitor(data)
-            return DryerStatus(self, res)
-        else:
-            return None
+        return super().poll(fields, lazy, snapshot)
 
 
 class DryerStatus(object):
@@ -112,43 +122,40 @@ class DryerStatus(object):
     :param data: JSON data from the API.
     """
 
-    def __init__(self, dryer: DryerDevice, data: dict):
+    def __init__(self, dryer: DryerDevice, data: Mapping[str, Any]):
         self.dryer = dryer
         self.data = data
+        self._options: Optional[Dict[str, int]] = None
 
     def get_bit(self, key: str, index: int) -> str:
-        bit_value = int(self.data[key])
-        bit_index = 2 ** index
-        mode = bin(bit_value & bit_index)
-        if mode == bin(0):
-            return "OFF"
-        else:
+        if (int(self.data[key]) >> index) & 1:
             return "ON"
+        return "OFF"
 
     @property
     def state(self) -> DryerState:
         """Get the state of the dryer."""
-        return DryerState(lookup_enum("State", self.data, self.dryer))
+        return lookup_member(DryerState, "State", self.data, self.dryer)
 
     @property
     def previous_state(self) -> DryerState:
         """Get the previous state of the dryer."""
-        return DryerState(lookup_enum("PreState", self.data, self.dryer))
+        return lookup_member(DryerState, "PreState", self.data, self.dryer)
 
     @property
     def dry_level(self) -> DryLevel:
         """Get the dry level."""
-        return DryLevel(lookup_enum("DryLevel", self.data, self.dryer))
+        return lookup_member(DryLevel, "DryLevel", self.data, self.dryer)
 
     @property
     def temperature_control(self) -> TempControl:
         """Get the temperature control setting."""
-        return TempControl(lookup_enum("TempControl", self.data, self.dryer))
+        return lookup_member(TempControl, "TempControl", self.data, self.dryer)
 
     @property
     def time_dry(self) -> TimeDry:
         """Get the time dry setting."""
-        return TimeDry(lookup_enum("TimeDry", self.data, self.dryer))
+        return lookup_member(TimeDry, "TimeDry", self.data, self.dryer)
 
     @property
     def is_on(self) -> bool:
@@ -183,3 +190,24 @@ class DryerStatus(object):
     def error(self) -> str:
         """Get the current error."""
         return lookup_reference("Error", self.data, self.dryer)
+
+    @property
+    def options(self) -> Dict[str, int]:
+        """Get every option flag, unpacked from the bit values."""
+        if self._options is None:
+            self._options = lookup_options(self.data, self.dryer)
+        return self._options
+
+    @property
+    def child_lock(self) -> bool:
+        """Check if the child lock is engaged."""
+        return bool(self.options.get("ChildLock"))
+
+    @property
+    def remote_start(self) -> bool:
+        """Check if remote start is enabled."""
+        return bool(self.options.get("RemoteStart"))
+
+    def snapshot(self, timestamp: Optional[float] = None) -> StatusSnapshot:
+        """Decode every property once into an immutable snapshot."""
+        return snapshot(self, timestamp)
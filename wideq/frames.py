@@ -0,0 +1,130 @@
+"""Vectorized decoding of recorded binary monitoring frames.
+
+This module requires the optional `numpy` dependency. It turns a
+model's `Monitoring.protocol` into a NumPy structured dtype so that a
+buffer holding many fixed-length frames decodes into columns in one
+call, instead of one dict of strings per frame.
+"""
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .client import _UNKNOWN, EnumValue, ModelInfo, ReferenceValue
+
+
+def frame_size(model: ModelInfo) -> int:
+    """Get the number of bytes covered by a model's protocol."""
+
+    return max(
+        item["startByte"] + item["length"]
+        for item in model.data["Monitoring"]["protocol"]
+    )
+
+
+def monitor_dtype(model: ModelInfo, size: Optional[int] = None) -> np.dtype:
+    """Build a structured dtype for a model's binary frames.
+
+    Fields of 1, 2, 4, or 8 bytes become big-endian unsigned integers.
+    Other lengths become byte subarrays, which `decode_frames` combines
+    into integers. `size` is the length of each recorded frame; it
+    defaults to `frame_size(model)`.
+
+    :raises ValueError: If the model does not report binary data.
+    """
+
+    if not model.binary_monitor_data:
+        raise ValueError("model does not use binary monitoring data")
+
+    names: List[str] = []
+    formats: List[Any] = []
+    offsets: List[int] = []
+    for item in model.data["Monitoring"]["protocol"]:
+        if item["value"] in names:
+            continue
+        length = item["length"]
+        names.append(item["value"])
+        if length in (1, 2, 4, 8):
+            formats.append(">u{}".format(length))
+        else:
+            formats.append(("u1", (length,)))
+        offsets.append(item["startByte"])
+
+    return np.dtype(
+        {
+            "names": names,
+            "formats": formats,
+            "offsets": offsets,
+            "itemsize": size or frame_size(model),
+        }
+    )
+
+
+def pack_frames(frames: Iterable[bytes], size: int) -> bytes:
+    """Join recorded frames into one contiguous buffer of `size`-byte
+    records, padding short frames with zeros and truncating long ones.
+    """
+
+    return b"".join(frame[:size].ljust(size, b"\0") for frame in frames)
+
+
+def _labels(model: ModelInfo, key: str, column: np.ndarray):
+    """Map a column of codes to friendly names, or return None if the
+    key is not an enum or reference value.
+    """
+
+    try:
+        desc = model.value(key)
+    except (KeyError, ValueError):
+        return None
+
+    if isinstance(desc, EnumValue):
+        names = desc.options
+
+        def label(code):
+            return names.get(str(code), _UNKNOWN)
+
+    elif isinstance(desc, ReferenceValue):
+
+        def label(code):
+            return model.reference_name(key, code)
+
+    else:
+        return None
+
+    # Look up each distinct code once.
+    codes, inverse = np.unique(column, return_inverse=True)
+    table = np.array([label(code) for code in codes.tolist()], dtype=object)
+    return table[inverse]
+
+
+def decode_frames(
+    model: ModelInfo,
+    buffer,
+    size: Optional[int] = None,
+    labels: bool = False,
+) -> Dict[str, np.ndarray]:
+    """Decode a buffer of fixed-length binary frames into columns.
+
+    `buffer` is any bytes-like object holding whole `size`-byte frames
+    (see `pack_frames`). Return a map from protocol keys to integer
+    arrays, one element per frame. With `labels`, enum and reference
+    columns are instead object arrays of their friendly names, as
+    `ModelInfo.enum_name` and `ModelInfo.reference_name` report them.
+    """
+
+    dtype = monitor_dtype(model, size)
+    records = np.frombuffer(buffer, dtype=dtype)
+
+    columns: Dict[str, np.ndarray] = {}
+    for name in dtype.names or ():
+        column = records[name]
+        if column.ndim > 1:
+            # Combine byte subarrays into big-endian integers.
+            weights = 256 ** np.arange(column.shape[1] - 1, -1, -1)
+            column = column.astype(np.uint64) @ weights.astype(np.uint64)
+        if labels:
+            named = _labels(model, name, column)
+            if named is not None:
+                column = named
+        columns[name] = column
+    return columns
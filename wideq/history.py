@@ -0,0 +1,351 @@
+"""A bounded, column-oriented history of device statuses.
+
+Each recorded property is kept in its own preallocated `array`: numbers
+and booleans as doubles, and everything else (enum members, strings) as
+indices into a table of the distinct values seen. Once the buffer is
+full, new samples overwrite the oldest, and label tables are compacted
+as they grow, so memory use is bounded by the capacity.
+"""
+import math
+import time
+import types
+from array import array
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .status import StatusSnapshot, status_fields
+
+#: The default number of samples a device's history keeps.
+HISTORY_CAPACITY = 4096
+
+
+#: The `kind` of a column that has only seen missing values.
+_UNTYPED = object()
+
+#: The numeric types, narrowest first.
+_NUMERIC = (bool, int, float)
+
+
+class _Column(object):
+    """One property's values, stored in a fixed-size array.
+
+    `kind` is the type numbers are converted back to (`bool`, `int`, or
+    `float`), None for a column of labels, or `_UNTYPED` until the first
+    value that is not missing. Numbers are held as doubles in `values`
+    and labels as codes into `labels` in `codes`; missing values are
+    NaN and -1 respectively. A numeric column widens to the widest type
+    it has seen, and becomes a label column, keeping its values, when a
+    value that is not a number arrives.
+    """
+
+    __slots__ = ("kind", "values", "codes", "labels", "label_codes")
+
+    def __init__(self, capacity: int):
+        self.kind: Any = _UNTYPED
+        self.values = array("d", [math.nan]) * capacity
+        self.codes = array("l")
+        #: For label columns, the distinct values, and their codes by
+        #: type and value (so that, say, 1 and True stay apart).
+        self.labels: List[Any] = []
+        self.label_codes: Dict[Tuple[type, Any], int] = {}
+
+    @property
+    def numeric(self) -> bool:
+        return self.kind is not None
+
+    @property
+    def storage(self) -> array:
+        """The array holding the column's values or codes."""
+        return self.values if self.numeric else self.codes
+
+    def store(self, index: int, value) -> None:
+        if value is None or isinstance(value, (dict, types.MappingProxyType)):
+            value = None
+        elif self.kind is not None:
+            kind = _kind(value)
+            if kind is None:
+                self._to_labels()
+            elif self.kind is _UNTYPED:
+                self.kind = kind
+            elif _NUMERIC.index(kind) > _NUMERIC.index(self.kind):
+                self.kind = kind
+
+        if self.kind is None:
+            self.codes[index] = -1 if value is None else self._code(value)
+        else:
+            self.values[index] = math.nan if value is None else float(value)
+
+    def load(self, index: int):
+        if self.kind is None:
+            code = self.codes[index]
+            return self.labels[code] if code >= 0 else None
+        stored = self.values[index]
+        if math.isnan(stored):
+            return None
+        return self.kind(stored)
+
+    def _code(self, value) -> int:
+        key = (type(value), value)
+        try:
+            return self.label_codes[key]
+        except KeyError:
+            code = self.label_codes[key] = len(self.labels)
+            self.labels.append(value)
+            return code
+
+    def _to_labels(self) -> None:
+        """Turn the column into a label column, keeping its values."""
+        kind, values = self.kind, self.values
+        self.kind = None
+        self.codes = array("l", [-1]) * len(values)
+        self.values = array("d")
+        for i, stored in enumerate(values):
+            if not math.isnan(stored):
+                self.codes[i] = self._code(kind(stored))
+
+    def compact(self, indices: Iterable[int]) -> None:
+        """Drop the labels that are not used at `indices`, the array
+        indices of the samples still held.
+        """
+        codes = self.codes
+        labels: List[Any] = []
+        label_codes: Dict[Tuple[type, Any], int] = {}
+        remap = {-1: -1}
+        for i in indices:
+            old = codes[i]
+            new = remap.get(old)
+            if new is None:
+                label = self.labels[old]
+                new = remap[old] = len(labels)
+                label_codes[type(label), label] = new
+                labels.append(label)
+            codes[i] = new
+        self.labels = labels
+        self.label_codes = label_codes
+
+
+def _kind(value) -> Optional[type]:
+    """Get the numeric type of a value, or None if it is not a number."""
+    for kind in _NUMERIC:
+        if isinstance(value, kind):
+            return kind
+    return None
+
+
+class StatusHistory(object):
+    """A ring buffer of the most recent statuses of one device.
+
+    Samples are status objects, `DeviceStatus` mappings or
+    `StatusSnapshot`s. The recorded properties are `fields`, or by
+    default every property (or key) of the first sample except option
+    maps. A column holds numbers while its values are numbers (or
+    bools), read back as the widest type seen, and labels otherwise;
+    the table of distinct labels grows with the number of distinct
+    values, which for enum properties is small; labels no longer held
+    are dropped once the table outgrows twice the capacity. Missing
+    values do not decide a column's type.
+
+    Samples must be appended in time order for the range queries to
+    work.
+
+    :param capacity: The maximum number of samples kept.
+    :param fields: The status properties to record.
+    """
+
+    def __init__(
+        self,
+        capacity: int = HISTORY_CAPACITY,
+        fields: Optional[Iterable[str]] = None,
+    ):
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.fields: Optional[Tuple[str, ...]] = (
+            tuple(fields) if fields is not None else None
+        )
+        self.timestamps = array("d", [0.0]) * capacity
+        self._columns: Dict[str, _Column] = {}
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        """The memory used by the column arrays, in bytes."""
+        arrays = [self.timestamps]
+        arrays += [column.storage for column in self._columns.values()]
+        return sum(a.itemsize * len(a) for a in arrays)
+
+    def _setup(self, sample) -> None:
+        """Choose the fields and column types from the first sample."""
+        if self.fields is None:
+            if isinstance(sample, StatusSnapshot):
+                names = sample.fields
+            elif isinstance(sample, Mapping):
+                names = tuple(sample)
+            else:
+                names = status_fields(type(sample))
+            self.fields = tuple(
+                name
+                for name in names
+                if not isinstance(
+                    _read(sample, name), (dict, types.MappingProxyType)
+                )
+            )
+        for name in self.fields:
+            self._columns[name] = _Column(self.capacity)
+
+    def append(self, sample, timestamp: Optional[float] = None) -> None:
+        """Record a sample, overwriting the oldest one if the buffer is
+        full.
+
+        :param sample: A status object or snapshot.
+        :param timestamp: When the sample was taken. Defaults to the
+            snapshot's timestamp, or now.
+        """
+        if not self._columns:
+            self._setup(sample)
+        if timestamp is None:
+            timestamp = getattr(sample, "timestamp", None)
+            if timestamp is None:
+                timestamp = time.time()
+
+        if self._size < self.capacity:
+            index = (self._start + self._size) % self.capacity
+            self._size += 1
+        else:
+            index = self._start
+            self._start = (self._start + 1) % self.capacity
+
+        self.timestamps[index] = timestamp
+        for name, column in self._columns.items():
+            column.store(index, _read(sample, name))
+            if len(column.labels) > 2 * self.capacity:
+                column.compact(self._index(i) for i in range(self._size))
+
+    def clear(self) -> None:
+        """Drop every sample. The columns keep their types."""
+        self._start = 0
+        self._size = 0
+        for column in self._columns.values():
+            if column.kind is None:
+                column.labels = []
+                column.label_codes = {}
+
+    def _index(self, i: int) -> int:
+        """Map a logical position (0 is the oldest) to an array index."""
+        return (self._start + i) % self.capacity
+
+    def _bisect(self, timestamp: float, right: bool) -> int:
+        """Find the logical position of `timestamp`, like `bisect`."""
+        lo, hi = 0, self._size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            ts = self.timestamps[self._index(mid)]
+            if ts < timestamp or (right and ts == timestamp):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _range(
+        self, start: Optional[float], end: Optional[float]
+    ) -> Tuple[int, int]:
+        """Get logical positions covering `start <= timestamp <= end`."""
+        first = 0 if start is None else self._bisect(start, False)
+        last = self._size if end is None else self._bisect(end, True)
+        return first, max(first, last)
+
+    def _column(self, name: str) -> _Column:
+        try:
+            return self._columns[name]
+        except KeyError:
+            raise KeyError(f"field '{name}' is not recorded") from None
+
+    def _select(self, first: int, last: int) -> Dict[str, List[Any]]:
+        indices = [self._index(i) for i in range(first, last)]
+        out: Dict[str, List[Any]] = {
+            "timestamp": [self.timestamps[i] for i in indices]
+        }
+        for name, column in self._columns.items():
+            out[name] = [column.load(i) for i in indices]
+        return out
+
+    def last(self, n: int = 1) -> Dict[str, List[Any]]:
+        """Get the `n` most recent samples, oldest first.
+
+        :returns: A map from `"timestamp"` and each recorded field to a
+            list of values. Missing values are None.
+        """
+        n = max(0, min(n, self._size))
+        return self._select(self._size - n, self._size)
+
+    def between(
+        self, start: Optional[float] = None, end: Optional[float] = None
+    ) -> Dict[str, List[Any]]:
+        """Get the samples taken between `start` and `end`, inclusive.
+        Either bound may be None to leave that side open.
+        """
+        return self._select(*self._range(start, end))
+
+    def _numbers(
+        self, name: str, start: Optional[float], end: Optional[float]
+    ) -> List[float]:
+        column = self._column(name)
+        if not column.numeric:
+            raise ValueError(f"field '{name}' is not numeric")
+        first, last = self._range(start, end)
+        values = column.values
+        out = []
+        for i in range(first, last):
+            value = values[self._index(i)]
+            if not math.isnan(value):
+                out.append(value)
+        return out
+
+    def min(
+        self,
+        name: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> Optional[float]:
+        """Get the smallest value of a numeric field in a time range, or
+        None if there is none.
+        """
+        values = self._numbers(name, start, end)
+        return self._columns[name].kind(min(values)) if values else None
+
+    def max(
+        self,
+        name: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> Optional[float]:
+        """Get the largest value of a numeric field in a time range, or
+        None if there is none.
+        """
+        values = self._numbers(name, start, end)
+        return self._columns[name].kind(max(values)) if values else None
+
+    def mean(
+        self,
+        name: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> Optional[float]:
+        """Get the mean value of a numeric field in a time range, or None
+        if there is none.
+        """
+        values = self._numbers(name, start, end)
+        return math.fsum(values) / len(values) if values else None
+
+
+def _read(sample, name: str):
+    """Read a property of a sample, treating missing keys as None."""
+    if isinstance(sample, (StatusSnapshot, Mapping)):
+        return sample.get(name)
+    try:
+        return getattr(sample, name)
+    except KeyError:
+        return None
@@ -0,0 +1,283 @@
+"""Monitoring many devices on a bounded pool of threads.
+
+A `MonitorManager` starts, polls and stops the monitoring task of every
+device it is given. Polls are timed by a `PollScheduler` and run on a
+fixed number of worker threads, so the thread count does not grow with
+the number of devices.
+"""
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from .client import AuthManager, Device
+from .scheduler import PollScheduler
+
+LOGGER = logging.getLogger("wideq.manager")
+
+#: How many worker threads a `MonitorManager` uses by default.
+MANAGER_WORKERS = 16
+#: How many requests a `MonitorManager` makes at once for one account
+#: by default.
+ACCOUNT_CONCURRENCY = 4
+
+
+class MonitorManager(object):
+    """Own the monitoring lifecycle of a set of devices.
+
+    Each device's monitor is started on its first turn and polled
+    whenever the scheduler says it is due; the first poll waits for the
+    model's typical warmup time, once one is known. `callback(device,
+    status)` is called on a worker thread with each poll's result. A
+    device never has more than one task queued or running, so a slow
+    device delays only itself. Tasks for an account (a `Client`) beyond
+    `account_limit` wait in a first-in, first-out queue for that
+    account, without holding a worker thread. A failed task is logged,
+    and the device's next poll is delayed with `PollScheduler.backoff`.
+
+    `shutdown` stops scheduling, waits for running tasks, and then
+    stops every monitor that was started.
+
+    :param callback: Called with each device and its polled status.
+    :param scheduler: Decides when devices are due. A new
+        `PollScheduler` by default.
+    :param workers: The number of worker threads.
+    :param account_limit: The most tasks run at once for one account.
+    :param auth: `AuthManager`s for the devices' clients. Requests for
+        an account with a manager go through `AuthManager.call`, so an
+        expired session is refreshed once for all of its devices and
+        the request is retried.
+    :param poll_args: Keyword arguments passed to `Device.poll`.
+    """
+
+    def __init__(
+        self,
+        callback: Optional[Callable[[Device, Any], None]] = None,
+        scheduler: Optional[PollScheduler] = None,
+        workers: int = MANAGER_WORKERS,
+        account_limit: int = ACCOUNT_CONCURRENCY,
+        auth: Iterable[AuthManager] = (),
+        **poll_args,
+    ) -> None:
+        if account_limit < 1:
+            raise ValueError("account_limit must be positive")
+        self.callback = callback
+        self.scheduler = PollScheduler() if scheduler is None else scheduler
+        self.account_limit = account_limit
+        self.poll_args = poll_args
+        self.auth = {manager.client: manager for manager in auth}
+
+        self._executor = ThreadPoolExecutor(
+            workers, thread_name_prefix="wideq-monitor"
+        )
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._devices: Dict[str, Device] = {}
+        #: Devices whose monitoring task has been started.
+        self._started: Set[str] = set()
+        #: Devices with a task queued or running.
+        self._busy: Set[str] = set()
+        #: Devices to stop once their current task is done.
+        self._closing: Set[str] = set()
+        #: The number of running tasks for each account.
+        self._running: Dict[Any, int] = {}
+        #: Tasks waiting for each account, as `(device, stop)` pairs.
+        self._queued: Dict[Any, Deque[Tuple[Device, bool]]] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return len(self._devices)
+
+    def __contains__(self, device_id: str) -> bool:
+        return device_id in self._devices
+
+    def add(self, device: Device, delay: float = 0.0) -> None:
+        """Start monitoring a device after `delay` seconds."""
+        with self._lock:
+            if self._stop.is_set():
+                raise RuntimeError("MonitorManager is shut down")
+            self._devices[device.device.id] = device
+            self._closing.discard(device.device.id)
+        self.scheduler.add(device, delay)
+
+    def remove(self, device_id: str) -> None:
+        """Stop monitoring a device. Its monitor is stopped in the
+        background once any task running for it is done.
+        """
+        self.scheduler.remove(device_id)
+        with self._lock:
+            device = self._devices.pop(device_id, None)
+            if device is None:
+                return
+            if device_id in self._busy:
+                # The running task may be the monitor's first start.
+                self._closing.add(device_id)
+                return
+            if device_id not in self._started:
+                return
+            task = self._enqueue(device, True)
+        if task:
+            self._executor.submit(self._work, *task)
+
+    def start(self) -> None:
+        """Start dispatching due devices on a background thread."""
+        if self._thread is not None:
+            raise RuntimeError("MonitorManager is already started")
+        self._thread = threading.Thread(
+            target=self._dispatch, name="wideq-monitor-manager", daemon=True
+        )
+        self._thread.start()
+
+    def shutdown(self) -> None:
+        """Stop polling, wait for running tasks, and stop every started
+        monitor. The manager cannot be restarted.
+        """
+        tasks = []
+        with self._lock:
+            if self._stop.is_set():
+                return
+            self._stop.set()
+            for device_id, device in self._devices.items():
+                if device_id in self._started and device_id not in self._busy:
+                    task = self._enqueue(device, True)
+                    if task:
+                        tasks.append(task)
+        for task in tasks:
+            self._executor.submit(self._work, *task)
+
+        self.scheduler.wake()
+        if self._thread is not None:
+            self._thread.join()
+        with self._idle:
+            while self._busy:
+                self._idle.wait()
+        self._executor.shutdown()
+        for device_id in list(self._devices):
+            self.scheduler.remove(device_id)
+
+    def __enter__(self) -> "MonitorManager":
+        self.start()
+        return self
+
+    def __exit__(self, type, value, tb) -> None:
+        self.shutdown()
+
+    def _dispatch(self) -> None:
+        while not self._stop.is_set():
+            for device in self.scheduler.due():
+                self._submit(device)
+            self.scheduler.wait()
+
+    def _submit(self, device: Device) -> None:
+        """Queue a poll (or the first start) of a device."""
+        with self._lock:
+            if self._stop.is_set() or device.device.id in self._busy:
+                return
+            task = self._enqueue(device, False)
+        if task:
+            self._executor.submit(self._work, *task)
+
+    def _enqueue(
+        self, device: Device, stop: bool
+    ) -> Optional[Tuple[Device, bool]]:
+        """Mark a device busy, and return its task if it can run now, or
+        queue it behind its account's running tasks. Call with the lock
+        held.
+        """
+        self._busy.add(device.device.id)
+        account = device.client
+        running = self._running.get(account, 0)
+        if running >= self.account_limit:
+            self._queued.setdefault(account, deque()).append((device, stop))
+            return None
+        self._running[account] = running + 1
+        return device, stop
+
+    def _work(self, device: Device, stop: bool) -> None:
+        status = None
+        failed = False
+        try:
+            if stop:
+                self._stop_device(device)
+            else:
+                status = self._poll_device(device)
+        except Exception:
+            LOGGER.exception("Monitoring device %s failed", device.device.id)
+            failed = True
+        finally:
+            self._done(device, stop, status, failed)
+
+    def _call(self, device: Device, func: Callable[..., Any], **kwargs):
+        """Call one of a device's methods, through its account's
+        `AuthManager` if it has one.
+        """
+        auth = self.auth.get(device.client)
+        if auth is None:
+            return func(**kwargs)
+        return auth.call(func, **kwargs)
+
+    def _poll_device(self, device: Device) -> Any:
+        device_id = device.device.id
+        if device_id not in self._started:
+            self._call(device, device.monitor_start)
+            with self._lock:
+                self._started.add(device_id)
+            return None
+        status = self._call(device, device.poll, **self.poll_args)
+        if self.callback is not None:
+            self.callback(device, status)
+        return status
+
+    def _stop_device(self, device: Device) -> None:
+        with self._lock:
+            self._started.discard(device.device.id)
+        self._call(device, device.monitor_stop)
+
+    def _done(
+        self, device: Device, stop: bool, status: Any, failed: bool
+    ) -> None:
+        """Release a finished task's slot, start the next task queued
+        for its account, and follow up on the device.
+        """
+        device_id = device.device.id
+        account = device.client
+        tasks = []
+        with self._lock:
+            self._busy.discard(device_id)
+            queue = self._queued.get(account)
+            if queue:
+                tasks.append(queue.popleft())
+            else:
+                self._running[account] -= 1
+                if not self._running[account]:
+                    del self._running[account]
+                    self._queued.pop(account, None)
+
+            closing = device_id in self._closing or self._stop.is_set()
+            self._closing.discard(device_id)
+            if closing and device_id in self._started:
+                task = self._enqueue(device, True)
+                if task:
+                    tasks.append(task)
+            if not self._busy:
+                self._idle.notify_all()
+        for task in tasks:
+            self._executor.submit(self._work, *task)
+
+        if stop or closing:
+            return
+        if failed:
+            self.scheduler.backoff(device)
+        else:
+            self.scheduler.reschedule(device, status)
@@ -1,8 +1,9 @@
 import enum
-from typing import Optional
+from typing import Any, Iterable, Mapping, Optional, Union
 
 from .client import Device
-from .util import lookup_enum
+from .status import StatusSnapshot, snapshot
+from .util import lookup_enum, lookup_member
 
 
 class IcePlus(enum.Enum):
@@ -47,24 +48,35 @@ class RefrigeratorDevice(Device):
         value = self.model.enum_value("TempFreezer", str(temp))
         self._set_control("REFT", value)
 
-    def poll(self) -> Optional["RefrigeratorStatus"]:
+    def _decode_status(
+        self,
+        data: bytes,
+        fields: Optional[Iterable[str]] = None,
+        lazy: bool = False,
+    ) -> "RefrigeratorStatus":
+        return RefrigeratorStatus(
+            self, self.model.decode_monitor(data, fields, lazy)
+        )
+
+    def poll(
+        self,
+        fields: Optional[Iterable[str]] = None,
+        lazy: bool = False,
+        snapshot: bool = False,
+    ) -> Optional[Union["RefrigeratorStatus", StatusSnapshot]]:
         """Poll the device's current state.
 
         Monitoring must be started first with `monitor_start`.
 
+        :param fields: Decode only these keys; properties that read
+            other keys will raise `KeyError`.
+        :param lazy: Decode each key the first time it is read.
+        :param snapshot: Return an immutable `StatusSnapshot` of the
+            status instead.
         :returns: Either a `RefrigeratorStatus` instance or `None` if the
             status is not yet available.
         """
-        # Abort if monitoring has not started yet.
-        if not hasattr(self, "mon"):
-            return None
-
-        data = self.mon.poll()
-        if data:
-            res = self.model.decode_monitor(data)
-            return RefrigeratorStatus(self, res)
-        else:
-            return None
+        return super().poll(fields, lazy, snapshot)
 
 
 class RefrigeratorStatus(object):
@@ -74,7 +86,9 @@ class RefrigeratorStatus(object):
     :param data: JSON data from the API.
     """
 
-    def __init__(self, refrigerator: RefrigeratorDevice, data: dict):
+    def __init__(
+        self, refrigerator: RefrigeratorDevice, data: Mapping[str, Any]
+    ):
         self.refrigerator = refrigerator
         self.data = data
 
@@ -90,18 +104,19 @@ class RefrigeratorStatus(object):
 
     @property
     def ice_plus_status(self):
-        status = lookup_enum("IcePlus", self.data, self.refrigerator)
-        return IcePlus(status)
+        return lookup_member(IcePlus, "IcePlus", self.data, self.refrigerator)
 
     @property
     def fresh_air_filter_status(self):
-        status = lookup_enum("FreshAirFilter", self.data, self.refrigerator)
-        return FreshAirFilter(status)
+        return lookup_member(
+            FreshAirFilter, "FreshAirFilter", self.data, self.refrigerator
+        )
 
     @property
     def energy_saving_mode(self):
-        mode = lookup_enum("SmartSavingMode", self.data, self.refrigerator)
-        return SmartSavingMode(mode)
+        return lookup_member(
+            SmartSavingMode, "SmartSavingMode", self.data, self.refrigerator
+        )
 
     @property
     def door_opened(self):
@@ -136,3 +151,7 @@ class RefrigeratorStatus(object):
     @property
     def water_filter_used_month(self):
         return self.data["WaterFilterUsedMonth"]
+
+    def snapshot(self, timestamp: Optional[float] = None) -> StatusSnapshot:
+        """Decode every property once into an immutable snapshot."""
+        return snapshot(self, timestamp)
@@ -0,0 +1,310 @@
+"""Adaptive polling of many devices.
+
+A `PollScheduler` decides when to poll each device next from the status
+it last reported: devices that are switched off are polled rarely,
+running ones more often, and ones about to finish a cycle quickly.
+Intervals are spread out with random jitter so that devices added
+together do not stay in lockstep.
+"""
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from collections import namedtuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .client import Device, DeviceType
+
+LOGGER = logging.getLogger("wideq.scheduler")
+
+#: The longest `PollScheduler.run` sleeps before checking its stop event.
+STOP_CHECK_INTERVAL = 1.0
+
+#: The longest delay, in seconds, before polling a device again after
+#: its polls have failed repeatedly.
+FAILURE_MAX_DELAY = 900.0
+
+#: Poll intervals, in seconds, for each kind of device activity.
+#:
+#: - `pending`: monitoring has not produced data yet. While a newly
+#:   started monitor warms up, the first poll instead waits for the
+#:   model's typical warmup time (see `Device.warmup_remaining`).
+#: - `off`: the device reports that it is off.
+#: - `idle`: the device is on but its activity is unknown (or it has no
+#:   notion of being on, like a refrigerator).
+#: - `active`: the device is running.
+#: - `finishing`: at most `finishing_minutes` of its cycle remain.
+#:
+#: `jitter` is the largest random change to an interval, as a fraction
+#: of it.
+PollPolicy = namedtuple(
+    "PollPolicy",
+    [
+        "pending",
+        "off",
+        "idle",
+        "active",
+        "finishing",
+        "finishing_minutes",
+        "jitter",
+    ],
+)
+
+#: The policy for device types without one of their own.
+DEFAULT_POLICY = PollPolicy(
+    pending=2.0,
+    off=120.0,
+    idle=60.0,
+    active=15.0,
+    finishing=5.0,
+    finishing_minutes=5,
+    jitter=0.1,
+)
+
+#: The default policies for specific device types.
+DEFAULT_POLICIES: Dict[DeviceType, PollPolicy] = {
+    DeviceType.WASHER: DEFAULT_POLICY._replace(active=30.0),
+    DeviceType.DRYER: DEFAULT_POLICY._replace(active=30.0),
+    DeviceType.DISHWASHER: DEFAULT_POLICY._replace(active=60.0),
+    DeviceType.AC: DEFAULT_POLICY._replace(active=10.0, idle=30.0),
+    DeviceType.REFRIGERATOR: DEFAULT_POLICY._replace(idle=300.0),
+    DeviceType.KIMCHI_REFRIGERATOR: DEFAULT_POLICY._replace(idle=300.0),
+}
+
+
+def _read(status, name: str) -> Any:
+    """Read a status property, or None if it cannot be decoded."""
+    try:
+        return getattr(status, name, None)
+    except (KeyError, ValueError):
+        return None
+
+
+def activity(status, policy: PollPolicy = DEFAULT_POLICY) -> str:
+    """Classify a status as one of the `PollPolicy` activities.
+
+    :param status: A status object or snapshot, or None if the device
+        has not reported yet.
+    """
+    if status is None:
+        return "pending"
+    is_on = _read(status, "is_on")
+    if is_on is False:
+        return "off"
+    remaining = _read(status, "remaining_time")
+    if (
+        isinstance(remaining, int)
+        and 0 < remaining <= policy.finishing_minutes
+    ):
+        return "finishing"
+    if is_on:
+        return "active"
+    return "idle"
+
+
+class PollScheduler(object):
+    """Decide when each of a set of devices is due to be polled.
+
+    Devices are kept in a heap ordered by due time. `poll_due` polls the
+    devices that are due and reschedules each from its new status;
+    `run` does that in a loop until stopped. A device whose poll fails
+    is retried with exponential backoff from its policy's `idle`
+    interval, up to `FAILURE_MAX_DELAY`, so failures never make it
+    polled more often.
+
+    :param policies: Policies by device type, replacing the defaults
+        for those types.
+    :param default: The policy for other device types.
+    :param clock: The time source, `time.monotonic` by default.
+    :param rng: The random number generator used for jitter.
+    """
+
+    def __init__(
+        self,
+        policies: Optional[Dict[DeviceType, PollPolicy]] = None,
+        default: PollPolicy = DEFAULT_POLICY,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        self.policies = dict(DEFAULT_POLICIES)
+        if policies:
+            self.policies.update(policies)
+        self.default = default
+        self.clock = clock
+        self.rng = rng or random.Random()
+
+        self._devices: Dict[str, Device] = {}
+        #: The number of consecutive failed polls of each device.
+        self._failures: Dict[str, int] = {}
+        #: The sequence number of each device's live heap entry.
+        self._due: Dict[str, int] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+
+    def set_policy(self, device_type: DeviceType, policy: PollPolicy) -> None:
+        """Set the policy for one type of device."""
+        self.policies[device_type] = policy
+
+    def policy(self, device: Device) -> PollPolicy:
+        """Get the policy that applies to a device."""
+        try:
+            device_type = device.device.type
+        except ValueError:  # A device type this library does not know.
+            return self.default
+        return self.policies.get(device_type, self.default)
+
+    def interval(self, device: Device, status) -> float:
+        """Get the delay before polling a device again, given the status
+        it just reported (or None), with jitter applied.
+        """
+        policy = self.policy(device)
+        kind = activity(status, policy)
+        base = getattr(policy, kind)
+        if kind == "pending":
+            warmup = device.warmup_remaining()
+            if warmup:
+                base = warmup
+        spread = base * policy.jitter
+        return max(0.0, base + self.rng.uniform(-spread, spread))
+
+    def __len__(self) -> int:
+        return len(self._devices)
+
+    def __contains__(self, device_id: str) -> bool:
+        return device_id in self._devices
+
+    def add(self, device: Device, delay: float = 0.0) -> None:
+        """Schedule a device to be polled after `delay` seconds."""
+        with self._lock:
+            self._devices[device.device.id] = device
+            self._push(device.device.id, self.clock() + delay)
+
+    def remove(self, device_id: str) -> None:
+        """Stop scheduling a device."""
+        with self._lock:
+            self._devices.pop(device_id, None)
+            self._due.pop(device_id, None)
+            self._failures.pop(device_id, None)
+
+    def reschedule(self, device: Device, status) -> float:
+        """Schedule a device's next poll from the status it reported.
+        Return the delay chosen.
+        """
+        delay = self.interval(device, status)
+        with self._lock:
+            self._failures.pop(device.device.id, None)
+            if device.device.id in self._devices:
+                self._push(device.device.id, self.clock() + delay)
+        return delay
+
+    def backoff(self, device: Device) -> float:
+        """Schedule a device's next poll after a failed poll. Return the
+        delay chosen.
+        """
+        policy = self.policy(device)
+        device_id = device.device.id
+        with self._lock:
+            failures = self._failures.get(device_id, 0) + 1
+            base = min(policy.idle * 2 ** (failures - 1), FAILURE_MAX_DELAY)
+            spread = base * policy.jitter
+            delay = max(0.0, base + self.rng.uniform(-spread, spread))
+            if device_id in self._devices:
+                self._failures[device_id] = failures
+                self._push(device_id, self.clock() + delay)
+        return delay
+
+    def _push(self, device_id: str, due: float) -> None:
+        # Superseded heap entries are skipped when they are popped.
+        seq = self._due[device_id] = next(self._counter)
+        heapq.heappush(self._heap, (due, seq, device_id))
+        if self._heap[0][1] == seq:
+            # The next poll is now earlier than `wait` expects.
+            self._wakeup.set()
+
+    def next_due(self) -> Optional[float]:
+        """Get the clock time when the next device is due, or None if no
+        devices are scheduled.
+        """
+        with self._lock:
+            self._discard_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def _discard_stale(self) -> None:
+        heap = self._heap
+        while heap and self._due.get(heap[0][2]) != heap[0][1]:
+            heapq.heappop(heap)
+
+    def due(self, now: Optional[float] = None) -> List[Device]:
+        """Take every device that is due, earliest first. Each must be
+        rescheduled (with `reschedule` or `add`) to be polled again.
+        """
+        if now is None:
+            now = self.clock()
+        out = []
+        with self._lock:
+            heap = self._heap
+            while True:
+                self._discard_stale()
+                if not heap or heap[0][0] > now:
+                    break
+                _, _, device_id = heapq.heappop(heap)
+                del self._due[device_id]
+                out.append(self._devices[device_id])
+        return out
+
+    def poll_due(
+        self, now: Optional[float] = None, **poll_args
+    ) -> List[Tuple[Device, Any]]:
+        """Poll every device that is due and reschedule it.
+
+        Extra keyword arguments are passed to `Device.poll`. A device
+        whose poll raises is logged and rescheduled with `backoff`.
+
+        :returns: `(device, status)` pairs; the status is None for
+            devices that were not ready or failed.
+        """
+        results = []
+        for device in self.due(now):
+            try:
+                status = device.poll(**poll_args)
+            except Exception:
+                LOGGER.exception("Polling device %s failed", device.device.id)
+                status = None
+                self.backoff(device)
+            else:
+                self.reschedule(device, status)
+            results.append((device, status))
+        return results
+
+    def run(
+        self,
+        callback: Callable[[Device, Any], None],
+        stop: Optional[threading.Event] = None,
+        **poll_args,
+    ) -> None:
+        """Poll devices as they come due until `stop` is set, calling
+        `callback(device, status)` with each result.
+        """
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            for device, status in self.poll_due(**poll_args):
+                callback(device, status)
+            self.wait()
+
+    def wait(self, timeout: float = STOP_CHECK_INTERVAL) -> None:
+        """Block until the next device is due, a device is scheduled
+        before it, `wake` is called, or `timeout` seconds pass.
+        """
+        next_due = self.next_due()
+        if next_due is not None:
+            timeout = min(timeout, max(0.0, next_due - self.clock()))
+        self._wakeup.wait(timeout)
+        self._wakeup.clear()
+
+    def wake(self) -> None:
+        """Make a pending `wait` return right away."""
+        self._wakeup.set()
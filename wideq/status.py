@@ -0,0 +1,379 @@
+"""Immutable snapshots of device status objects.
+
+The status classes (`WasherStatus`, `ACStatus`, etc.) wrap the raw
+monitoring data and decode a property each time it is read. A snapshot
+reads every property once and keeps only the results, in a slotted
+object that cannot be modified.
+
+`DeviceStatus` is a status class for any device, driven entirely by
+its model description.
+
+A `DeltaTracker` compares consecutive snapshots of a device and reports
+only the properties that changed.
+"""
+import logging
+import time
+import types
+from collections import namedtuple
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Type
+
+LOGGER = logging.getLogger("wideq.status")
+
+
+class StatusSnapshot(object):
+    """The decoded properties of a status object at one point in time.
+
+    Subclasses are generated per status class by `snapshot_type`; their
+    slots are the names in `fields`. `timestamp` is when the status was
+    captured, in seconds since the epoch.
+    """
+
+    __slots__ = ("timestamp",)
+
+    timestamp: float
+
+    #: The names of the status properties this snapshot holds.
+    fields: Tuple[str, ...] = ()
+
+    def __init__(self, timestamp: float, values: Dict[str, Any]):
+        set_attr = object.__setattr__
+        set_attr(self, "timestamp", timestamp)
+        for name in self.fields:
+            set_attr(self, name, values[name])
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """Get one of the snapshot's properties by name, or `default`
+        if it has no such property.
+        """
+        return getattr(self, name, default)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the snapshot's properties as a new dict."""
+        out = {}
+        for name in self.fields:
+            value = self.get(name)
+            if isinstance(value, types.MappingProxyType):
+                value = dict(value)
+            out[name] = value
+        return out
+
+    def __eq__(self, other):
+        """Snapshots are equal when they hold the same properties,
+        regardless of when they were taken.
+        """
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(
+            getattr(self, name) == getattr(other, name) for name in self.fields
+        )
+
+    __hash__ = None  # type: ignore
+
+    def __repr__(self):
+        return "{}({})".format(
+            type(self).__name__,
+            ", ".join(
+                "{}={!r}".format(name, getattr(self, name))
+                for name in self.fields
+            ),
+        )
+
+
+#: Snapshot classes by the status class they capture.
+_SNAPSHOT_TYPES: Dict[type, Type[StatusSnapshot]] = {}
+
+
+def status_fields(status_cls: type) -> Tuple[str, ...]:
+    """Get the public properties of a status class, in definition order."""
+
+    names = []
+    for klass in reversed(status_cls.__mro__):
+        for name, attr in vars(klass).items():
+            if (
+                isinstance(attr, property)
+                and not name.startswith("_")
+                and name not in names
+                and not hasattr(StatusSnapshot, name)
+            ):
+                names.append(name)
+    return tuple(names)
+
+
+def snapshot_type(status_cls: type) -> Type[StatusSnapshot]:
+    """Get the snapshot class for a status class, creating it on first
+    use.
+    """
+
+    try:
+        return _SNAPSHOT_TYPES[status_cls]
+    except KeyError:
+        pass
+
+    fields = status_fields(status_cls)
+    cls = type(
+        status_cls.__name__ + "Snapshot",
+        (StatusSnapshot,),
+        {
+            "__slots__": fields,
+            "__module__": status_cls.__module__,
+            "fields": fields,
+        },
+    )
+    _SNAPSHOT_TYPES[status_cls] = cls
+    return cls
+
+
+def snapshot(status, timestamp: Optional[float] = None) -> StatusSnapshot:
+    """Decode every property of a status object into a snapshot.
+
+    Properties whose keys are missing from the status data, e.g. after
+    a projected poll, are stored as None. Option maps are stored as
+    read-only views.
+
+    :param status: A status object, such as a `WasherStatus`.
+    :param timestamp: When the status was captured. Defaults to now.
+    """
+
+    cls = snapshot_type(type(status))
+    values = {}
+    for name in cls.fields:
+        try:
+            value = getattr(status, name)
+        except KeyError:
+            value = None
+        if isinstance(value, dict):
+            value = types.MappingProxyType(value)
+        values[name] = value
+    if timestamp is None:
+        timestamp = time.time()
+    return cls(timestamp, values)
+
+
+class ModelSnapshot(StatusSnapshot, Mapping):
+    """A snapshot of a `DeviceStatus`.
+
+    Its fields are the keys of the device's status data, which are not
+    always valid identifiers and may clash with attribute names, so it
+    is a read-only mapping of them: read them with `snapshot[key]`,
+    `get` or `to_dict`.
+    """
+
+    __slots__ = ("fields", "_values")
+
+    _values: Mapping[str, Any]
+
+    def __init__(self, timestamp: float, values: Dict[str, Any]):
+        set_attr = object.__setattr__
+        set_attr(self, "timestamp", timestamp)
+        set_attr(self, "fields", tuple(values))
+        set_attr(self, "_values", types.MappingProxyType(dict(values)))
+
+    def __getitem__(self, key: str) -> Any:
+        return self._values[key]
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return self._values.get(name, default)
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._values == other._values
+
+    __hash__ = None  # type: ignore
+
+    def __repr__(self):
+        return "ModelSnapshot({!r})".format(dict(self._values))
+
+
+class DeviceStatus(Mapping):
+    """The status of any device, decoded according to its model.
+
+    Each key of the status data is formatted with the model's compiled
+    formatter for it (see `ModelInfo.formatter`): enum codes become
+    their friendly names, ranges become numbers, bit values become maps
+    of flags, and references become their names.
+
+    :param device: The `Device` the status belongs to.
+    :param data: The decoded monitoring data.
+    """
+
+    def __init__(self, device, data: Mapping[str, Any]):
+        self.device = device
+        self.data = data
+
+    def __getitem__(self, key: str) -> Any:
+        return self.device.model.formatter(key)(self.data[key])
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Format every key of the status data."""
+        formatter = self.device.model.formatter
+        return {key: formatter(key)(value) for key, value in self.data.items()}
+
+    def snapshot(self, timestamp: Optional[float] = None) -> ModelSnapshot:
+        """Format every key once into an immutable snapshot."""
+        values = self.to_dict()
+        for key, value in values.items():
+            if isinstance(value, dict):
+                values[key] = types.MappingProxyType(value)
+        if timestamp is None:
+            timestamp = time.time()
+        return ModelSnapshot(timestamp, values)
+
+    def __repr__(self):
+        return "DeviceStatus({!r})".format(self.to_dict())
+
+
+#: The old and new values of a property that changed between polls.
+FieldChange = namedtuple("FieldChange", ["old", "new"])
+
+#: The changes of a delta in which nothing changed.
+_NO_CHANGES: Mapping[str, FieldChange] = types.MappingProxyType({})
+
+
+class StatusDelta(object):
+    """The difference between a device's status and its previous one.
+
+    `changes` maps the names of changed properties to `FieldChange`
+    pairs. `snapshot` is the device's latest decoded status; when
+    nothing changed it may be an earlier, identical snapshot. A delta is
+    false when nothing changed.
+    """
+
+    __slots__ = ("snapshot", "changes", "timestamp")
+
+    def __init__(
+        self,
+        snapshot: StatusSnapshot,
+        changes: Mapping[str, FieldChange],
+        timestamp: float,
+    ):
+        self.snapshot = snapshot
+        self.changes = changes
+        self.timestamp = timestamp
+
+    def __bool__(self) -> bool:
+        return bool(self.changes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the new values of the changed properties."""
+        out = {}
+        for name, change in self.changes.items():
+            value = change.new
+            if isinstance(value, types.MappingProxyType):
+                value = dict(value)
+            out[name] = value
+        return out
+
+    def __repr__(self):
+        return "StatusDelta({!r})".format(dict(self.changes))
+
+
+class DeltaTracker(object):
+    """Track one device's status across polls and compute deltas.
+
+    Feed it raw status data with `update_raw` or decoded snapshots with
+    `update`. The first status reports every property as changed from
+    None. Callbacks registered with `subscribe` are called with each
+    delta that has changes.
+    """
+
+    def __init__(self) -> None:
+        #: The most recent snapshot, or None before the first update.
+        self.last: Optional[StatusSnapshot] = None
+        self._raw: Optional[bytes] = None
+        self._subscribers: List[Callable[[StatusDelta], None]] = []
+
+    def subscribe(
+        self, callback: Callable[[StatusDelta], None]
+    ) -> Callable[[StatusDelta], None]:
+        """Call `callback` with every delta that has changes. Return the
+        callback, so this can be used as a decorator.
+        """
+        self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback: Callable[[StatusDelta], None]) -> None:
+        """Stop calling a subscribed callback."""
+        self._subscribers.remove(callback)
+
+    def reset(self) -> None:
+        """Forget the previous status, so the next update reports every
+        property.
+        """
+        self.last = None
+        self._raw = None
+
+    def update(
+        self, snapshot: StatusSnapshot, timestamp: Optional[float] = None
+    ) -> StatusDelta:
+        """Compare a snapshot with the previous one and remember it."""
+
+        if timestamp is None:
+            timestamp = snapshot.timestamp
+        last, self.last = self.last, snapshot
+        self._raw = None
+        if last is None or type(last) is not type(snapshot):
+            changes = {
+                name: FieldChange(None, snapshot.get(name))
+                for name in snapshot.fields
+            }
+        else:
+            # Model snapshots may gain or lose keys between polls; a
+            # missing key reads as None.
+            names = snapshot.fields + tuple(
+                name for name in last.fields if name not in snapshot.fields
+            )
+            changes = {}
+            for name in names:
+                old = last.get(name)
+                new = snapshot.get(name)
+                if old != new:
+                    changes[name] = FieldChange(old, new)
+
+        if not changes:
+            return StatusDelta(snapshot, _NO_CHANGES, timestamp)
+        delta = StatusDelta(snapshot, changes, timestamp)
+        self._publish(delta)
+        return delta
+
+    def update_raw(
+        self, data: bytes, decode: Callable[[bytes], StatusSnapshot]
+    ) -> StatusDelta:
+        """Compare raw status data with the previous data.
+
+        When the bytes are identical to the last update's, `decode` is
+        skipped and a delta without changes is returned right away.
+        Otherwise the data is decoded into a snapshot and compared field
+        by field.
+        """
+
+        if self.last is not None and data == self._raw:
+            return StatusDelta(self.last, _NO_CHANGES, time.time())
+        delta = self.update(decode(data))
+        self._raw = data
+        return delta
+
+    def _publish(self, delta: StatusDelta) -> None:
+        for callback in list(self._subscribers):
+            try:
+                callback(delta)
+            except Exception:
+                LOGGER.exception("Status delta subscriber %r failed", callback)
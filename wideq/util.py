@@ -1,12 +1,14 @@
-from typing import TypeVar
+import enum
+from typing import Any, Dict, Mapping, Type, TypeVar
 
 from .client import Device, DeviceType
 
 
 T = TypeVar("T", bound=Device)
+E = TypeVar("E", bound=enum.Enum)
 
 
-def lookup_enum(attr: str, data: dict, device: T):
+def lookup_enum(attr: str, data: Mapping[str, Any], device: T):
     """Looks up an enum value for the provided attr.
 
     :param attr: The attribute to lookup in the enum.
@@ -17,7 +19,24 @@ def lookup_enum(attr: str, data: dict, device: T):
     return device.model.enum_name(attr, data[attr])
 
 
-def lookup_reference(attr: str, data: dict, device: T) -> str:
+def lookup_member(
+    enum_cls: Type[E], attr: str, data: Mapping[str, Any], device: T
+) -> E:
+    """Looks up the enum member for the provided attr.
+
+    This is `enum_cls(lookup_enum(attr, data, device))`, but reads the
+    model's precomputed table of members.
+
+    :param enum_cls: The enum class to look up a member of.
+    :param attr: The attribute to lookup in the enum.
+    :param data: The JSON data from the API.
+    :param device: A sub-class instance of a Device.
+    :returns: The enum member.
+    """
+    return device.model.enum_member(attr, data[attr], enum_cls)
+
+
+def lookup_reference(attr: str, data: Mapping[str, Any], device: T) -> str:
     """Look up a reference value for the provided attribute.
 
     :param attr: The attribute to find the value for.
@@ -31,6 +50,16 @@ def lookup_reference(attr: str, data: dict, device: T) -> str:
     return value
 
 
+def lookup_options(data: Mapping[str, Any], device: T) -> Dict[str, int]:
+    """Unpack the flags of every bit value in the provided data.
+
+    :param data: The JSON data from the API.
+    :param device: A sub-class instance of a Device.
+    :returns: A map from flag names (e.g. `ChildLock`) to their values.
+    """
+    return device.model.decode_options(data)
+
+
 def device_classes():
     """The mapping of every Device subclass related to the DeviceType enum"""
     from .ac import ACDevice
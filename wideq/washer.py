@@ -1,8 +1,9 @@
 import enum
-from typing import Optional
+from typing import Any, Dict, Iterable, Mapping, Optional, Union
 
 from .client import Device
-from .util import lookup_enum, lookup_reference
+from .status import StatusSnapshot, snapshot
+from .util import lookup_member, lookup_options, lookup_reference
 
 
 class WasherState(enum.Enum):
@@ -37,24 +38,35 @@ class WasherState(enum.Enum):
 class WasherDevice(Device):
     """A higher-level interface for a washer."""
 
-    def poll(self) -> Optional["WasherStatus"]:
+    def _decode_status(
+        self,
+        data: bytes,
+        fields: Optional[Iterable[str]] = None,
+        lazy: bool = False,
+    ) -> "WasherStatus":
+        return WasherStatus(
+            self, self.model.decode_monitor(data, fields, lazy)
+        )
+
+    def poll(
+        self,
+        fields: Optional[Iterable[str]] = None,
+        lazy: bool = False,
+        snapshot: bool = False,
+    ) -> Optional[Union["WasherStatus", StatusSnapshot]]:
         """Poll the device's current state.
 
         Monitoring must be started first with `monitor_start`.
 
+        :param fields: Decode only these keys; properties that read
+            other keys will raise `KeyError`.
+        :param lazy: Decode each key the first time it is read.
+        :param snapshot: Return an immutable `StatusSnapshot` of the
+            status instead.
         :returns: Either a `WasherStatus` instance or `None` if the status is
             not yet available.
         """
-        # Abort if monitoring has not started yet.
-        if not hasattr(self, "mon"):
-            return None
-
-        data = self.mon.poll()
-        if data:
-            res = self.model.decode_monitor(data)
-            return WasherStatus(self, res)
-        else:
-            return None
+        return super().poll(fields, lazy, snapshot)
 
 
 class WasherStatus(object):
@@ -64,19 +76,20 @@ class WasherStatus(object):
     :param data: JSON data from the API.
     """
 
-    def __init__(self, washer: WasherDevice, data: dict):
+    def __init__(self, washer: WasherDevice, data: Mapping[str, Any]):
         self.washer = washer
         self.data = data
+        self._options: Optional[Dict[str, int]] = None
 
     @property
     def state(self) -> WasherState:
         """Get the state of the washer."""
-        return WasherState(lookup_enum("State", self.data, self.washer))
+        return lookup_member(WasherState, "State", self.data, self.washer)
 
     @property
     def previous_state(self) -> WasherState:
         """Get the previous state of the washer."""
-        return WasherState(lookup_enum("PreState", self.data, self.washer))
+        return lookup_member(WasherState, "PreState", self.data, self.washer)
 
     @property
     def is_on(self) -> bool:
@@ -122,3 +135,29 @@ class WasherStatus(object):
     def error(self) -> str:
         """Get the current error."""
         return lookup_reference("Error", self.data, self.washer)
+
+    @property
+    def options(self) -> Dict[str, int]:
+        """Get every option flag, unpacked from the bit values."""
+        if self._options is None:
+            self._options = lookup_options(self.data, self.washer)
+        return self._options
+
+    @property
+    def child_lock(self) -> bool:
+        """Check if the child lock is engaged."""
+        return bool(self.options.get("ChildLock"))
+
+    @property
+    def remote_start(self) -> bool:
+        """Check if remote start is enabled."""
+        return bool(self.options.get("RemoteStart"))
+
+    @property
+    def rinse_count(self) -> int:
+        """Get the number of rinses."""
+        return self.options.get("RinseCount", 0)
+
+    def snapshot(self, timestamp: Optional[float] = None) -> StatusSnapshot:
+        """Decode every property once into an immutable snapshot."""
+        return snapshot(self, timestamp)